@@ -0,0 +1,139 @@
+"""Time and memory budgets of the pipeline stages, relative to a recorded baseline.
+
+The baseline holds, for every stage of ``benchmarks.run`` at ``BUDGET_SCALE``,
+its best wall time and tracemalloc peak, plus the time of a fixed calibration
+workload. Checks scale time budgets by the calibration ratio, so a slower
+machine does not fail them, and allow each stage ``TIME_FACTOR`` /
+``MEMORY_FACTOR`` times its baseline (with a small absolute slack for stages
+that take a few milliseconds or kilobytes).
+
+    python -m benchmarks.budgets --record   # after an intended change
+"""
+
+import argparse
+import json
+import platform
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.run import ScaleResult, StageResult, format_bytes, run_scale
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+BUDGET_SCALE = 0.02
+BUDGET_SEED = 0
+BUDGET_REPEAT = 3
+
+# A stage fails when it doubles its runtime or peak memory.
+TIME_FACTOR = 2.0
+MEMORY_FACTOR = 2.0
+TIME_SLACK_SECONDS = 0.05
+MEMORY_SLACK_BYTES = 1024**2
+
+
+def calibrate(repeat: int = 3) -> float:
+    """Best time of a fixed pandas workload, to compare machine speeds."""
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame(
+        {"key": rng.integers(0, 50_000, 1_000_000), "value": rng.random(1_000_000)}
+    )
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        frame.groupby("key")["value"].agg(["mean", "size"]).sort_values("mean")
+        frame["key"].astype(str).str.len().sum()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def measure_budgeted_stages(data_dir: Path) -> ScaleResult:
+    return run_scale(data_dir, BUDGET_SCALE, BUDGET_SEED, repeat=BUDGET_REPEAT, memory=True)
+
+
+def record(data_dir: Path, path: Path = BASELINE_PATH) -> dict[str, Any]:
+    report = measure_budgeted_stages(data_dir)
+    baseline = {
+        "scale": BUDGET_SCALE,
+        "seed": BUDGET_SEED,
+        "calibration_seconds": round(calibrate(), 6),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "stages": {
+            stage.name: {"seconds": stage.seconds, "peak_bytes": stage.peak_bytes}
+            for stage in report.stages
+        },
+    }
+    path.write_text(json.dumps(baseline, indent=2) + "\n")
+    return baseline
+
+
+def load_baseline(path: Path = BASELINE_PATH) -> dict[str, Any]:
+    return json.loads(path.read_text())
+
+
+@dataclass
+class Budget:
+    stage: str
+    max_seconds: float
+    max_peak_bytes: Optional[int]
+
+    def violations(self, result: StageResult) -> list[str]:
+        problems = []
+        if result.seconds > self.max_seconds:
+            problems.append(
+                f"{self.stage}: {result.seconds:.4f}s exceeds its {self.max_seconds:.4f}s budget"
+            )
+        if (
+            self.max_peak_bytes is not None
+            and result.peak_bytes is not None
+            and result.peak_bytes > self.max_peak_bytes
+        ):
+            problems.append(
+                f"{self.stage}: peak {format_bytes(result.peak_bytes)} exceeds its "
+                f"{format_bytes(self.max_peak_bytes)} budget"
+            )
+        return problems
+
+
+def budgets(baseline: dict[str, Any], calibration_seconds: float) -> dict[str, Budget]:
+    """Per-stage budgets, with time budgets scaled to this machine's speed."""
+    speed = max(1.0, calibration_seconds / baseline["calibration_seconds"])
+    result = {}
+    for name, stage in baseline["stages"].items():
+        seconds = stage["seconds"] * speed
+        peak = stage["peak_bytes"]
+        result[name] = Budget(
+            stage=name,
+            max_seconds=max(seconds * TIME_FACTOR, seconds + TIME_SLACK_SECONDS),
+            max_peak_bytes=(
+                None if peak is None else int(max(peak * MEMORY_FACTOR, peak + MEMORY_SLACK_BYTES))
+            ),
+        )
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--record", action="store_true", help="overwrite the recorded baseline")
+    parser.add_argument("--data-dir", type=Path, default=Path(__file__).parent / ".data")
+    args = parser.parse_args()
+
+    if args.record:
+        baseline = record(args.data_dir)
+        print(f"recorded {len(baseline['stages'])} stages to {BASELINE_PATH}")
+        return
+
+    baseline = load_baseline()
+    limits = budgets(baseline, calibrate())
+    report = measure_budgeted_stages(args.data_dir)
+    problems = [p for s in report.stages if s.name in limits for p in limits[s.name].violations(s)]
+    print("\n".join(problems) or f"all {len(limits)} stages within budget")
+    raise SystemExit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
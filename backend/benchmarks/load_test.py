@@ -0,0 +1,411 @@
+"""Replay the Streamlit dashboard's traffic against a backend and report latencies.
+
+Each virtual user browses the dashboard pages in turn and issues, one after
+the other, the requests the Streamlit scripts send when the page renders
+(Streamlit reruns the whole page script, tabs included). Per endpoint the
+report gives the request count, errors, throughput, p50/p95/p99 latency and
+the peak RSS of the backend while such a request was in flight.
+
+    # Start a backend on a synthetic Food.com-sized dataset and load it
+    python -m benchmarks.load_test --start --scale 1 --workers 2 --concurrency 16
+    # Or target a running backend (RSS needs its pid)
+    python -m benchmarks.load_test --url http://localhost:8000 --pid 1234
+"""
+
+import argparse
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Iterator, Optional
+
+import httpx
+import psutil
+
+from benchmarks.run import DEFAULT_DATA_DIR, format_bytes
+from benchmarks.synthetic import generate
+from service.layers.application.data_cleaning import clean_frame
+from service.layers.domain.mange_ta_main import SERVICE_PREFIX
+from service.layers.infrastructure.csv_adapter import CSVAdapter
+from service.layers.infrastructure.types import DataType
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+READY_TIMEOUT_SECONDS = 600
+RSS_SAMPLE_SECONDS = 0.05
+# Same timeouts as the frontend: 60s for previews, 300s for full exports.
+REQUEST_TIMEOUT_SECONDS = 300
+
+
+@dataclass(frozen=True)
+class DashboardRequest:
+    path: str
+    params: tuple[tuple[str, str], ...] = ()
+
+    @property
+    def name(self) -> str:
+        query = "&".join(f"{k}={v}" for k, v in self.params)
+        return f"/{SERVICE_PREFIX}/{self.path}" + (f"?{query}" if query else "")
+
+
+def _get(path: str, **params: str) -> DashboardRequest:
+    return DashboardRequest(path, tuple(params.items()))
+
+
+# Requests each page issues on render, in the order of frontend/service.
+PAGES: dict[str, tuple[DashboardRequest, ...]] = {
+    # app.py: render_top_contributors, then the duration, reviews and rating tabs
+    "home": (
+        _get("most-recipes-contributors"),
+        _get("duration-distribution"),
+        _get("duration-vs-recipe-count"),
+        _get("review-overview"),
+        _get("review-distribution"),
+        _get("top-reviewers"),
+        _get("reviewer-vs-recipes"),
+        _get("review-trend"),
+        _get("reviews-vs-rating"),
+        _get("rating-distribution"),
+        _get("rating-vs-recipes"),
+    ),
+    # pages/tab02_analyse.py: tab06 and tab07
+    "analyse": (
+        _get("top-10-percent-contributors"),
+        _get("top-tags-by-segment"),
+    ),
+    # pages/tab01_data.py: preview of the default dataset
+    "data": (_get("load-data", data_type="recipes", limit="100"),),
+}
+# The data page's "download full dataset" button, only replayed on request.
+DOWNLOAD = _get("load-data", data_type="recipes", format="csv")
+
+
+@dataclass
+class EndpointStats:
+    name: str
+    requests: int = 0
+    errors: int = 0
+    throughput_rps: float = 0.0
+    p50_ms: Optional[float] = None
+    p95_ms: Optional[float] = None
+    p99_ms: Optional[float] = None
+    bytes_received: int = 0
+    peak_rss_bytes: Optional[int] = None
+    latencies: list[float] = field(default_factory=list, repr=False)
+
+
+def percentile(sorted_values: list[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return None
+    rank = max(1, round(q / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class RssSampler:
+    """Samples the RSS of a process tree, attributing peaks to in-flight endpoints."""
+
+    def __init__(self, pid: Optional[int]):
+        self.process = psutil.Process(pid) if pid is not None else None
+        self.peak = 0
+        self.per_endpoint: dict[str, int] = {}
+        self._in_flight: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def __enter__(self) -> "RssSampler":
+        if self.process is not None:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    @contextmanager
+    def in_flight(self, name: str) -> Iterator[None]:
+        with self._lock:
+            self._in_flight[name] += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_flight[name] -= 1
+
+    def _rss(self) -> int:
+        assert self.process is not None
+        total = 0
+        for process in [self.process, *self.process.children(recursive=True)]:
+            try:
+                total += process.memory_info().rss
+            except psutil.NoSuchProcess:
+                pass
+        return total
+
+    def _run(self) -> None:
+        while not self._stop.wait(RSS_SAMPLE_SECONDS):
+            try:
+                rss = self._rss()
+            except psutil.NoSuchProcess:
+                return
+            self.peak = max(self.peak, rss)
+            with self._lock:
+                for name, count in self._in_flight.items():
+                    if count > 0:
+                        self.per_endpoint[name] = max(self.per_endpoint.get(name, 0), rss)
+
+
+@dataclass
+class LoadTestReport:
+    url: str
+    concurrency: int
+    seconds: float
+    workers: Optional[int]
+    peak_rss_bytes: Optional[int]
+    endpoints: list[EndpointStats]
+
+    @property
+    def total(self) -> EndpointStats:
+        latencies = sorted(x for e in self.endpoints for x in e.latencies)
+        return _summarize(
+            "total",
+            latencies,
+            sum(e.requests for e in self.endpoints),
+            sum(e.errors for e in self.endpoints),
+            sum(e.bytes_received for e in self.endpoints),
+            self.seconds,
+            self.peak_rss_bytes,
+        )
+
+
+def _summarize(
+    name: str,
+    latencies: list[float],
+    requests: int,
+    errors: int,
+    bytes_received: int,
+    seconds: float,
+    peak_rss: Optional[int],
+) -> EndpointStats:
+    latencies = sorted(latencies)
+
+    def ms(q: float) -> Optional[float]:
+        value = percentile(latencies, q)
+        return None if value is None else round(value * 1000, 2)
+
+    return EndpointStats(
+        name=name,
+        requests=requests,
+        errors=errors,
+        throughput_rps=round(requests / seconds, 2) if seconds else 0.0,
+        p50_ms=ms(50),
+        p95_ms=ms(95),
+        p99_ms=ms(99),
+        bytes_received=bytes_received,
+        peak_rss_bytes=peak_rss,
+        latencies=latencies,
+    )
+
+
+def _session(include_download: bool) -> list[DashboardRequest]:
+    requests = [request for page in PAGES.values() for request in page]
+    return requests + [DOWNLOAD] if include_download else requests
+
+
+def run_load_test(
+    url: str,
+    concurrency: int,
+    duration: float,
+    pid: Optional[int] = None,
+    include_download: bool = False,
+    workers: Optional[int] = None,
+) -> LoadTestReport:
+    """Run ``concurrency`` virtual users replaying dashboard sessions for ``duration`` seconds.
+
+    A session started before the deadline is cut at the deadline, so every
+    recorded request started within the measured window.
+    """
+    session = _session(include_download)
+    results: list[tuple[str, float, bool, int]] = []
+    results_lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def user() -> None:
+        with httpx.Client(base_url=url, timeout=REQUEST_TIMEOUT_SECONDS) as client:
+            while time.perf_counter() < deadline:
+                for request in session:
+                    if time.perf_counter() >= deadline:
+                        return
+                    with sampler.in_flight(request.name):
+                        started = time.perf_counter()
+                        try:
+                            response = client.get(
+                                f"/{SERVICE_PREFIX}/{request.path}", params=request.params
+                            )
+                            ok, size = response.is_success, len(response.content)
+                        except httpx.HTTPError:
+                            ok, size = False, 0
+                        elapsed = time.perf_counter() - started
+                    with results_lock:
+                        results.append((request.name, elapsed, ok, size))
+
+    started = time.perf_counter()
+    with RssSampler(pid) as sampler:
+        users = [
+            threading.Thread(target=user, name=f"virtual-user-{i}", daemon=True)
+            for i in range(concurrency)
+        ]
+        for thread in users:
+            thread.start()
+        for thread in users:
+            thread.join()
+    seconds = time.perf_counter() - started
+
+    endpoints = []
+    for name in dict.fromkeys(request.name for request in session):
+        rows = [r for r in results if r[0] == name]
+        endpoints.append(
+            _summarize(
+                name,
+                [r[1] for r in rows],
+                len(rows),
+                sum(1 for r in rows if not r[2]),
+                sum(r[3] for r in rows),
+                seconds,
+                sampler.per_endpoint.get(name),
+            )
+        )
+    return LoadTestReport(
+        url=url,
+        concurrency=concurrency,
+        seconds=round(seconds, 3),
+        workers=workers,
+        peak_rss_bytes=sampler.peak or None,
+        endpoints=endpoints,
+    )
+
+
+def prepare_dataset(data_dir: Path, scale: float, seed: int = 0) -> Path:
+    """Generate a synthetic dataset and publish its cleaned tables, once."""
+    scale_dir = data_dir / f"scale-{scale:g}-seed-{seed}"
+    generate(scale_dir, scale, seed)
+    for data_type in DataType:
+        if CSVAdapter(scale_dir).current_snapshot(data_type) is None:
+            clean_frame(CSVAdapter(scale_dir), data_type)
+    return scale_dir
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def backend_server(workers: int, data_dir: Optional[Path] = None) -> Iterator[tuple[str, int]]:
+    """Start ``uvicorn`` with ``workers`` processes and wait until ``/ready`` answers 200."""
+    port = _free_port()
+    env = dict(os.environ)
+    if data_dir is not None:
+        env["DATA_DIR"] = str(data_dir)
+    command = [
+        sys.executable, "-m", "uvicorn", "service.main:app",
+        "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers),
+        "--log-level", "warning",
+    ]  # fmt: skip
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env)
+    url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + READY_TIMEOUT_SECONDS
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"backend exited with code {process.returncode}")
+            try:
+                if httpx.get(f"{url}/{SERVICE_PREFIX}/ready", timeout=5).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"backend not ready after {READY_TIMEOUT_SECONDS}s")
+            time.sleep(0.5)
+        yield url, process.pid
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def format_report(report: LoadTestReport) -> str:
+    workers = "" if report.workers is None else f", {report.workers} worker(s)"
+    lines = [
+        f"{report.url}: {report.concurrency} virtual users for {report.seconds:.1f}s{workers}",
+        f"{'endpoint':<60} {'reqs':>6} {'err':>4} {'req/s':>8} "
+        f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'peak RSS':>11}",
+    ]
+
+    def fmt(value: Optional[float]) -> str:
+        return "-" if value is None else f"{value:.1f}"
+
+    for stats in [*report.endpoints, report.total]:
+        lines.append(
+            f"{stats.name:<60} {stats.requests:>6} {stats.errors:>4} {stats.throughput_rps:>8.2f} "
+            f"{fmt(stats.p50_ms):>9} {fmt(stats.p95_ms):>9} {fmt(stats.p99_ms):>9} "
+            f"{format_bytes(stats.peak_rss_bytes):>11}"
+        )
+    return "\n".join(lines)
+
+
+def report_to_dict(report: LoadTestReport) -> dict:
+    payload = asdict(report)
+    payload["total"] = asdict(report.total)
+    for stats in [*payload["endpoints"], payload["total"]]:
+        del stats["latencies"]
+    return payload
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url", help="base URL of a running backend")
+    target.add_argument("--start", action="store_true", help="start a local backend")
+    parser.add_argument("--pid", type=int, help="backend pid, for RSS with --url")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers with --start")
+    parser.add_argument(
+        "--scale", type=float, help="with --start, serve a synthetic dataset of this scale"
+    )
+    parser.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR)
+    parser.add_argument("--concurrency", type=int, default=8, help="virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of load")
+    parser.add_argument("--download", action="store_true", help="also replay the full CSV download")
+    parser.add_argument("--output", type=Path, help="also write the report as JSON")
+    args = parser.parse_args()
+    # One INFO line per request from httpx would drown the report.
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    if args.start:
+        served = prepare_dataset(args.data_dir, args.scale) if args.scale else None
+        with backend_server(args.workers, served) as (url, pid):
+            report = run_load_test(
+                url, args.concurrency, args.duration, pid, args.download, args.workers
+            )
+    else:
+        report = run_load_test(args.url, args.concurrency, args.duration, args.pid, args.download)
+
+    print(format_report(report))
+    if args.output is not None:
+        args.output.write_text(json.dumps(report_to_dict(report), indent=2))
+
+
+if __name__ == "__main__":
+    main()
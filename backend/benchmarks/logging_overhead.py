@@ -0,0 +1,167 @@
+"""Per-request logging overhead of the console and JSON logging modes.
+
+Each mode runs in a fresh interpreter configured from the environment, as the
+service is, and replays the log events of a traced analysis cache miss (the
+request span, ``compute`` and its stage spans, the analysis event,
+``serialize``). The time spent on the request thread is reported per request
+and compared with a run whose events are all sampled out; for the JSON mode
+the time its listener still needed to write the queued records is reported
+separately.
+
+    python -m benchmarks.logging_overhead --requests 5000 --output logging.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+# Environment of each mode; "off" samples every event out, as the baseline.
+MODES: dict[str, dict[str, str]] = {
+    "off": {"LOG_FORMAT": "console", "LOG_SAMPLING": "*=0"},
+    "console": {"LOG_FORMAT": "console", "LOG_SAMPLING": ""},
+    "json": {"LOG_FORMAT": "json", "LOG_SAMPLING": ""},
+    "json_sampled": {"LOG_FORMAT": "json", "LOG_SAMPLING": "span=0.1"},
+}
+
+STAGES = ("groupby", "merge", "groupby", "bin", "groupby")
+
+
+@dataclass
+class ModeResult:
+    mode: str
+    requests: int
+    mean_us: float
+    p99_us: float
+    overhead_us: Optional[float]
+    drain_seconds: float
+    dropped: int
+
+
+def simulated_request() -> None:
+    """Emit the log events of an analysis request missing the response cache."""
+    from service.layers.logger import (
+        SPAN_KIND_SERVER,
+        bind_request,
+        close_stage,
+        new_request_id,
+        span,
+        struct_logger,
+    )
+
+    request_id = new_request_id()
+    with (
+        bind_request(request_id),
+        span(
+            "http.request", kind=SPAN_KIND_SERVER, request_id=request_id, **{"http.method": "GET"}
+        ),
+    ):
+        with span("compute", analysis="rating_distribution", pool=False):
+            for kind in STAGES:
+                close_stage(f"{kind} step", kind=kind, rows_out=1000)
+        struct_logger.info("rating_distribution", rows=6)
+        with span("serialize", analysis="rating_distribution", rows=6):
+            pass
+
+
+def run_child(requests: int, output: Path) -> None:
+    from service.layers.logger import logging_stats
+
+    for _ in range(min(200, requests)):
+        simulated_request()
+    while logging_stats()["queued"]:
+        time.sleep(0.001)
+
+    timings = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        simulated_request()
+        timings.append(time.perf_counter() - started)
+    drain_started = time.perf_counter()
+    while logging_stats()["queued"]:
+        time.sleep(0.001)
+    drain = time.perf_counter() - drain_started
+
+    output.write_text(
+        json.dumps({"timings": timings, "drain": drain, "dropped": logging_stats()["dropped"]})
+    )
+
+
+def run_mode(mode: str, requests: int) -> dict[str, Any]:
+    """Run ``mode`` in a subprocess whose logs go to ``/dev/null``."""
+    with tempfile.TemporaryDirectory() as tmp:
+        output = Path(tmp) / "result.json"
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.logging_overhead", "--child", str(output)]
+            + ["--requests", str(requests)],
+            env={**os.environ, **MODES[mode]},
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=True,
+        )
+        return json.loads(output.read_text())
+
+
+def measure(requests: int, modes: list[str]) -> list[ModeResult]:
+    raw = {mode: run_mode(mode, requests) for mode in ["off", *modes] if mode in MODES}
+    baseline = statistics.fmean(raw["off"]["timings"]) * 1e6
+    results = []
+    for mode, data in raw.items():
+        timings = sorted(data["timings"])
+        mean_us = statistics.fmean(timings) * 1e6
+        results.append(
+            ModeResult(
+                mode=mode,
+                requests=len(timings),
+                mean_us=round(mean_us, 1),
+                p99_us=round(timings[int(0.99 * (len(timings) - 1))] * 1e6, 1),
+                overhead_us=None if mode == "off" else round(mean_us - baseline, 1),
+                drain_seconds=round(data["drain"], 4),
+                dropped=data["dropped"],
+            )
+        )
+    return results
+
+
+def format_report(results: list[ModeResult]) -> str:
+    lines = [
+        f"{'mode':<14}{'mean µs':>10}{'p99 µs':>10}{'overhead µs':>13}{'drain s':>10}{'dropped':>9}"
+    ]
+    for r in results:
+        overhead = "-" if r.overhead_us is None else f"{r.overhead_us:.1f}"
+        lines.append(
+            f"{r.mode:<14}{r.mean_us:>10.1f}{r.p99_us:>10.1f}{overhead:>13}"
+            f"{r.drain_seconds:>10.4f}{r.dropped:>9}"
+        )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000, help="simulated requests per mode")
+    parser.add_argument(
+        "--modes", nargs="+", default=[m for m in MODES if m != "off"], choices=sorted(MODES)
+    )
+    parser.add_argument("--output", type=Path, help="also write the results as JSON")
+    parser.add_argument("--child", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        run_child(args.requests, args.child)
+        return
+
+    results = measure(args.requests, args.modes)
+    print(format_report(results))
+    if args.output is not None:
+        args.output.write_text(json.dumps({"modes": [asdict(r) for r in results]}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
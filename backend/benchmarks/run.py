@@ -0,0 +1,184 @@
+"""Benchmark the data pipeline on synthetic Food.com-shaped datasets.
+
+For each scale the raw tables are generated (or reused), then the runner
+times loading the raw CSVs, ``clean_frame``, loading the published snapshot,
+building the ``DataAnylizer``, every served analysis and ``df_to_response`` on
+its result. Each stage reports its best wall time over ``--repeat`` runs and
+the peak memory it allocated, measured by tracemalloc in one extra run.
+
+    python -m benchmarks.run --scales 0.1 1 10 --output bench.json
+"""
+
+import argparse
+import json
+import resource
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional, TypeVar
+
+from benchmarks.synthetic import SyntheticSpec, generate
+from service.layers.api.mange_ta_main import df_to_response
+from service.layers.application.data_cleaning import clean_frame
+from service.layers.application.mange_ta_main import SERVED_ANALYSES, DataAnylizer
+from service.layers.application.profiling import tracing
+from service.layers.infrastructure.csv_adapter import CSVAdapter
+from service.layers.infrastructure.types import DataType
+
+DEFAULT_SCALES = (0.1, 1.0)
+DEFAULT_DATA_DIR = Path(__file__).parent / ".data"
+
+T = TypeVar("T")
+
+
+@dataclass
+class StageResult:
+    name: str
+    seconds: float
+    peak_bytes: Optional[int]
+    rows: Optional[int]
+
+
+@dataclass
+class ScaleResult:
+    spec: SyntheticSpec
+    generate_seconds: float
+    stages: list[StageResult] = field(default_factory=list)
+    # Process high-water mark after the scale ran; never decreases across scales.
+    max_rss_bytes: int = 0
+
+
+def _rows(value: Any) -> Optional[int]:
+    return len(value) if hasattr(value, "__len__") else None
+
+
+def measure(
+    fn: Callable[[], T], repeat: int = 1, memory: bool = True
+) -> tuple[T, float, Optional[int]]:
+    """Best wall time of ``fn`` over ``repeat`` runs and, optionally, its tracemalloc peak.
+
+    The peak comes from a separate traced run so tracing overhead stays out
+    of the timings.
+    """
+    best = float("inf")
+    result: Any = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+        del result
+    peak = None
+    if memory:
+        with tracing():
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            result = fn()
+            peak = tracemalloc.get_traced_memory()[1] - baseline
+    else:
+        result = fn()
+    return result, best, peak
+
+
+def run_scale(
+    data_dir: Path, scale: float, seed: int = 0, repeat: int = 1, memory: bool = True
+) -> ScaleResult:
+    """Generate the dataset of ``scale`` under ``data_dir`` and benchmark every stage."""
+    scale_dir = data_dir / f"scale-{scale:g}-seed-{seed}"
+    started = time.perf_counter()
+    spec = generate(scale_dir, scale, seed)
+    report = ScaleResult(spec=spec, generate_seconds=round(time.perf_counter() - started, 3))
+
+    def stage(name: str, fn: Callable[[], T]) -> T:
+        result, seconds, peak = measure(fn, repeat, memory)
+        report.stages.append(StageResult(name, round(seconds, 6), peak, _rows(result)))
+        return result
+
+    for data_type in DataType:
+        stage(
+            f"load_raw[{data_type.value}]",
+            lambda data_type=data_type: CSVAdapter(scale_dir).load(data_type, raw=True),
+        )
+    for data_type in DataType:
+        stage(
+            f"clean_data[{data_type.value}]",
+            lambda data_type=data_type: clean_frame(CSVAdapter(scale_dir), data_type),
+        )
+    for data_type in DataType:
+        stage(
+            f"load[{data_type.value}]",
+            lambda data_type=data_type: CSVAdapter(scale_dir).load(data_type),
+        )
+
+    analyzer = stage("data_analyzer", lambda: DataAnylizer(CSVAdapter(scale_dir)))
+    for analysis in SERVED_ANALYSES:
+        frame = stage(
+            f"analysis[{analysis.value}]", lambda analysis=analysis: analyzer.compute(analysis)
+        )
+        stage(f"df_to_response[{analysis.value}]", lambda frame=frame: df_to_response(frame))
+
+    report.max_rss_bytes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return report
+
+
+def format_bytes(value: Optional[int]) -> str:
+    if value is None:
+        return "-"
+    size = float(value)
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(size) < 1024 or unit == "GiB":
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+def format_report(report: ScaleResult) -> str:
+    spec = report.spec
+    lines = [
+        f"scale {spec.scale:g}: {spec.recipes} recipes, {spec.interactions} interactions "
+        f"(generated in {report.generate_seconds:.1f}s)",
+        f"{'stage':<48} {'seconds':>10} {'peak memory':>12} {'rows':>10}",
+    ]
+    for stage in report.stages:
+        rows = "-" if stage.rows is None else str(stage.rows)
+        lines.append(
+            f"{stage.name:<48} {stage.seconds:>10.4f} {format_bytes(stage.peak_bytes):>12} "
+            f"{rows:>10}"
+        )
+    lines.append(f"{'max RSS':<48} {'':>10} {format_bytes(report.max_rss_bytes):>12}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--scales",
+        type=float,
+        nargs="+",
+        default=list(DEFAULT_SCALES),
+        help="dataset sizes relative to Food.com (1 = 231k recipes, 1.1M interactions)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=1, help="timed runs per stage")
+    parser.add_argument(
+        "--memory",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="measure peak memory in an extra traced run per stage",
+    )
+    parser.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR)
+    parser.add_argument("--output", type=Path, help="also write the results as JSON")
+    args = parser.parse_args()
+
+    reports = []
+    for scale in args.scales:
+        report = run_scale(args.data_dir, scale, args.seed, args.repeat, args.memory)
+        print(format_report(report), end="\n\n", flush=True)
+        reports.append(report)
+
+    if args.output is not None:
+        args.output.write_text(json.dumps({"scales": [asdict(r) for r in reports]}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
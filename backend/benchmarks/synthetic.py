@@ -0,0 +1,289 @@
+"""Deterministic generator of Food.com-shaped raw tables.
+
+Writes ``RAW_recipes.csv`` and ``RAW_interactions.csv`` with the columns of the
+Kaggle dataset and distributions close to it: contributors, reviewers and
+recipe popularity follow truncated power laws, tags are drawn from a skewed
+vocabulary, review lengths are log-normal and dates span 1999-2018. Row counts
+are a ``scale`` factor of the real dataset, so ``scale=1`` matches Food.com and
+``scale=0.01`` gives a quick smoke-sized copy. The same ``seed`` and ``scale``
+always produce byte-identical files.
+"""
+
+import argparse
+import json
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+from service.layers.infrastructure.csv_adapter import CSVAdapter
+from service.layers.infrastructure.types import DataType
+
+# Size of the Kaggle Food.com dataset, i.e. ``scale=1``.
+FOOD_COM_RECIPES = 231_637
+FOOD_COM_INTERACTIONS = 1_132_367
+FOOD_COM_CONTRIBUTORS = 27_926
+FOOD_COM_REVIEWERS = 226_570
+
+# Power-law exponents fitted on the real tables (share of the top contributor,
+# top reviewer and most reviewed recipe).
+CONTRIBUTOR_EXPONENT = 0.7
+REVIEWER_EXPONENT = 0.7
+POPULARITY_EXPONENT = 0.55
+TAG_EXPONENT = 1.1
+
+FIRST_SUBMISSION = pd.Timestamp("1999-08-06")
+LAST_DATE = pd.Timestamp("2018-12-20")
+# Reviews arrive a few years after the recipe on average.
+REVIEW_DELAY_DAYS = 900
+
+RATINGS = np.array([0, 1, 2, 3, 4, 5])
+RATING_WEIGHTS = np.array([0.055, 0.012, 0.012, 0.036, 0.165, 0.72])
+EMPTY_REVIEW_SHARE = 0.00015
+
+# Tags present on almost every Food.com recipe, then the most frequent others.
+CORE_TAGS = ("preparation", "time-to-make", "course")
+COMMON_TAGS = tuple("""
+    main-ingredient dietary easy occasion low-in-something cuisine 60-minutes-or-less
+    15-minutes-or-less 30-minutes-or-less 4-hours-or-less 3-steps-or-less meat vegetables
+    north-american taste-mood equipment low-carb main-dish desserts healthy low-sodium
+    low-cholesterol number-of-servings side-dishes american low-calorie holiday-event eggs-dairy
+    vegetarian beginner-cook inexpensive weeknight poultry fruit pasta-rice-and-grains breakfast
+    european low-fat chicken appetizers oven baking cookies-and-brownies sauces breads
+    """.split())
+TAG_VOCABULARY_SIZE = 550
+
+WORDS = (
+    "great recipe easy made this delicious family loved added used will make again "
+    "really good little bit more less time next instead sauce cheese chicken flavor "
+    "perfect thanks posting followed exactly oven minutes cooked served with salad "
+    "rice pasta garlic onion butter sugar flour baked tasty simple quick kids husband "
+    "dinner lunch breakfast sweet spicy fresh definitely keeper wonderful nice"
+).split()
+
+# Distinct texts generated once and sampled per row, so large scales stay fast.
+TEXT_POOL_SIZE = 5_000
+CHUNK_ROWS = 200_000
+
+
+@dataclass(frozen=True)
+class SyntheticSpec:
+    """Row and entity counts of a synthetic dataset."""
+
+    scale: float
+    seed: int
+    recipes: int
+    interactions: int
+    contributors: int
+    reviewers: int
+
+    @classmethod
+    def at_scale(cls, scale: float, seed: int = 0) -> "SyntheticSpec":
+        if scale <= 0:
+            raise ValueError(f"scale must be positive, got {scale}")
+
+        def count(base: int) -> int:
+            return max(1, round(base * scale))
+
+        return cls(
+            scale=scale,
+            seed=seed,
+            recipes=count(FOOD_COM_RECIPES),
+            interactions=count(FOOD_COM_INTERACTIONS),
+            contributors=count(FOOD_COM_CONTRIBUTORS),
+            reviewers=count(FOOD_COM_REVIEWERS),
+        )
+
+
+def power_law_ranks(rng: np.random.Generator, n: int, size: int, exponent: float) -> np.ndarray:
+    """Ranks in ``[0, n)`` drawn from a truncated power law ``P(k) ~ k^-exponent``.
+
+    Uses the inverse CDF of the continuous law, so it needs no per-rank table
+    and works for the hundreds of millions of rows of large scales.
+    """
+    u = rng.random(size)
+    if exponent == 1:
+        x = np.power(n + 1.0, u)
+    else:
+        top = np.power(n + 1.0, 1 - exponent) - 1
+        x = np.power(1 + u * top, 1 / (1 - exponent))
+    return np.minimum(x.astype(np.int64) - 1, n - 1)
+
+
+def scatter(ranks: np.ndarray, n: int) -> np.ndarray:
+    """Map popularity ranks to ids so popular entities are spread over the id range."""
+    step = 7_919  # prime: a bijection on [0, n) whenever n is not a multiple of it
+    if n % step == 0:
+        step = 7_907
+    return (ranks * step) % n
+
+
+def _list_literal(items: list) -> str:
+    return "[" + ", ".join(repr(item) for item in items) + "]"
+
+
+class _TextPools:
+    """Texts sampled by the row generators, built once per dataset."""
+
+    def __init__(self, rng: np.random.Generator):
+        words = np.array(WORDS)
+        vocabulary = list(CORE_TAGS + COMMON_TAGS)
+        vocabulary += [f"tag-{i}" for i in range(TAG_VOCABULARY_SIZE - len(vocabulary))]
+        tag_count = len(vocabulary) - len(CORE_TAGS)
+
+        def sentence(n_words: int) -> str:
+            return " ".join(rng.choice(words, n_words))
+
+        self.names = [sentence(int(rng.integers(2, 7))) for _ in range(TEXT_POOL_SIZE)]
+        self.descriptions = [
+            sentence(int(rng.lognormal(3.2, 0.6))) if rng.random() > 0.02 else ""
+            for _ in range(TEXT_POOL_SIZE)
+        ]
+
+        self.tags = []
+        for _ in range(TEXT_POOL_SIZE):
+            n_tags = int(rng.poisson(14))
+            picked = power_law_ranks(rng, tag_count, n_tags, TAG_EXPONENT) + len(CORE_TAGS)
+            tags = list(CORE_TAGS) + [vocabulary[i] for i in dict.fromkeys(picked.tolist())]
+            self.tags.append(_list_literal(tags))
+
+        self.steps = []
+        self.n_steps = np.empty(TEXT_POOL_SIZE, dtype=np.int64)
+        self.ingredients = []
+        self.n_ingredients = np.empty(TEXT_POOL_SIZE, dtype=np.int64)
+        for i in range(TEXT_POOL_SIZE):
+            n_steps = max(1, int(rng.poisson(9)))
+            self.steps.append(
+                _list_literal([sentence(int(rng.integers(3, 15))) for _ in range(n_steps)])
+            )
+            self.n_steps[i] = n_steps
+            n_ingredients = max(1, int(rng.poisson(9)))
+            self.ingredients.append(_list_literal(rng.choice(words, n_ingredients).tolist()))
+            self.n_ingredients[i] = n_ingredients
+
+        # Halves of reviews: two are joined per row.
+        lengths = np.maximum(1, rng.lognormal(2.9, 0.8, TEXT_POOL_SIZE).astype(int))
+        self.reviews = [sentence(int(n)).capitalize() + "." for n in lengths]
+
+
+def _submitted_days(recipe_ids: np.ndarray, spec: SyntheticSpec) -> np.ndarray:
+    # Recipe ids grow with submission dates, as on Food.com.
+    span = (LAST_DATE - FIRST_SUBMISSION).days - REVIEW_DELAY_DAYS // 3
+    return recipe_ids * span // spec.recipes
+
+
+def _days_to_dates(days: np.ndarray) -> np.ndarray:
+    return (FIRST_SUBMISSION + pd.to_timedelta(days, unit="D")).strftime("%Y-%m-%d").to_numpy()
+
+
+def _recipe_chunks(spec: SyntheticSpec, pools: _TextPools) -> Iterator[pd.DataFrame]:
+    for chunk, start in enumerate(range(0, spec.recipes, CHUNK_ROWS)):
+        rng = np.random.default_rng([spec.seed, 1, chunk])
+        ids = np.arange(start, min(start + CHUNK_ROWS, spec.recipes), dtype=np.int64)
+        size = len(ids)
+        pick = rng.integers(0, TEXT_POOL_SIZE, size=(5, size))
+        nutrition = np.round(rng.lognormal([5.7, 2.5, 3.0, 2.5, 2.5, 3.0, 2.0], 0.9, (size, 7)), 1)
+
+        yield pd.DataFrame(
+            {
+                "name": np.array(pools.names, dtype=object)[pick[0]],
+                "id": ids + 38,
+                "minutes": np.round(rng.lognormal(3.6, 1.0, size)).astype(np.int64),
+                "contributor_id": power_law_ranks(
+                    rng, spec.contributors, size, CONTRIBUTOR_EXPONENT
+                )
+                + 1_533,
+                "submitted": _days_to_dates(_submitted_days(ids, spec)),
+                "tags": np.array(pools.tags, dtype=object)[pick[1]],
+                "nutrition": [_list_literal(row) for row in nutrition.tolist()],
+                "n_steps": pools.n_steps[pick[2]],
+                "steps": np.array(pools.steps, dtype=object)[pick[2]],
+                "description": np.array(pools.descriptions, dtype=object)[pick[3]],
+                "ingredients": np.array(pools.ingredients, dtype=object)[pick[4]],
+                "n_ingredients": pools.n_ingredients[pick[4]],
+            }
+        )
+
+
+def _interaction_chunks(spec: SyntheticSpec, pools: _TextPools) -> Iterator[pd.DataFrame]:
+    last_day = (LAST_DATE - FIRST_SUBMISSION).days
+    for chunk, start in enumerate(range(0, spec.interactions, CHUNK_ROWS)):
+        rng = np.random.default_rng([spec.seed, 2, chunk])
+        size = min(CHUNK_ROWS, spec.interactions - start)
+        recipes = scatter(
+            power_law_ranks(rng, spec.recipes, size, POPULARITY_EXPONENT), spec.recipes
+        )
+        users = scatter(
+            power_law_ranks(rng, spec.reviewers, size, REVIEWER_EXPONENT), spec.reviewers
+        )
+        delay = rng.exponential(REVIEW_DELAY_DAYS, size).astype(np.int64)
+        days = np.minimum(_submitted_days(recipes, spec) + delay, last_day)
+        # Two pooled halves per review keep texts (nearly) unique, as on Food.com.
+        halves = np.array(pools.reviews, dtype=object)[rng.integers(0, TEXT_POOL_SIZE, (2, size))]
+        reviews = halves[0] + " " + halves[1]
+        reviews[rng.random(size) < EMPTY_REVIEW_SHARE] = None
+
+        yield pd.DataFrame(
+            {
+                "user_id": users + 1_533,
+                "recipe_id": recipes + 38,
+                "date": _days_to_dates(days),
+                "rating": rng.choice(RATINGS, size, p=RATING_WEIGHTS),
+                "review": reviews,
+            }
+        )
+
+
+def _write(path: Path, chunks: Iterator[pd.DataFrame]) -> int:
+    rows = 0
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", newline="") as fh:
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(fh, header=i == 0, index=False)
+            rows += len(chunk)
+    tmp.replace(path)
+    return rows
+
+
+def generate(data_dir: Path, scale: float, seed: int = 0) -> SyntheticSpec:
+    """Write the raw tables of a synthetic dataset to ``data_dir``.
+
+    Generation is skipped when ``data_dir`` already holds the same dataset,
+    as recorded in its ``synthetic.json`` manifest.
+    """
+    spec = SyntheticSpec.at_scale(scale, seed)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    manifest = data_dir / "synthetic.json"
+    raw_paths = [data_dir / CSVAdapter.RAW_FILE_MAP[t] for t in DataType]
+    if (
+        manifest.exists()
+        and json.loads(manifest.read_text()) == asdict(spec)
+        and all(p.exists() for p in raw_paths)
+    ):
+        return spec
+
+    manifest.unlink(missing_ok=True)
+    pools = _TextPools(np.random.default_rng([seed, 0]))
+    _write(data_dir / CSVAdapter.RAW_FILE_MAP[DataType.RECIPES], _recipe_chunks(spec, pools))
+    _write(
+        data_dir / CSVAdapter.RAW_FILE_MAP[DataType.INTERACTIONS],
+        _interaction_chunks(spec, pools),
+    )
+    manifest.write_text(json.dumps(asdict(spec), indent=2))
+    return spec
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("data_dir", type=Path)
+    parser.add_argument("--scale", type=float, default=1.0, help="1 = Food.com size")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    spec = generate(args.data_dir, args.scale, args.seed)
+    print(json.dumps(asdict(spec), indent=2))
+
+
+if __name__ == "__main__":
+    main()
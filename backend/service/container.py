@@ -1,12 +1,54 @@
+from functools import partial
+
 from dependency_injector import containers, providers
 
+from service.layers.api.admission import AdmissionController
+from service.layers.api.metrics import MetricsRegistry
+from service.layers.api.response_cache import ResponseCache
+from service.layers.application.dataset_refresh import DatasetRefresher
+from service.layers.application.executor import AnalysisExecutor, resolve_pool_size
+from service.layers.application.jobs import JobManager
 from service.layers.application.mange_ta_main import DataAnylizer
+from service.layers.application.memory import MemoryGovernor, resolve_budget
+from service.layers.application.readiness import Readiness
+from service.layers.domain.mange_ta_main import (
+    ADMISSION_MAX_CONCURRENT,
+    ANALYSIS_POOL_WORKERS,
+    DATA_DIR,
+    MEMORY_BUDGET_MB,
+    MEMORY_PRESSURE_RATIO,
+    RESPONSE_CACHE_MAX_BYTES,
+    SNAPSHOT_POLL_SECONDS,
+)
 from service.layers.infrastructure.csv_adapter import CSVAdapter
 
 
 class Container(containers.DeclarativeContainer):
-    csv_adapter = providers.Singleton(CSVAdapter)
+    readiness = providers.Singleton(Readiness)
+    csv_adapter = providers.Singleton(
+        CSVAdapter, data_dir=DATA_DIR, on_phase=readiness.provided.enter
+    )
     data_analyzer = providers.Singleton(DataAnylizer, csv_adapter=csv_adapter)
+    response_cache = providers.Singleton(ResponseCache, max_bytes=RESPONSE_CACHE_MAX_BYTES)
+    analysis_executor = providers.Singleton(
+        AnalysisExecutor,
+        workers=providers.Callable(resolve_pool_size, ANALYSIS_POOL_WORKERS),
+    )
+    dataset_refresher = providers.Singleton(
+        DatasetRefresher, adapter=csv_adapter, poll_seconds=SNAPSHOT_POLL_SECONDS
+    )
+    job_manager = providers.Singleton(
+        JobManager,
+        adapter_factory=providers.Object(partial(CSVAdapter, data_dir=DATA_DIR)),
+        on_success=dataset_refresher.provided.request_refresh,
+    )
+    admission = providers.Singleton(AdmissionController, max_concurrent=ADMISSION_MAX_CONCURRENT)
+    metrics = providers.Singleton(MetricsRegistry)
+    memory_governor = providers.Singleton(
+        MemoryGovernor,
+        budget_bytes=providers.Callable(resolve_budget, MEMORY_BUDGET_MB),
+        pressure_ratio=MEMORY_PRESSURE_RATIO,
+    )
 
 
 container = Container()
@@ -0,0 +1,239 @@
+import asyncio
+import itertools
+import math
+import threading
+import time
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass, field
+from enum import IntEnum
+from typing import Any, AsyncIterator, Optional
+
+from fastapi.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from service.layers.logger import struct_logger
+
+
+class CostClass(IntEnum):
+    """Request cost classes; lower values are scheduled first."""
+
+    INTERACTIVE = 0
+    BULK = 1
+
+
+@dataclass(frozen=True)
+class ClassBudget:
+    concurrency: int
+    max_queue: int
+    queue_timeout: float
+
+
+DEFAULT_BUDGETS: dict[CostClass, ClassBudget] = {
+    CostClass.INTERACTIVE: ClassBudget(concurrency=8, max_queue=64, queue_timeout=10.0),
+    CostClass.BULK: ClassBudget(concurrency=2, max_queue=8, queue_timeout=30.0),
+}
+
+# Smoothing factor of the per-class service time average used for Retry-After.
+SERVICE_TIME_ALPHA = 0.2
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be queued or waited too long for a slot."""
+
+    def __init__(self, cost_class: CostClass, reason: str, retry_after: int):
+        super().__init__(f"{cost_class.name.lower()} {reason}")
+        self.cost_class = cost_class
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class SlotLease:
+    """An admitted slot, released when its ``slot`` block exits unless held longer."""
+
+    def __init__(self) -> None:
+        self.until: Optional[asyncio.Future] = None
+
+    def hold_until(self, future: asyncio.Future) -> None:
+        """Keep the slot taken until ``future`` completes, past the ``slot`` block."""
+        self.until = future
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    cost_class: CostClass = field(compare=False)
+    loop: asyncio.AbstractEventLoop = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    granted: bool = field(default=False, compare=False)
+
+
+class AdmissionController:
+    """Bounded, prioritised admission of requests by cost class.
+
+    Every class has its own concurrency cap, queue length and queue deadline,
+    and all classes share ``max_concurrent`` slots. When a slot frees up the
+    highest priority waiter whose class is under its cap gets it, so a burst
+    of bulk exports queues behind interactive analyses
+    instead of in front of them. Requests that would overflow a queue, or that
+    wait past the deadline, are rejected with a ``Retry-After`` estimate
+    derived from the class' recent service time.
+
+    Slots may be released from any thread (streamed bodies finish in the
+    threadpool), hence the lock rather than asyncio-only state.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 8,
+        budgets: Optional[dict[CostClass, ClassBudget]] = None,
+    ):
+        self.max_concurrent = max_concurrent
+        self.budgets = dict(DEFAULT_BUDGETS if budgets is None else budgets)
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        self._waiters: list[_Waiter] = []
+        self._running = {cost_class: 0 for cost_class in self.budgets}
+        self._service_time = {cost_class: 1.0 for cost_class in self.budgets}
+        self._admitted = {cost_class: 0 for cost_class in self.budgets}
+        self._rejected = {cost_class: 0 for cost_class in self.budgets}
+
+    def _has_capacity(self, cost_class: CostClass) -> bool:
+        return (
+            sum(self._running.values()) < self.max_concurrent
+            and self._running[cost_class] < self.budgets[cost_class].concurrency
+        )
+
+    def _queued(self, cost_class: CostClass) -> int:
+        return sum(1 for w in self._waiters if w.cost_class == cost_class)
+
+    def retry_after(self, cost_class: CostClass) -> int:
+        budget = self.budgets[cost_class]
+        backlog = self._queued(cost_class) + 1
+        return max(
+            1, math.ceil(self._service_time[cost_class] * backlog / max(budget.concurrency, 1))
+        )
+
+    def _reject(self, cost_class: CostClass, reason: str) -> AdmissionRejected:
+        self._rejected[cost_class] += 1
+        error = AdmissionRejected(cost_class, reason, self.retry_after(cost_class))
+        struct_logger.warning(
+            "admission_rejected",
+            cost_class=cost_class.name.lower(),
+            reason=reason,
+            retry_after=error.retry_after,
+        )
+        return error
+
+    async def acquire(self, cost_class: CostClass) -> None:
+        budget = self.budgets[cost_class]
+        with self._lock:
+            # Queued waiters always lack capacity, so a request that has some
+            # cannot be jumping ahead of an equal or higher priority one.
+            if self._has_capacity(cost_class):
+                self._running[cost_class] += 1
+                self._admitted[cost_class] += 1
+                return
+            if self._queued(cost_class) >= budget.max_queue:
+                raise self._reject(cost_class, "queue full")
+            loop = asyncio.get_running_loop()
+            waiter = _Waiter(
+                int(cost_class), next(self._seq), cost_class, loop, loop.create_future()
+            )
+            self._waiters.append(waiter)
+            self._waiters.sort()
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), budget.queue_timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                if waiter.granted:
+                    return
+                self._waiters.remove(waiter)
+                raise self._reject(cost_class, "queue timeout") from None
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter.granted:
+                    self._release_locked(cost_class)
+                else:
+                    self._waiters.remove(waiter)
+            raise
+
+    def release(self, cost_class: CostClass, elapsed: Optional[float] = None) -> None:
+        with self._lock:
+            if elapsed is not None:
+                previous = self._service_time[cost_class]
+                self._service_time[cost_class] = (
+                    1 - SERVICE_TIME_ALPHA
+                ) * previous + SERVICE_TIME_ALPHA * elapsed
+            self._release_locked(cost_class)
+
+    def _release_locked(self, cost_class: CostClass) -> None:
+        self._running[cost_class] -= 1
+        for waiter in list(self._waiters):
+            if not self._has_capacity(waiter.cost_class):
+                continue
+            self._waiters.remove(waiter)
+            waiter.granted = True
+            self._running[waiter.cost_class] += 1
+            self._admitted[waiter.cost_class] += 1
+            waiter.loop.call_soon_threadsafe(_resolve, waiter.future)
+            if sum(self._running.values()) >= self.max_concurrent:
+                break
+
+    @asynccontextmanager
+    async def slot(self, cost_class: CostClass) -> AsyncIterator[SlotLease]:
+        await self.acquire(cost_class)
+        started = time.perf_counter()
+        lease = SlotLease()
+        try:
+            yield lease
+        finally:
+            if lease.until is None or lease.until.done():
+                self.release(cost_class, time.perf_counter() - started)
+            else:
+                lease.until.add_done_callback(
+                    lambda _: self.release(cost_class, time.perf_counter() - started)
+                )
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            return {
+                cost_class.name.lower(): {
+                    "running": self._running[cost_class],
+                    "queued": self._queued(cost_class),
+                    "admitted": self._admitted[cost_class],
+                    "rejected": self._rejected[cost_class],
+                    "service_time_s": round(self._service_time[cost_class], 3),
+                    **asdict(budget),
+                }
+                for cost_class, budget in self.budgets.items()
+            }
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class AdmittedStreamingResponse(StreamingResponse):
+    """Streaming response holding an already acquired admission slot until it is sent.
+
+    The slot is released when sending ends for any reason, including a body
+    that is never iterated because the client left, the first send failed or
+    the request task was cancelled.
+    """
+
+    def __init__(
+        self, content: Any, admission: AdmissionController, cost_class: CostClass, **kwargs: Any
+    ):
+        super().__init__(content, **kwargs)
+        self.admission = admission
+        self.cost_class = cost_class
+        self._started = time.perf_counter()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.admission.release(self.cost_class, time.perf_counter() - self._started)
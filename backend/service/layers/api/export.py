@@ -0,0 +1,91 @@
+import io
+import zlib
+from typing import Iterable, Iterator
+
+import pandas as pd
+
+try:  # optional: Parquet exports are served only when the package is installed
+    import pyarrow as pa  # type: ignore[import-not-found]
+    import pyarrow.parquet as pq  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - depends on the environment
+    pa = None
+    pq = None
+
+# Rows per Parquet row group: each one is encoded, sent and released in turn.
+PARQUET_ROW_GROUP_ROWS = 100_000
+
+GZIP_LEVEL = 6
+
+
+def parquet_available() -> bool:
+    return pq is not None
+
+
+def iter_gzip(body: Iterable[bytes], level: int = GZIP_LEVEL) -> Iterator[bytes]:
+    """Compress a streamed ``body`` into a gzip file, chunk by chunk."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in body:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file collecting what the Parquet writer emits until it is drained."""
+
+    def __init__(self):
+        super().__init__()
+        self._parts: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _parquet_schema(df: pd.DataFrame) -> "pa.Schema":
+    """Arrow schema of the whole ``df``, not of its first row group only.
+
+    Object columns carry no type of their own: it is inferred from all their
+    values (a column of nulls only is written as strings), so a column empty
+    at the top of the frame cannot be typed in a way later rows contradict.
+    """
+    schema = pa.Schema.from_pandas(df.head(0), preserve_index=False)
+    for i, (_, column) in enumerate(df.items()):
+        if column.dtype == object:
+            inferred = pa.infer_type(column.to_numpy(), from_pandas=True)
+            if pa.types.is_null(inferred):
+                inferred = pa.string()
+            schema = schema.set(i, schema.field(i).with_type(inferred))
+    return schema
+
+
+def iter_parquet(df: pd.DataFrame, row_group_rows: int = PARQUET_ROW_GROUP_ROWS) -> Iterator[bytes]:
+    """Encode ``df`` as a Parquet file one row group at a time.
+
+    Only the row group being written is converted to Arrow, so an export
+    holds a slice of the served frame rather than a full copy.
+    """
+    if pq is None:
+        raise RuntimeError("Parquet export requires pyarrow")
+    sink = _ChunkSink()
+    schema = _parquet_schema(df)
+    with pq.ParquetWriter(sink, schema) as writer:
+        for start in range(0, len(df), row_group_rows):
+            chunk = df.iloc[start : start + row_group_rows]
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            yield sink.drain()
+    yield sink.drain()
@@ -0,0 +1,49 @@
+import hashlib
+from typing import Iterable, Optional
+
+from fastapi import Request, Response
+
+from service.layers.domain.mange_ta_main import CACHE_MAX_AGE_SECONDS
+
+
+def make_etag(dataset_version: str, route: str, params: Iterable[tuple[str, str]] = ()) -> str:
+    """Weak ETag for a route's output on a given dataset version.
+
+    Outputs are deterministic for a dataset version, so the tag is derived from
+    the version, the route and its sorted query parameters only, without
+    looking at the payload. It is weak because the same tag covers every
+    ``Content-Encoding`` of the representation.
+    """
+    key = "&".join(f"{k}={v}" for k, v in sorted(params))
+    digest = hashlib.sha1(f"{route}?{key}".encode()).hexdigest()[:16]
+    return f'W/"{dataset_version}-{digest}"'
+
+
+def request_etag(request: Request, dataset_version: str) -> str:
+    return make_etag(dataset_version, request.url.path, request.query_params.multi_items())
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(",")
+    )
+
+
+def cache_headers(etag: str) -> dict[str, str]:
+    return {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={CACHE_MAX_AGE_SECONDS}, must-revalidate",
+        "Vary": "Accept-Encoding",
+    }
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """A ``304`` response if the client already holds ``etag``, else ``None``."""
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=cache_headers(etag))
+    return None
@@ -1,50 +1,534 @@
+import asyncio
+import json
 import os
+import secrets
+import time
+from contextlib import nullcontext
+from datetime import date
+from functools import partial
+from typing import Awaitable, Callable, Coroutine, Iterable, Iterator, Optional
 
+import anyio
 import numpy as np
 import pandas as pd
 import psutil
-from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field
 
-from service.layers.application.data_cleaning import clean_data
-from service.layers.application.mange_ta_main import AnalysisType, DataAnylizer
-from service.layers.domain.mange_ta_main import SERVICE_PREFIX
-from service.layers.infrastructure.csv_adapter import CSVAdapter
-from service.layers.infrastructure.types import DataType
-from service.layers.logger import struct_logger
+from service.layers.api.admission import (
+    AdmissionController,
+    AdmissionRejected,
+    AdmittedStreamingResponse,
+    CostClass,
+)
+from service.layers.api.export import iter_gzip, iter_parquet, parquet_available
+from service.layers.api.http_cache import cache_headers, not_modified, request_etag
+from service.layers.api.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from service.layers.api.metrics import MetricsRegistry
+from service.layers.api.response_cache import IDENTITY, EncodedResponse, ResponseCache
+from service.layers.application.data_query import (
+    QueryError,
+    QueryResult,
+    RowQuery,
+    select_rows,
+)
+from service.layers.application.dataset_refresh import DatasetRefresher
+from service.layers.application.executor import (
+    AnalysisAbandoned,
+    AnalysisCancelled,
+    AnalysisExecutor,
+    AnalysisTimeout,
+)
+from service.layers.application.explain import explain_call
+from service.layers.application.jobs import JobManager, JobQueueFull
+from service.layers.application.mange_ta_main import (
+    ANALYSIS_DEPENDENCIES,
+    SERVED_ANALYSES,
+    AnalysisType,
+    DataAnylizer,
+)
+from service.layers.application.memory import MemoryBudgetExceeded, MemoryGovernor
+from service.layers.application.profiling import (
+    DEFAULT_INTERVAL_SECONDS,
+    ProfilerBusy,
+    profile_call,
+)
+from service.layers.application.readiness import Readiness
+from service.layers.domain.mange_ta_main import DEBUG_TOKEN, SERVICE_PREFIX
+from service.layers.infrastructure.types import DataType, ExportFormat, ResponseFormat
+from service.layers.logger import logging_stats, span, struct_logger
 
 router: APIRouter = APIRouter(prefix="/" + SERVICE_PREFIX)
 
+STREAM_CHUNK_ROWS = 10_000
+
+# Row queries up to this size are scheduled with the dashboard analyses.
+INTERACTIVE_ROW_LIMIT = 1_000
+
+# Parameterless analysis routes, precomputed when a new dataset is swapped in.
+ANALYSIS_ROUTES: dict[str, AnalysisType] = {
+    "most-recipes-contributors": AnalysisType.NUMBER_RECIPES,
+    "best-ratings-contributors": AnalysisType.BEST_RECIPES,
+    "duration-distribution": AnalysisType.DURATION_DISTRIBUTION,
+    "duration-vs-recipe-count": AnalysisType.DURATION_VS_RECIPE_COUNT,
+    "top-10-percent-contributors": AnalysisType.TOP_10_PERCENT_CONTRIBUTORS,
+    "user-segments": AnalysisType.USER_SEGMENTS,
+    "top-tags-by-segment": AnalysisType.TOP_TAGS_BY_SEGMENT,
+    "rating-distribution": AnalysisType.RATING_DISTRIBUTION,
+    "rating-vs-recipes": AnalysisType.RATING_VS_RECIPES,
+    "review-overview": AnalysisType.REVIEW_OVERVIEW,
+    "review-distribution": AnalysisType.REVIEW_DISTRIBUTION,
+    "top-reviewers": AnalysisType.REVIEWER_ACTIVITY,
+    "review-trend": AnalysisType.REVIEW_TEMPORAL_TREND,
+    "reviews-vs-rating": AnalysisType.REVIEWS_VS_RATING,
+    "reviewer-vs-recipes": AnalysisType.REVIEWER_VS_RECIPES,
+}
+
+STREAM_MEDIA_TYPES = {
+    ResponseFormat.JSON: "application/json",
+    ResponseFormat.NDJSON: "application/x-ndjson",
+    ResponseFormat.CSV: "text/csv",
+}
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.CSV_GZIP: "application/gzip",
+    ExportFormat.PARQUET: "application/vnd.apache.parquet",
+}
+
+
+def get_metrics(request: Request) -> MetricsRegistry:
+    return request.app.state.container.metrics()
+
+
+def get_readiness(request: Request) -> Readiness:
+    return request.app.state.container.readiness()
+
 
 def get_data_analyzer(request: Request) -> DataAnylizer:
+    """The served analyzer; ``503`` with ``Retry-After`` while the dataset is still loading."""
+    readiness = get_readiness(request)
+    if not readiness.ready:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=readiness.snapshot(),
+            headers={"Retry-After": str(readiness.retry_after())},
+        )
     return request.app.state.container.data_analyzer()
 
 
-def df_to_response(df: pd.DataFrame) -> list[dict]:
-    if df.empty:
-        return []
+def get_response_cache(request: Request) -> ResponseCache:
+    return request.app.state.container.response_cache()
+
+
+def get_analysis_executor(request: Request) -> AnalysisExecutor:
+    return request.app.state.container.analysis_executor()
+
+
+def get_dataset_refresher(request: Request) -> DatasetRefresher:
+    return request.app.state.container.dataset_refresher()
+
+
+def get_job_manager(request: Request) -> JobManager:
+    return request.app.state.container.job_manager()
+
 
+def get_admission(request: Request) -> AdmissionController:
+    return request.app.state.container.admission()
+
+
+def get_memory_governor(request: Request) -> MemoryGovernor:
+    return request.app.state.container.memory_governor()
+
+
+def rejected_response(e: AdmissionRejected) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail=f"Server busy ({e}), retry later.",
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+
+def memory_rejected_response(e: MemoryBudgetExceeded) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail=f"Not enough memory ({e}), retry later.",
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+
+def load_cost_class(query: RowQuery) -> CostClass:
+    """Small pages and samples are interactive; full or filtered dumps are bulk."""
+    sizes = [n for n in (query.limit, query.sample) if n is not None]
+    if sizes and min(sizes) <= INTERACTIVE_ROW_LIMIT:
+        return CostClass.INTERACTIVE
+    return CostClass.BULK
+
+
+def _sanitize_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Return a copy of ``df`` with inf/NaN replaced by JSON-friendly values."""
     df = df.replace([np.inf, -np.inf], np.nan)
 
     for col in df.columns:
         if pd.api.types.is_numeric_dtype(df[col]):
             df[col] = df[col].fillna(0)
-        elif pd.api.types.is_categorical_dtype(df[col]):  # type: ignore[attr-defined]
-            df[col] = df[col].cat.add_categories([""]).fillna("")
+        elif isinstance(df[col].dtype, pd.CategoricalDtype):
+            if "" not in df[col].cat.categories:
+                df[col] = df[col].cat.add_categories([""])
+            df[col] = df[col].fillna("")
         else:
             df[col] = df[col].fillna("")
 
-    result = df.to_dict(orient="records")
+    return df
+
+
+def df_to_response(df: pd.DataFrame) -> list[dict]:
+    if df.empty:
+        return []
+
+    result = _sanitize_frame(df).to_dict(orient="records")
     return result
 
 
+def iter_frame_chunks(
+    df: pd.DataFrame, chunk_size: int = STREAM_CHUNK_ROWS
+) -> Iterator[pd.DataFrame]:
+    """Yield sanitized row slices of ``df`` so only one chunk is copied at a time."""
+    for start in range(0, len(df), chunk_size):
+        yield _sanitize_frame(df.iloc[start : start + chunk_size])
+
+
+def iter_encoded_rows(
+    df: pd.DataFrame,
+    response_format: ResponseFormat,
+    chunk_size: int = STREAM_CHUNK_ROWS,
+) -> Iterator[bytes]:
+    """Encode ``df`` chunk by chunk as a JSON array, NDJSON lines or CSV."""
+    if response_format == ResponseFormat.JSON:
+        yield b"["
+
+    for index, chunk in enumerate(iter_frame_chunks(df, chunk_size)):
+        match response_format:
+            case ResponseFormat.NDJSON:
+                payload = chunk.to_json(orient="records", lines=True, force_ascii=False)
+                yield (payload.rstrip("\n") + "\n").encode("utf-8")
+            case ResponseFormat.CSV:
+                yield chunk.to_csv(index=False, header=index == 0).encode("utf-8")
+            case _:
+                records = chunk.to_json(orient="records", force_ascii=False)[1:-1]
+                prefix = "," if index > 0 else ""
+                yield (prefix + records).encode("utf-8")
+
+    if response_format == ResponseFormat.CSV and df.empty:
+        yield df.to_csv(index=False).encode("utf-8")
+    if response_format == ResponseFormat.JSON:
+        yield b"]"
+
+
+def stream_frame(
+    df: pd.DataFrame,
+    response_format: ResponseFormat,
+    filename: str,
+    total: Optional[int] = None,
+    response_class: Callable[..., StreamingResponse] = StreamingResponse,
+) -> StreamingResponse:
+    headers = {"X-Total-Count": str(len(df) if total is None else total)}
+    if response_format == ResponseFormat.CSV:
+        headers["Content-Disposition"] = f'attachment; filename="{filename}.csv"'
+    return response_class(
+        iter_encoded_rows(df, response_format),
+        media_type=STREAM_MEDIA_TYPES[response_format],
+        headers=headers,
+    )
+
+
+def iter_export(df: pd.DataFrame, export_format: ExportFormat) -> Iterator[bytes]:
+    """Encode ``df`` as a downloadable file, streamed chunk by chunk."""
+    match export_format:
+        case ExportFormat.PARQUET:
+            return iter_parquet(df)
+        case ExportFormat.CSV_GZIP:
+            return iter_gzip(iter_encoded_rows(df, ResponseFormat.CSV))
+        case _:
+            return iter_encoded_rows(df, ResponseFormat.CSV)
+
+
+def render_json(df: pd.DataFrame) -> bytes:
+    return bytes(JSONResponse(df_to_response(df)).body)
+
+
+def render_batch(version: str, entries: dict[str, EncodedResponse]) -> bytes:
+    """JSON body of a batch, splicing in the rendered JSON of each analysis."""
+    results = b",".join(
+        json.dumps(route).encode() + b":" + entry.bodies[IDENTITY]
+        for route, entry in entries.items()
+    )
+    return b'{"version":' + json.dumps(version).encode() + b',"results":{' + results + b"}}"
+
+
+async def gather_or_cancel(coroutines: Iterable[Coroutine]) -> None:
+    """Run ``coroutines`` concurrently; the first failure cancels the others."""
+    tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+
+def analysis_cache_key(path: str, params: tuple, version: str) -> tuple:
+    return (path, params, ResponseFormat.JSON, version)
+
+
+def warm_analyses(data_analyzer: DataAnylizer, response_cache: ResponseCache) -> None:
+    """Precompute every analysis route of ``data_analyzer`` into the response cache."""
+    for route, analysis_type in ANALYSIS_ROUTES.items():
+        body = render_json(data_analyzer.process_data(analysis_type))
+        key = analysis_cache_key(f"/{SERVICE_PREFIX}/{route}", (), data_analyzer.version)
+        response_cache.put(key, EncodedResponse.build(body, "application/json"))
+    struct_logger.info("analyses_warmed", version=data_analyzer.version)
+
+
+def require_debug_token(x_debug_token: Optional[str] = Header(default=None)) -> None:
+    if not DEBUG_TOKEN:
+        raise HTTPException(status_code=404, detail="Debug routes are disabled (DEBUG_TOKEN unset)")
+    if x_debug_token is None or not secrets.compare_digest(x_debug_token, DEBUG_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid X-Debug-Token")
+
+
+def explain_requested(
+    explain: bool = Query(
+        False, description="Recompute and return per-stage timings, rows and allocations"
+    ),
+    x_debug_token: Optional[str] = Header(default=None),
+) -> bool:
+    """``explain`` is a debug feature: it needs the ``X-Debug-Token`` of the debug routes."""
+    if explain:
+        require_debug_token(x_debug_token)
+    return explain
+
+
+async def explained_response(
+    request: Request, data_analyzer: DataAnylizer, analysis_type: AnalysisType
+) -> Response:
+    """Recompute an analysis recording its stages; never cached, as timings are per run.
+
+    Like a profile, it is admitted as bulk work and runs alone (``409`` otherwise).
+    """
+    try:
+        async with get_admission(request).slot(CostClass.BULK):
+            with (
+                get_memory_governor(request).reserve(analysis_type),
+                span("compute", analysis=analysis_type.value, explain=True),
+            ):
+                df_result, report = await anyio.to_thread.run_sync(
+                    partial(
+                        explain_call,
+                        partial(data_analyzer.compute, analysis_type),
+                        name=str(analysis_type),
+                    )
+                )
+            with span("serialize", analysis=analysis_type.value):
+                records = await anyio.to_thread.run_sync(df_to_response, df_result)
+    except AdmissionRejected as e:
+        raise rejected_response(e) from e
+    except MemoryBudgetExceeded as e:
+        raise memory_rejected_response(e) from e
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e)) from e
+    struct_logger.info(
+        "analysis_explained",
+        analysis=analysis_type,
+        seconds=report["seconds"],
+        stages=len(report["stages"]),
+    )
+    return JSONResponse({"explain": report, "data": records}, headers={"Cache-Control": "no-store"})
+
+
+async def compute_entry(
+    request: Request,
+    data_analyzer: DataAnylizer,
+    analysis_type: AnalysisType,
+    event: Optional[str] = None,
+    compute: Optional[Callable[[], Awaitable[pd.DataFrame]]] = None,
+) -> tuple[pd.DataFrame, EncodedResponse]:
+    """Compute an analysis missing from the response cache and encode its JSON.
+
+    The computation (through the analysis executor unless ``compute`` is
+    given) is admitted as interactive work and, unless the result is
+    precomputed, within the memory budget; serialization runs in the
+    threadpool, so the event loop stays free for other requests. When the
+    request gives up on an analysis still computing, its slot is released
+    only once the computation ends.
+    """
+    metrics = get_metrics(request)
+    executor = get_analysis_executor(request)
+    pooled = compute is None and executor.workers > 0
+    if compute is None:
+        compute = partial(
+            executor.run, data_analyzer, analysis_type, is_disconnected=request.is_disconnected
+        )
+    # Precomputed results are served without new allocations.
+    reservation = (
+        get_memory_governor(request).reserve(analysis_type)
+        if data_analyzer.precomputed(analysis_type) is None
+        else nullcontext()
+    )
+    async with get_admission(request).slot(CostClass.INTERACTIVE) as lease:
+        started = time.perf_counter()
+        try:
+            with (
+                reservation,
+                span("compute", analysis=analysis_type.value, pool=pooled),
+            ):
+                df_result = await compute()
+        except AnalysisAbandoned as e:
+            # Work still running keeps using a CPU: admission keeps counting it.
+            if e.running is not None:
+                lease.hold_until(e.running)
+            raise
+        computed = time.perf_counter()
+        metrics.analysis_duration.observe(
+            computed - started, analysis=analysis_type, phase="compute"
+        )
+        if event:
+            struct_logger.info(event, rows=len(df_result))
+        with span("serialize", analysis=analysis_type.value, rows=len(df_result)):
+            body = await anyio.to_thread.run_sync(render_json, df_result)
+            entry = await anyio.to_thread.run_sync(EncodedResponse.build, body, "application/json")
+        metrics.analysis_duration.observe(
+            time.perf_counter() - computed, analysis=analysis_type, phase="serialize"
+        )
+    return df_result, entry
+
+
+async def analysis_response(
+    request: Request,
+    data_analyzer: DataAnylizer,
+    analysis_type: AnalysisType,
+    event: Optional[str] = None,
+    explain: bool = False,
+) -> Response:
+    """Serve an analysis with an ETag, answering ``If-None-Match`` without computing.
+
+    The rendered JSON is kept pre-compressed in the response cache, so repeated
+    requests for the same dataset version skip both computation and encoding;
+    misses are computed by ``compute_entry``. With ``explain`` the analysis
+    is recomputed by ``explained_response``.
+    """
+    if explain:
+        return await explained_response(request, data_analyzer, analysis_type)
+    metrics = get_metrics(request)
+    etag = request_etag(request, data_analyzer.version)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        metrics.analysis_responses.inc(analysis=analysis_type, cache="not_modified")
+        return cached
+
+    response_cache = get_response_cache(request)
+    key = analysis_cache_key(
+        request.url.path,
+        tuple(sorted(request.query_params.multi_items())),
+        data_analyzer.version,
+    )
+    entry = response_cache.get(key)
+    metrics.analysis_responses.inc(analysis=analysis_type, cache="miss" if entry is None else "hit")
+    if entry is None:
+        try:
+            _, entry = await compute_entry(request, data_analyzer, analysis_type, event=event)
+        except AdmissionRejected as e:
+            raise rejected_response(e) from e
+        except MemoryBudgetExceeded as e:
+            raise memory_rejected_response(e) from e
+        except AnalysisTimeout as e:
+            raise HTTPException(status_code=504, detail=str(e)) from e
+        except AnalysisCancelled:
+            return Response(status_code=499)
+        response_cache.put(key, entry)
+
+    return entry.to_response(request.headers.get("accept-encoding"), cache_headers(etag))
+
+
 @router.get("/health")
-async def health():
+async def health(readiness: Readiness = Depends(get_readiness)):
+    # Answers while the dataset loads; only a failed load makes the process unhealthy.
+    if readiness.failed:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "failed", "error": readiness.error},
+        )
     return {"status": "ok"}
 
 
+@router.get("/ready")
+async def ready(readiness: Readiness = Depends(get_readiness)):
+    """Loading phase and progress; ``200`` once analyses can be served, ``503`` before."""
+    snapshot = readiness.snapshot()
+    if readiness.ready:
+        return snapshot
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content=snapshot,
+        headers={"Retry-After": str(readiness.retry_after())},
+    )
+
+
+@router.get("/metrics")
+async def get_metrics_text(request: Request):
+    """Prometheus metrics; values owned by other components are read at scrape time."""
+    metrics = get_metrics(request)
+    container = request.app.state.container
+
+    cache = container.response_cache().stats()
+    metrics.cache_requests.set(cache["hits"], result="hit")
+    metrics.cache_requests.set(cache["misses"], result="miss")
+    lookups = cache["hits"] + cache["misses"]
+    metrics.cache_hit_ratio.set(cache["hits"] / lookups if lookups else 0.0)
+    metrics.cache_bytes.set(cache["bytes"])
+
+    for cost_class, stats in container.admission().stats().items():
+        metrics.admission_running.set(stats["running"], cost_class=cost_class)
+        metrics.admission_queued.set(stats["queued"], cost_class=cost_class)
+
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    metrics.threadpool_busy.set(limiter.borrowed_tokens)
+    metrics.threadpool_queued.set(limiter.statistics().tasks_waiting)
+
+    memory = await anyio.to_thread.run_sync(container.memory_governor().stats)
+    if memory["budget_bytes"] is not None:
+        metrics.memory_budget.set(memory["budget_bytes"])
+    metrics.memory_usage.set(memory["usage_bytes"])
+    for account, nbytes in memory["holdings_bytes"].items():
+        metrics.memory_held.set(nbytes, account=account)
+    metrics.memory_rejected.set(memory["rejected"])
+    for cache, count in memory["evictions"].items():
+        metrics.memory_evictions.set(count, cache=cache)
+
+    logs = logging_stats()
+    metrics.log_dropped.set(logs["dropped"])
+    metrics.log_queued.set(logs["queued"])
+
+    readiness = get_readiness(request)
+    metrics.dataset_load_percent.set(readiness.percent)
+    if readiness.ready:
+        data_analyzer = container.data_analyzer()
+        sizes = await anyio.to_thread.run_sync(data_analyzer.frame_memory)
+        for table, nbytes in sizes.items():
+            metrics.frame_bytes.set(nbytes, table=table)
+        flights = data_analyzer.single_flight.stats()
+        metrics.single_flight_in_flight.set(flights["in_flight"])
+        for result in ("executions", "coalesced", "abandoned"):
+            metrics.single_flight_calls.set(flights[result], result=result)
+
+    return Response(content=metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+
 @router.get("/debug/memory")
 def get_memory_info(
     data_analyzer: DataAnylizer = Depends(get_data_analyzer),
+    governor: MemoryGovernor = Depends(get_memory_governor),
 ):
     process = psutil.Process(os.getpid())
     memory_info = process.memory_info()
@@ -60,164 +544,571 @@ def get_memory_info(
         ),
         "df_recipes_shape": df_recipes.shape,
         "df_interactions_shape": df_interactions.shape,
+        "governor": governor.stats(),
     }
 
 
+@router.get("/debug/profile", dependencies=[Depends(require_debug_token)])
+async def profile_analysis(
+    request: Request,
+    analysis: AnalysisType = Query(..., description="Analysis to run under the profiler"),
+    interval: float = Query(DEFAULT_INTERVAL_SECONDS, ge=0.0005, le=0.1),
+    format: str = Query("report", pattern="^(report|speedscope)$"),
+    data_analyzer: DataAnylizer = Depends(get_data_analyzer),
+):
+    """Recompute an analysis under a sampling profiler and tracemalloc.
+
+    Bypasses the precomputed results and caches so the profile covers the
+    actual computation. ``format=speedscope`` returns only the profile, to
+    open in https://www.speedscope.app.
+    """
+    if analysis not in SERVED_ANALYSES:
+        raise HTTPException(status_code=400, detail=f"{analysis} is not a served analysis")
+
+    try:
+        async with get_admission(request).slot(CostClass.BULK):
+            df_result, report = await anyio.to_thread.run_sync(
+                partial(
+                    profile_call,
+                    partial(data_analyzer.compute, analysis),
+                    name=f"{analysis}@{data_analyzer.version}",
+                    interval=interval,
+                )
+            )
+    except AdmissionRejected as e:
+        raise rejected_response(e) from e
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e)) from e
+
+    struct_logger.info(
+        "analysis_profiled",
+        analysis=analysis,
+        seconds=report["seconds"],
+        peak_bytes=report["memory"]["peak_bytes"],
+    )
+    if format == "speedscope":
+        return JSONResponse(
+            report["speedscope"],
+            headers={"Content-Disposition": f'attachment; filename="{analysis}.speedscope.json"'},
+        )
+    return {"analysis": analysis, "rows": len(df_result), **report}
+
+
+@router.get("/debug/single-flight")
+def get_single_flight_stats(
+    data_analyzer: DataAnylizer = Depends(get_data_analyzer),
+):
+    return data_analyzer.single_flight.stats()
+
+
+@router.get("/dataset")
+def get_dataset_status(
+    refresher: DatasetRefresher = Depends(get_dataset_refresher),
+    data_analyzer: DataAnylizer = Depends(get_data_analyzer),
+):
+    return {
+        **refresher.status(),
+        "version": data_analyzer.version,
+        "snapshots": {
+            data_type.value: {
+                "current": refresher.adapter.version(data_type),
+                "available": refresher.adapter.snapshots(data_type),
+            }
+            for data_type in (DataType.RECIPES, DataType.INTERACTIONS)
+        },
+    }
+
+
+@router.post("/reload-data", status_code=status.HTTP_202_ACCEPTED)
+def reload_data(refresher: DatasetRefresher = Depends(get_dataset_refresher)):
+    refresher.request_refresh()
+    return refresher.status()
+
+
+@router.get("/debug/admission")
+def get_admission_stats(request: Request):
+    return get_admission(request).stats()
+
+
 @router.get("/load-data")
-def get_data(
+async def get_data(
+    request: Request,
     data_type: DataType = Query(DataType.RECIPES),
+    response_format: ResponseFormat = Query(ResponseFormat.JSON, alias="format"),
+    columns: Optional[list[str]] = Query(None),
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[int] = Query(None, ge=0),
+    contributor_id: Optional[str] = Query(None),
+    user_id: Optional[str] = Query(None),
+    recipe_id: Optional[str] = Query(None),
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    min_rating: Optional[float] = Query(None),
+    max_rating: Optional[float] = Query(None),
+    sample: Optional[int] = Query(None, ge=1),
+    seed: int = Query(0),
     data_analyzer: DataAnylizer = Depends(get_data_analyzer),
 ):
-    df_recipes, df_interactions = data_analyzer.get_raw_data()
-
     match data_type:
-        case DataType.RECIPES:
-            return df_to_response(df_recipes)
-        case DataType.INTERACTIONS:
-            return df_to_response(df_interactions)
+        case DataType.RECIPES | DataType.INTERACTIONS:
+            df = data_analyzer.get_frame(data_type)
         case _:
             raise HTTPException(
                 status_code=400,
                 detail=f"Unknown data_type: {data_type}. Must be 'recipes' or 'interactions'.",
             )
 
+    etag = request_etag(request, data_analyzer.version)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+
+    query = RowQuery(
+        columns=[c for value in columns for c in value.split(",") if c] if columns else None,
+        offset=offset,
+        limit=limit,
+        cursor=cursor,
+        contributor_id=contributor_id,
+        user_id=user_id,
+        recipe_id=recipe_id,
+        date_from=date_from,
+        date_to=date_to,
+        min_rating=min_rating,
+        max_rating=max_rating,
+        sample=sample,
+        seed=seed,
+    )
+
+    admission = get_admission(request)
+    cost_class = load_cost_class(query)
+    try:
+        await admission.acquire(cost_class)
+    except AdmissionRejected as e:
+        raise rejected_response(e) from e
+
+    def select() -> QueryResult:
+        index = data_analyzer.get_index(data_type) if query.has_filters else None
+        return select_rows(df, data_type, query, index=index)
+
+    try:
+        with span("query", data_type=data_type.value, filtered=query.has_filters):
+            result = await anyio.to_thread.run_sync(select)
+    except QueryError as e:
+        admission.release(cost_class)
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except BaseException:
+        admission.release(cost_class)
+        raise
+
+    # The slot is held until the body has been streamed out.
+    response = stream_frame(
+        result.frame,
+        response_format,
+        filename=data_type.value,
+        total=result.total,
+        response_class=partial(
+            AdmittedStreamingResponse, admission=admission, cost_class=cost_class
+        ),
+    )
+    response.headers.update(cache_headers(etag))
+    if result.next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(result.next_cursor)
+    return response
+
+
+@router.get("/export")
+async def export_data(
+    request: Request,
+    data_type: DataType = Query(DataType.RECIPES),
+    export_format: ExportFormat = Query(ExportFormat.CSV, alias="format"),
+    columns: Optional[list[str]] = Query(None),
+    data_analyzer: DataAnylizer = Depends(get_data_analyzer),
+):
+    """Download a whole dataset as a CSV, gzipped CSV or Parquet file.
+
+    The file is encoded chunk by chunk from the served frame while it is sent,
+    as bulk work holding its admission slot until the body is streamed out.
+    """
+    if export_format == ExportFormat.PARQUET and not parquet_available():
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Parquet export requires pyarrow (install the 'parquet' extra).",
+        )
+    df = data_analyzer.get_frame(data_type)
+
+    etag = request_etag(request, data_analyzer.version)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+
+    query = RowQuery(
+        columns=[c for value in columns for c in value.split(",") if c] if columns else None
+    )
+    try:
+        frame = select_rows(df, data_type, query).frame
+    except QueryError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    admission = get_admission(request)
+    try:
+        await admission.acquire(CostClass.BULK)
+    except AdmissionRejected as e:
+        raise rejected_response(e) from e
+
+    struct_logger.info("export_started", data_type=data_type, format=export_format, rows=len(frame))
+    filename = f"{data_type.value}_{data_analyzer.version}.{export_format.value}"
+    return AdmittedStreamingResponse(
+        iter_export(frame, export_format),
+        admission=admission,
+        cost_class=CostClass.BULK,
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Total-Count": str(len(frame)),
+            **cache_headers(etag),
+        },
+    )
+
+
+class BatchRequest(BaseModel):
+    analyses: list[str] = Field(
+        ..., min_length=1, description="Analysis routes, e.g. rating-distribution"
+    )
+
+
+@router.post("/batch")
+async def get_batch(
+    request: Request,
+    batch: BatchRequest,
+    data_analyzer: DataAnylizer = Depends(get_data_analyzer),
+):
+    """Serve several analysis routes in one response: ``{"version", "results": {route: rows}}``.
+
+    Analyses share the response cache of their GET routes: cached ones are
+    spliced in as rendered, the others are computed concurrently. An
+    analysis derived from another one of the batch (``ANALYSIS_DEPENDENCIES``)
+    is computed from that result instead of from the frames, unless it is
+    precomputed. The encoded
+    batch is cached too, so a page asking for the same set again is served
+    as is.
+    """
+    routes = list(dict.fromkeys(batch.analyses))
+    unknown = [route for route in routes if route not in ANALYSIS_ROUTES]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown analyses: {', '.join(unknown)}")
+
+    metrics = get_metrics(request)
+    response_cache = get_response_cache(request)
+    accept_encoding = request.headers.get("accept-encoding")
+    headers = {"Vary": "Accept-Encoding"}
+    batch_key = analysis_cache_key(request.url.path, tuple(routes), data_analyzer.version)
+    cached = response_cache.get(batch_key)
+    if cached is not None:
+        return cached.to_response(accept_encoding, headers)
+
+    keys = {
+        route: analysis_cache_key(f"/{SERVICE_PREFIX}/{route}", (), data_analyzer.version)
+        for route in routes
+    }
+    entries: dict[str, EncodedResponse] = {}
+    for route in routes:
+        entry = response_cache.get(keys[route])
+        metrics.analysis_responses.inc(
+            analysis=ANALYSIS_ROUTES[route], cache="miss" if entry is None else "hit"
+        )
+        if entry is not None:
+            entries[route] = entry
+
+    missing = {ANALYSIS_ROUTES[route]: route for route in routes if route not in entries}
+    derived = {
+        a
+        for a in missing
+        if ANALYSIS_DEPENDENCIES.get(a) in missing and data_analyzer.precomputed(a) is None
+    }
+    frames: dict[AnalysisType, pd.DataFrame] = {}
+
+    async def compute(analysis_type: AnalysisType) -> None:
+        derive = None
+        if analysis_type in derived:
+            dependency = frames[ANALYSIS_DEPENDENCIES[analysis_type]]
+            derive = partial(
+                anyio.to_thread.run_sync, data_analyzer.derive, analysis_type, dependency
+            )
+        frames[analysis_type], entry = await compute_entry(
+            request, data_analyzer, analysis_type, compute=derive
+        )
+        route = missing[analysis_type]
+        entries[route] = response_cache.put(keys[route], entry)
+
+    try:
+        with span("batch", analyses=len(routes), missing=len(missing)):
+            # Dependencies first, then the analyses derived from their results.
+            await gather_or_cancel(compute(a) for a in missing if a not in derived)
+            await gather_or_cancel(compute(a) for a in derived)
+    except AdmissionRejected as e:
+        raise rejected_response(e) from e
+    except MemoryBudgetExceeded as e:
+        raise memory_rejected_response(e) from e
+    except AnalysisTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e)) from e
+    except AnalysisCancelled:
+        return Response(status_code=499)
+
+    body = render_batch(data_analyzer.version, {route: entries[route] for route in routes})
+    entry = await anyio.to_thread.run_sync(EncodedResponse.build, body, "application/json")
+    return response_cache.put(batch_key, entry).to_response(accept_encoding, headers)
+
 
 @router.get("/most-recipes-contributors")
-def get_number_recipes(
+async def get_number_recipes(
+    request: Request,
     data_analyzer: DataAnylizer = Depends(get_data_analyzer),
+    explain: bool = Depends(explain_requested),
 ):
-    df_result = data_analyzer.process_data(AnalysisType.NUMBER_RECIPES)
-    return df_to_response(df_result)
+    return await analysis_response(
+        request, data_analyzer, AnalysisType.NUMBER_RECIPES, explain=explain
+    )
 
 
 @router.get("/best-ratings-contributors")
-def get_best_contributors(
+async def get_best_contributors(
+    request: Request,
     data_analyzer: DataAnylizer = Depends(get_data_analyzer),
+    explain: bool = Depends(explain_requested),
 ):
-    df_best = data_analyzer.process_data(AnalysisType.BEST_RECIPES)
-    struct_logger.info("best_ratings_contributors", rows=len(df_best))
-    return df_to_response(df_best)
+    return await analysis_response(
+        request,
+        data_analyzer,
+        AnalysisType.BEST_RECIPES,
+        event="best_ratings_contributors",
+        explain=explain,
+    )
+
+
+@router.post("/clean-raw-data", status_code=status.HTTP_202_ACCEPTED)
+def clean_raw_data_endpoint(
+    data_type: DataType,
+    job_manager: JobManager = Depends(get_job_manager),
+) -> dict[str, str]:
+    try:
+        job = job_manager.submit(data_type)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "60"}) from e
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/{SERVICE_PREFIX}/jobs/{job.id}",
+    }
+
+
+@router.get("/jobs")
+def list_jobs(job_manager: JobManager = Depends(get_job_manager)) -> list[dict]:
+    return [job.to_dict() for job in job_manager.jobs()]
+
+
+@router.get("/jobs/{job_id}")
+def get_job(job_id: str, job_manager: JobManager = Depends(get_job_manager)) -> dict:
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job.to_dict()
 
 
-@router.post("/clean-raw-data")
-def clean_raw_data_endpoint(data_type: DataType) -> dict[str, str | int]:
-    csv_adapter = CSVAdapter()
-    df_cleaned = clean_data(csv_adapter, data_type)
-    return {"status": "success", "rows": len(df_cleaned)}
+@router.delete("/jobs/{job_id}")
+def cancel_job(job_id: str, job_manager: JobManager = Depends(get_job_manager)) -> dict:
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job.to_dict()
 
 
 @router.get("/duration-distribution")
-def get_duration_distribution(
+async def get_duration_distribution(
+    request: Request,
     data_analyzer: DataAnylizer = Depends(get_data_analyzer),
+    explain: bool = Depends(explain_requested),
 ):
-    df_result = data_analyzer.process_data(AnalysisType.DURATION_DISTRIBUTION)
-    struct_logger.info("duration_distribution", rows=len(df_result))
-    return df_to_response(df_result)
+    return await analysis_response(
+        request,
+        data_analyzer,
+        AnalysisType.DURATION_DISTRIBUTION,
+        event="duration_distribution",
+        explain=explain,
+    )
 
 
 @router.get("/duration-vs-recipe-count")
-def get_duration_vs_recipe_count(
+async def get_duration_vs_recipe_count(
+    request: Request,
     data_analyzer: DataAnylizer = Depends(get_data_analyzer),
+    explain: bool = Depends(explain_requested),
 ):
-    df_result = data_analyzer.process_data(AnalysisType.DURATION_VS_RECIPE_COUNT)
-    struct_logger.info("duration_vs_recipe_count", rows=len(df_result))
-    return df_to_response(df_result)
+    return await analysis_response(
+        request,
+        data_analyzer,
+        AnalysisType.DURATION_VS_RECIPE_COUNT,
+        event="duration_vs_recipe_count",
+        explain=explain,
+    )
 
 
 @router.get("/top-10-percent-contributors")
-def get_top_10_percent_contributors(
+async def get_top_10_percent_contributors(
+    request: Request,
     data_analyzer: DataAnylizer = Depends(get_data_analyzer),
+    explain: bool = Depends(explain_requested),
 ):
-    df_result = data_analyzer.process_data(AnalysisType.TOP_10_PERCENT_CONTRIBUTORS)
-    struct_logger.info("top_10_percent_contributors", rows=len(df_result))
-    return df_to_response(df_result)
+    return await analysis_response(
+        request,
+        data_analyzer,
+        AnalysisType.TOP_10_PERCENT_CONTRIBUTORS,
+        event="top_10_percent_contributors",
+        explain=explain,
+    )
 
 
 @router.get("/user-segments")
-def get_user_segments(
+async def get_user_segments(
+    request: Request,
     data_analyzer: DataAnylizer = Depends(get_data_analyzer),
+    explain: bool = Depends(explain_requested),
 ):
-    df_result = data_analyzer.process_data(AnalysisType.USER_SEGMENTS)
-    struct_logger.info("user_segments", rows=len(df_result))
-    return df_to_response(df_result)
+    return await analysis_response(
+        request, data_analyzer, AnalysisType.USER_SEGMENTS, event="user_segments", explain=explain
+    )
 
 
 @router.get("/top-tags-by-segment")
-def get_top_tags_by_segment(
+async def get_top_tags_by_segment(
+    request: Request,
     data_analyzer: DataAnylizer = Depends(get_data_analyzer),
+    explain: bool = Depends(explain_requested),
 ):
-    df_result = data_analyzer.process_data(AnalysisType.TOP_TAGS_BY_SEGMENT)
-    struct_logger.info("top_tags_by_segment", rows=len(df_result))
-    return df_to_response(df_result)
+    return await analysis_response(
+        request,
+        data_analyzer,
+        AnalysisType.TOP_TAGS_BY_SEGMENT,
+        event="top_tags_by_segment",
+        explain=explain,
+    )
 
 
 @router.get("/rating-distribution")
-def get_rating_distribution(
+async def get_rating_distribution(
+    request: Request,
     data_analyzer: DataAnylizer = Depends(get_data_analyzer),
+    explain: bool = Depends(explain_requested),
 ):
-    df_result = data_analyzer.process_data(AnalysisType.RATING_DISTRIBUTION)
-    struct_logger.info("rating_distribution", rows=len(df_result))
-    return df_to_response(df_result)
+    return await analysis_response(
+        request,
+        data_analyzer,
+        AnalysisType.RATING_DISTRIBUTION,
+        event="rating_distribution",
+        explain=explain,
+    )
 
 
 @router.get("/rating-vs-recipes")
-def get_rating_vs_recipes(
+async def get_rating_vs_recipes(
+    request: Request,
     data_analyzer: DataAnylizer = Depends(get_data_analyzer),
+    explain: bool = Depends(explain_requested),
 ):
-    df_result = data_analyzer.process_data(AnalysisType.RATING_VS_RECIPES)
-    struct_logger.info("rating_vs_recipes", rows=len(df_result))
-    return df_to_response(df_result)
+    return await analysis_response(
+        request,
+        data_analyzer,
+        AnalysisType.RATING_VS_RECIPES,
+        event="rating_vs_recipes",
+        explain=explain,
+    )
 
 
 @router.get("/review-overview")
-def get_review_overview(
+async def get_review_overview(
+    request: Request,
     data_analyzer: DataAnylizer = Depends(get_data_analyzer),
+    explain: bool = Depends(explain_requested),
 ):
-    df_result = data_analyzer.process_data(AnalysisType.REVIEW_OVERVIEW)
-    struct_logger.info("review_overview", rows=len(df_result))
-    return df_to_response(df_result)
+    return await analysis_response(
+        request,
+        data_analyzer,
+        AnalysisType.REVIEW_OVERVIEW,
+        event="review_overview",
+        explain=explain,
+    )
 
 
 @router.get("/review-distribution")
-def get_review_distribution(
+async def get_review_distribution(
+    request: Request,
     data_analyzer: DataAnylizer = Depends(get_data_analyzer),
+    explain: bool = Depends(explain_requested),
 ):
-    df_result = data_analyzer.process_data(AnalysisType.REVIEW_DISTRIBUTION)
-    struct_logger.info("review_distribution", rows=len(df_result))
-    return df_to_response(df_result)
+    return await analysis_response(
+        request,
+        data_analyzer,
+        AnalysisType.REVIEW_DISTRIBUTION,
+        event="review_distribution",
+        explain=explain,
+    )
 
 
 @router.get("/top-reviewers")
-def get_top_reviewers(
+async def get_top_reviewers(
+    request: Request,
     data_analyzer: DataAnylizer = Depends(get_data_analyzer),
+    explain: bool = Depends(explain_requested),
 ):
-    df_result = data_analyzer.process_data(AnalysisType.REVIEWER_ACTIVITY)
-    struct_logger.info("top_reviewers", rows=len(df_result))
-    return df_to_response(df_result)
+    return await analysis_response(
+        request,
+        data_analyzer,
+        AnalysisType.REVIEWER_ACTIVITY,
+        event="top_reviewers",
+        explain=explain,
+    )
 
 
 @router.get("/review-trend")
-def get_review_trend(
+async def get_review_trend(
+    request: Request,
     data_analyzer: DataAnylizer = Depends(get_data_analyzer),
+    explain: bool = Depends(explain_requested),
 ):
-    df_result = data_analyzer.process_data(AnalysisType.REVIEW_TEMPORAL_TREND)
-    struct_logger.info("review_trend", rows=len(df_result))
-    return df_to_response(df_result)
+    return await analysis_response(
+        request,
+        data_analyzer,
+        AnalysisType.REVIEW_TEMPORAL_TREND,
+        event="review_trend",
+        explain=explain,
+    )
 
 
 @router.get("/reviews-vs-rating")
-def get_reviews_vs_rating(
+async def get_reviews_vs_rating(
+    request: Request,
     data_analyzer: DataAnylizer = Depends(get_data_analyzer),
+    explain: bool = Depends(explain_requested),
 ):
-    df_result = data_analyzer.process_data(AnalysisType.REVIEWS_VS_RATING)
-    struct_logger.info("reviews_vs_rating", rows=len(df_result))
-    return df_to_response(df_result)
+    return await analysis_response(
+        request,
+        data_analyzer,
+        AnalysisType.REVIEWS_VS_RATING,
+        event="reviews_vs_rating",
+        explain=explain,
+    )
 
 
 @router.get("/reviewer-vs-recipes")
-def get_reviewer_vs_recipes(
+async def get_reviewer_vs_recipes(
+    request: Request,
     data_analyzer: DataAnylizer = Depends(get_data_analyzer),
+    explain: bool = Depends(explain_requested),
 ):
-    df_result = data_analyzer.process_data(AnalysisType.REVIEWER_VS_RECIPES)
-    struct_logger.info("reviewer_vs_recipes", rows=len(df_result))
-    return df_to_response(df_result)
+    return await analysis_response(
+        request,
+        data_analyzer,
+        AnalysisType.REVIEWER_VS_RECIPES,
+        event="reviewer_vs_recipes",
+        explain=explain,
+    )
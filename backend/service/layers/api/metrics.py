@@ -0,0 +1,303 @@
+import bisect
+import math
+import threading
+import time
+from typing import Iterable, Optional, TypeVar
+
+from fastapi import Request
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Latency buckets in seconds, from cached responses to full recomputations.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Response size buckets in bytes, from 256 B to 64 MiB.
+SIZE_BUCKETS = tuple(256 * 4**i for i in range(10))
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    """A metric family in the Prometheus text format, one value per label set."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: dict[LabelValues, float] = {}
+
+    def _key(self, labels: dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            return [
+                f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in sorted(self._values.items())
+            ]
+
+    def render(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+            *self.samples(),
+        ]
+
+
+class Counter(Metric):
+    """Monotonic total; ``set`` mirrors a total already counted elsewhere."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        with self._lock:
+            key = self._key(labels)
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        with self._lock:
+            key = self._key(labels)
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """Cumulative bucket counts, sum and count per label set."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [per-bucket counts (last one is +Inf), sum].
+        self._series: dict[LabelValues, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        with self._lock:
+            key = self._key(labels)
+            counts, total = self._series.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            total[0] += value
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return sum(series[0]) if series else 0
+
+    def samples(self) -> list[str]:
+        lines = []
+        with self._lock:
+            for key, (counts, total) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip((*self.buckets, math.inf), counts):
+                    cumulative += count
+                    labels = _format_labels((*self.labelnames, "le"), (*key, _format_value(bound)))
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.labelnames, key)
+                lines.append(f"{self.name}_sum{labels} {_format_value(total[0])}")
+                lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+M = TypeVar("M", bound=Metric)
+
+
+class MetricsRegistry:
+    """Service metrics, rendered in the Prometheus text exposition format.
+
+    Request and analysis metrics are recorded as requests are served; values
+    owned by other components (cache, admission, threadpool, frames) are
+    mirrored into their gauges when ``/metrics`` is scraped.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: list[Metric] = []
+        self.requests = self.counter(
+            "http_requests_total", "HTTP requests served.", ("route", "method", "status")
+        )
+        self.request_duration = self.histogram(
+            "http_request_duration_seconds",
+            "Time until the response body is sent.",
+            ("route", "method"),
+        )
+        self.response_size = self.histogram(
+            "http_response_size_bytes",
+            "Size of responses with a Content-Length.",
+            ("route",),
+            SIZE_BUCKETS,
+        )
+        self.in_flight = self.gauge("http_requests_in_flight", "Requests being served.")
+        self.analysis_duration = self.histogram(
+            "analysis_duration_seconds",
+            "Time spent computing or serializing an analysis on a response cache miss.",
+            ("analysis", "phase"),
+        )
+        self.analysis_responses = self.counter(
+            "analysis_responses_total",
+            "Analysis responses by cache outcome (hit, miss, not_modified).",
+            ("analysis", "cache"),
+        )
+        self.single_flight_calls = self.counter(
+            "single_flight_calls_total",
+            "Analysis calls of the served dataset, executed, coalesced or abandoned.",
+            ("result",),
+        )
+        self.single_flight_in_flight = self.gauge(
+            "single_flight_in_flight", "Analysis computations shared by concurrent callers."
+        )
+        self.cache_requests = self.counter(
+            "response_cache_requests_total", "Response cache lookups.", ("result",)
+        )
+        self.cache_hit_ratio = self.gauge(
+            "response_cache_hit_ratio", "Share of response cache lookups that hit."
+        )
+        self.cache_bytes = self.gauge("response_cache_bytes", "Bytes held by the response cache.")
+        self.admission_running = self.gauge(
+            "admission_running", "Admitted requests running, per cost class.", ("cost_class",)
+        )
+        self.admission_queued = self.gauge(
+            "admission_queued", "Requests waiting for admission, per cost class.", ("cost_class",)
+        )
+        self.threadpool_busy = self.gauge(
+            "threadpool_busy_threads", "Threadpool threads running sync work."
+        )
+        self.threadpool_queued = self.gauge(
+            "threadpool_queued_tasks", "Sync work waiting for a threadpool thread."
+        )
+        self.frame_bytes = self.gauge(
+            "dataframe_memory_bytes", "Deep memory usage of the served tables.", ("table",)
+        )
+        self.dataset_load_percent = self.gauge(
+            "dataset_load_percent", "Progress of the background dataset load."
+        )
+        self.memory_budget = self.gauge(
+            "memory_budget_bytes", "Memory the service may use (unset without a budget)."
+        )
+        self.memory_usage = self.gauge(
+            "memory_usage_bytes", "Memory charged to the container (or process tree RSS)."
+        )
+        self.memory_held = self.gauge(
+            "memory_held_bytes", "Bytes held by frames, indexes, results and caches.", ("account",)
+        )
+        self.memory_rejected = self.counter(
+            "memory_rejected_total", "Analyses rejected because they would exceed the budget."
+        )
+        self.memory_evictions = self.counter(
+            "memory_evictions_total", "Caches evicted under memory pressure.", ("cache",)
+        )
+        self.log_dropped = self.counter(
+            "log_records_dropped_total", "Log records dropped because the log queue was full."
+        )
+        self.log_queued = self.gauge("log_queue_records", "Log records waiting to be written.")
+
+    def _register(self, metric: M) -> M:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self._metrics for line in metric.render()) + "\n"
+
+
+def route_label(request: Request) -> str:
+    """Route template (``/mange_ta_main/jobs/{job_id}``) so label cardinality stays bounded."""
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware recording request counts, latency, size and in-flight requests.
+
+    A request is done once its last body chunk is sent: streamed responses
+    stay in flight, and are timed, until the whole body is out.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        container = getattr(scope["app"].state, "container", None)
+        metrics: Optional[MetricsRegistry] = container.metrics() if container is not None else None
+        if scope["type"] != "http" or metrics is None:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        length: Optional[str] = None
+
+        async def send_tracked(message: Message) -> None:
+            nonlocal status_code, length
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                length = Headers(raw=message["headers"]).get("content-length")
+            await send(message)
+
+        request = Request(scope)
+        metrics.in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_tracked)
+        finally:
+            metrics.in_flight.dec()
+            route = route_label(request)
+            metrics.request_duration.observe(
+                time.perf_counter() - started, route=route, method=request.method
+            )
+            metrics.requests.inc(route=route, method=request.method, status=str(status_code))
+            if length is not None:
+                metrics.response_size.observe(int(length), route=route)
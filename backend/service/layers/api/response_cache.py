@@ -0,0 +1,166 @@
+import gzip
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Hashable, Optional
+
+from fastapi import Response
+
+try:  # optional: served only when the package is installed
+    import brotli  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+try:  # optional: served only when the package is installed
+    import zstandard  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+
+IDENTITY = "identity"
+
+# Server preference when the client accepts several encodings equally.
+ENCODING_PREFERENCE = ("zstd", "br", "gzip", IDENTITY)
+
+MIN_COMPRESS_BYTES = 1024
+
+
+def compress_variants(body: bytes) -> dict[str, bytes]:
+    """Encode ``body`` once with every available codec (small bodies stay plain)."""
+    variants = {IDENTITY: body}
+    if len(body) < MIN_COMPRESS_BYTES:
+        return variants
+
+    variants["gzip"] = gzip.compress(body, compresslevel=6, mtime=0)
+    if brotli is not None:
+        variants["br"] = brotli.compress(body, quality=5)
+    if zstandard is not None:
+        variants["zstd"] = zstandard.ZstdCompressor(level=6).compress(body)
+    return variants
+
+
+def negotiate_encoding(accept_encoding: Optional[str], available: set[str]) -> str:
+    """Pick the preferred encoding allowed by an ``Accept-Encoding`` header."""
+    if not accept_encoding:
+        return IDENTITY
+
+    weights: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[token.strip().lower()] = q
+
+    def weight(encoding: str) -> float:
+        if encoding in weights:
+            return weights[encoding]
+        if encoding == IDENTITY:
+            return weights.get("*", 1.0) or 1.0
+        return weights.get("*", 0.0)
+
+    candidates = [e for e in ENCODING_PREFERENCE if e in available and weight(e) > 0]
+    if not candidates:
+        return IDENTITY
+    return max(candidates, key=lambda e: (weight(e), -ENCODING_PREFERENCE.index(e)))
+
+
+@dataclass
+class EncodedResponse:
+    """A fully rendered response body, kept in every supported encoding."""
+
+    media_type: str
+    bodies: dict[str, bytes] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, body: bytes, media_type: str) -> "EncodedResponse":
+        return cls(media_type=media_type, bodies=compress_variants(body))
+
+    @property
+    def nbytes(self) -> int:
+        return sum(len(b) for b in self.bodies.values())
+
+    def to_response(
+        self, accept_encoding: Optional[str], headers: Optional[dict[str, str]] = None
+    ) -> Response:
+        encoding = negotiate_encoding(accept_encoding, set(self.bodies))
+        response_headers = dict(headers or {})
+        if encoding != IDENTITY:
+            response_headers["Content-Encoding"] = encoding
+        return Response(
+            content=self.bodies[encoding],
+            media_type=self.media_type,
+            headers=response_headers,
+        )
+
+
+class ResponseCache:
+    """Thread-safe LRU of encoded responses, bounded by total stored bytes.
+
+    Keys are expected to contain the dataset version, so entries of an old
+    dataset simply age out once the version changes.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024**2):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, EncodedResponse] = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[EncodedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Hashable, entry: EncodedResponse) -> EncodedResponse:
+        if entry.nbytes > self.max_bytes:
+            return entry
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.nbytes -= previous.nbytes
+            self._entries[key] = entry
+            self.nbytes += entry.nbytes
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+                self.evictions += 1
+        return entry
+
+    def trim(self, nbytes: int) -> int:
+        """Evict least recently used entries until ``nbytes`` are released; return the bytes freed."""
+        freed = 0
+        with self._lock:
+            while self._entries and freed < nbytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+                self.evictions += 1
+                freed += evicted.nbytes
+        return freed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.nbytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
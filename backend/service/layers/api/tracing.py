@@ -0,0 +1,58 @@
+from fastapi import Request
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from service.layers.api.metrics import route_label
+from service.layers.logger import SPAN_KIND_SERVER, bind_request, new_request_id, span
+
+REQUEST_ID_HEADER = "X-Request-ID"
+MAX_REQUEST_ID_LENGTH = 128
+
+
+def request_id_from(request: Request) -> str:
+    """The caller's ``X-Request-ID`` when it is a sane token, else a new id."""
+    given = request.headers.get(REQUEST_ID_HEADER, "")
+    if 0 < len(given) <= MAX_REQUEST_ID_LENGTH and given.isprintable() and " " not in given:
+        return given
+    return new_request_id()
+
+
+class RequestTracingMiddleware:
+    """ASGI middleware binding a request id to the logs and timing the request as a root span.
+
+    Spans opened while handling the request (compute, serialize, analysis
+    stages) nest under it, and the id is echoed in the ``X-Request-ID``
+    response header so a slow response can be matched with its trace. The
+    span ends once the last body chunk is sent, so streamed responses are
+    timed whole.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request = Request(scope)
+        request_id = request_id_from(request)
+        with (
+            bind_request(request_id),
+            span(
+                "http.request",
+                kind=SPAN_KIND_SERVER,
+                request_id=request_id,
+                **{"http.method": request.method, "url.path": request.url.path},
+            ) as root,
+        ):
+
+            async def send_with_request_id(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    MutableHeaders(scope=message)[REQUEST_ID_HEADER] = request_id
+                    root.set(**{"http.status_code": message["status"]})
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_request_id)
+            finally:
+                root.set(**{"http.route": route_label(request)})
@@ -13,7 +13,7 @@ Examples:
 
 import ast
 from enum import StrEnum
-from typing import Any, Hashable
+from typing import Any, Callable, Hashable, Optional
 
 import numpy as np
 import pandas as pd
@@ -21,6 +21,11 @@ import pandas as pd
 from service.layers.application.interfaces.interface import IDataAdapter
 from service.layers.infrastructure.types import DataType
 
+# Étapes du pipeline de nettoyage, dans l'ordre où elles sont rapportées.
+CLEANING_STAGES = ("load", "parse_lists", "remove_outliers", "normalize_ids", "save")
+
+ProgressCallback = Callable[[str, int], None]
+
 
 class DataTypes(StrEnum):
     """Types de données supportés par l'application.
@@ -141,7 +146,27 @@ def normalize_ids(df: pd.DataFrame, data_type: DataType) -> pd.DataFrame:
     return df
 
 
-def clean_data(csv_adapter: IDataAdapter, data_type: DataType) -> list[dict[Hashable, Any]]:
+def clean_frame(
+    csv_adapter: IDataAdapter,
+    data_type: DataType,
+    progress: Optional[ProgressCallback] = None,
+) -> pd.DataFrame:
+    """Nettoie et sauvegarde une table brute, puis renvoie le DataFrame nettoyé.
+
+    Args:
+        csv_adapter: Adapter utilisé pour lire la table brute et écrire le résultat
+        data_type: Table à nettoyer
+        progress: Appelé après chaque étape de ``CLEANING_STAGES`` avec le nom
+            de l'étape et le nombre de lignes à ce stade
+
+    Raises:
+        ValueError: Si le type de données n'est pas reconnu
+    """
+
+    def report(stage: str, frame: pd.DataFrame) -> None:
+        if progress is not None:
+            progress(stage, len(frame))
+
     match data_type:
         case DataType.RECIPES:
             df = csv_adapter.load(DataType.RECIPES, raw=True)
@@ -150,15 +175,19 @@ def clean_data(csv_adapter: IDataAdapter, data_type: DataType) -> list[dict[Hash
             df = csv_adapter.load(DataType.INTERACTIONS, raw=True)
         case _:
             raise ValueError(f"Unknown data type: {data_type}")
+    report("load", df)
 
     for col in df.columns:
         sample_val = df[col].dropna().iloc[0] if not df[col].dropna().empty else None
         if isinstance(sample_val, str) and sample_val.startswith('[') and sample_val.endswith(']'):
             df[col] = df[col].apply(lambda x: ast.literal_eval(x) if isinstance(x, str) else x)
+    report("parse_lists", df)
 
     df = remove_outliers(df)
+    report("remove_outliers", df)
 
     df = normalize_ids(df, data_type)
+    report("normalize_ids", df)
 
     df = df.astype(object)
     df = df.where(pd.notna(df), None)
@@ -168,5 +197,10 @@ def clean_data(csv_adapter: IDataAdapter, data_type: DataType) -> list[dict[Hash
             csv_adapter.save(df, DataType.RECIPES)
         case DataType.INTERACTIONS:
             csv_adapter.save(df, DataType.INTERACTIONS)
+    report("save", df)
 
-    return df.to_dict(orient="records")
+    return df
+
+
+def clean_data(csv_adapter: IDataAdapter, data_type: DataType) -> list[dict[Hashable, Any]]:
+    return clean_frame(csv_adapter, data_type).to_dict(orient="records")
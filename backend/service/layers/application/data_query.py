@@ -0,0 +1,173 @@
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from service.layers.infrastructure.indexes import QueryError, TableIndex
+from service.layers.infrastructure.types import DataType
+
+# Filter name -> indexed column, per table.
+FILTER_COLUMNS: dict[DataType, dict[str, str]] = {
+    DataType.RECIPES: {
+        "contributor_id": "contributor_id",
+        "recipe_id": "id",
+        "date": "submitted",
+    },
+    DataType.INTERACTIONS: {
+        "user_id": "user_id",
+        "recipe_id": "recipe_id",
+        "date": "date",
+        "rating": "rating",
+    },
+}
+
+
+@dataclass(frozen=True)
+class RowQuery:
+    columns: Optional[Sequence[str]] = None
+    offset: int = 0
+    limit: Optional[int] = None
+    cursor: Optional[int] = None
+    contributor_id: Optional[str] = None
+    user_id: Optional[str] = None
+    recipe_id: Optional[str] = None
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    min_rating: Optional[float] = None
+    max_rating: Optional[float] = None
+    sample: Optional[int] = None
+    seed: int = 0
+
+    @property
+    def has_filters(self) -> bool:
+        return any(
+            v is not None
+            for v in (
+                self.contributor_id,
+                self.user_id,
+                self.recipe_id,
+                self.date_from,
+                self.date_to,
+                self.min_rating,
+                self.max_rating,
+            )
+        )
+
+    @property
+    def is_full_scan(self) -> bool:
+        return (
+            not self.has_filters
+            and self.sample is None
+            and self.cursor is None
+            and self.offset == 0
+            and self.limit is None
+        )
+
+
+@dataclass(frozen=True)
+class QueryResult:
+    frame: pd.DataFrame
+    total: int
+    next_cursor: Optional[int]
+
+
+def _lookup(
+    index: TableIndex, data_type: DataType, name: str, low: object, high: object
+) -> np.ndarray:
+    column = FILTER_COLUMNS[data_type].get(name)
+    column_index = index.get(column) if column else None
+    if column_index is None:
+        raise QueryError(f"Filter '{name}' is not available for {data_type.value}")
+    return column_index.between(low, high)
+
+
+def _end_of_day(day: Optional[date]) -> Optional[pd.Timestamp]:
+    """Last instant of ``day``: ``date_to`` keeps the rows stamped at any time that day."""
+    if day is None:
+        return None
+    try:
+        return pd.Timestamp(day).normalize() + pd.Timedelta(days=1) - pd.Timedelta(1, "ns")
+    except (TypeError, ValueError) as e:
+        raise QueryError(f"Invalid datetime filter value: {day!r}") from e
+
+
+def _matching_positions(
+    index: TableIndex, data_type: DataType, query: RowQuery
+) -> Optional[np.ndarray]:
+    """Intersect the index lookups of every active filter (``None`` means all rows)."""
+    ranges = [
+        ("contributor_id", query.contributor_id, query.contributor_id),
+        ("user_id", query.user_id, query.user_id),
+        ("recipe_id", query.recipe_id, query.recipe_id),
+        ("date", query.date_from, _end_of_day(query.date_to)),
+        ("rating", query.min_rating, query.max_rating),
+    ]
+
+    positions: Optional[np.ndarray] = None
+    for name, low, high in ranges:
+        if low is None and high is None:
+            continue
+        found = _lookup(index, data_type, name, low, high)
+        positions = found if positions is None else np.intersect1d(positions, found)
+    return positions
+
+
+def select_rows(
+    df: pd.DataFrame,
+    data_type: DataType,
+    query: RowQuery,
+    index: Optional[TableIndex] = None,
+) -> QueryResult:
+    """Apply projection, index-backed filters, sampling and paging to ``df``.
+
+    Rows are addressed by position in the loaded table, which also serves as
+    the keyset cursor: ``next_cursor`` is the position of the last returned
+    row, and ``cursor=<n>`` resumes strictly after it.
+    """
+    if query.columns:
+        unknown = [c for c in query.columns if c not in df.columns]
+        if unknown:
+            raise QueryError(f"Unknown columns: {', '.join(unknown)}")
+        columns = list(dict.fromkeys(query.columns))
+    else:
+        columns = list(df.columns)
+
+    if query.is_full_scan:
+        frame = df if columns == list(df.columns) else df[columns]
+        return QueryResult(frame=frame, total=len(df), next_cursor=None)
+
+    stop = None if query.limit is None else query.offset + query.limit
+    if not query.has_filters and query.sample is None and query.cursor is None:
+        # Plain page (the dashboard preview): slice without addressing every row.
+        has_more = stop is not None and stop < len(df)
+        next_cursor = stop - 1 if has_more and query.offset < stop else None
+        return QueryResult(
+            frame=df.iloc[query.offset : stop][columns], total=len(df), next_cursor=next_cursor
+        )
+
+    positions: Optional[np.ndarray] = None
+    if query.has_filters:
+        if index is None:
+            index = TableIndex.build(df, data_type)
+        positions = _matching_positions(index, data_type, query)
+
+    if positions is None:
+        positions = np.arange(len(df))
+    total = len(positions)
+
+    if query.sample is not None:
+        rng = np.random.default_rng(query.seed)
+        size = min(query.sample, len(positions))
+        positions = np.sort(rng.choice(positions, size=size, replace=False))
+
+    if query.cursor is not None:
+        positions = positions[np.searchsorted(positions, query.cursor, side="right") :]
+
+    page = positions[query.offset : stop]
+
+    has_more = stop is not None and stop < len(positions)
+    next_cursor = int(page[-1]) if has_more and len(page) else None
+
+    return QueryResult(frame=df.iloc[page][columns], total=total, next_cursor=next_cursor)
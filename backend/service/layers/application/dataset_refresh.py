@@ -0,0 +1,137 @@
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional, Sequence
+
+from service.layers.application.interfaces.interface import IDataAdapter
+from service.layers.application.mange_ta_main import DataAnylizer, dataset_version
+from service.layers.logger import span, struct_logger
+
+AnalyzerHook = Callable[[DataAnylizer], None]
+
+
+class DatasetRefresher:
+    """Loads newly published dataset snapshots in the background and swaps them in.
+
+    A refresh compares the adapter's current snapshot version with the one
+    being served. When they differ, a new ``DataAnylizer`` is built off the
+    request path, handed to the ``warmers`` (e.g. to precompute cached
+    responses) and only then ``install``-ed, so requests never wait on a load
+    or hit a cold cache. Requests already running keep the analyzer they
+    started with, and the old frames are released once the last of them
+    finishes.
+
+    Refreshes run when ``request_refresh`` is called (after a cleaning job)
+    and every ``poll_seconds`` if positive, to pick up snapshots published
+    by other processes. Overlapping requests are coalesced into one reload.
+    """
+
+    def __init__(self, adapter: IDataAdapter, poll_seconds: float = 0):
+        self.adapter = adapter
+        self.poll_seconds = poll_seconds
+        self._current: Optional[Callable[[], DataAnylizer]] = None
+        self._install: Optional[AnalyzerHook] = None
+        self._warmers: Sequence[AnalyzerHook] = ()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._pending = False
+        self._stop = threading.Event()
+        self._poller: Optional[threading.Thread] = None
+        self.swaps = 0
+        self.last_swap_at: Optional[str] = None
+        self.last_error: Optional[str] = None
+
+    def start(
+        self,
+        current: Callable[[], DataAnylizer],
+        install: AnalyzerHook,
+        warmers: Sequence[AnalyzerHook] = (),
+    ) -> None:
+        self._current = current
+        self._install = install
+        self._warmers = warmers
+        self._stop.clear()
+        if self.poll_seconds > 0:
+            self._poller = threading.Thread(target=self._poll, name="dataset-poll", daemon=True)
+            self._poller.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._poller is not None:
+            self._poller.join(timeout=5)
+        self.wait(timeout=5)
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        with self._lock:
+            worker = self._worker
+        if worker is not None:
+            worker.join(timeout)
+
+    def request_refresh(self, *_: Any) -> None:
+        """Schedule a refresh without blocking; accepts and ignores callback arguments."""
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                self._pending = True
+                return
+            self._worker = threading.Thread(target=self._run, name="dataset-refresh", daemon=True)
+            self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:  # noqa: BLE001 - a failed refresh keeps the current dataset
+                self.last_error = f"{type(e).__name__}: {e}"
+                struct_logger.exception("dataset_refresh_failed", error=self.last_error)
+            with self._lock:
+                if not self._pending:
+                    return
+                self._pending = False
+
+    def _poll(self) -> None:
+        while not self._stop.wait(self.poll_seconds):
+            self.request_refresh()
+
+    def refresh(self) -> bool:
+        """Reload and swap in the published dataset if it changed; return whether it did."""
+        if self._current is None or self._install is None:
+            raise RuntimeError("DatasetRefresher.start() was not called")
+
+        served = self._current().version
+        published = dataset_version(self.adapter)
+        if published == served:
+            return False
+
+        started = time.perf_counter()
+        with span("dataset_refresh", previous=served, version=published):
+            with span("load"):
+                analyzer = DataAnylizer(self.adapter)
+            with span("warm"):
+                self._warm(analyzer)
+            self._install(analyzer)
+
+        self.swaps += 1
+        self.last_swap_at = datetime.now(timezone.utc).isoformat()
+        self.last_error = None
+        struct_logger.info(
+            "dataset_swapped",
+            previous=served,
+            version=analyzer.version,
+            seconds=round(time.perf_counter() - started, 2),
+        )
+        return True
+
+    def _warm(self, analyzer: DataAnylizer) -> None:
+        for warm in self._warmers:
+            warm(analyzer)
+
+    def status(self) -> dict[str, Any]:
+        with self._lock:
+            refreshing = self._worker is not None and self._worker.is_alive()
+        return {
+            "version": self._current().version if self._current is not None else None,
+            "refreshing": refreshing,
+            "swaps": self.swaps,
+            "last_swap_at": self.last_swap_at,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,194 @@
+import asyncio
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+import anyio
+import pandas as pd
+
+from service.layers.application.mange_ta_main import AnalysisType, DataAnylizer
+from service.layers.logger import struct_logger
+
+DEFAULT_TIMEOUT_SECONDS = 120.0
+
+ANALYSIS_TIMEOUTS: dict[AnalysisType, float] = {
+    AnalysisType.USER_SEGMENTS: 240.0,
+    AnalysisType.TOP_TAGS_BY_SEGMENT: 300.0,
+    AnalysisType.REVIEWER_VS_RECIPES: 240.0,
+    AnalysisType.REVIEW_OVERVIEW: 180.0,
+    AnalysisType.REVIEWER_ACTIVITY: 180.0,
+}
+
+DISCONNECT_POLL_SECONDS = 0.5
+
+# Set in the parent right before the pool forks, so workers inherit the loaded
+# frames copy-on-write instead of each reading the dataset again.
+_WORKER_ANALYZER: Optional[DataAnylizer] = None
+
+
+class AnalysisAbandoned(Exception):
+    """Raised when a request stops waiting for an analysis.
+
+    ``running`` completes once the abandoned work actually stops: a thread
+    cannot be interrupted, and pooled work that already started finishes.
+    """
+
+    def __init__(self, message: str, running: Optional[asyncio.Future] = None):
+        super().__init__(message)
+        self.running = running
+
+
+class AnalysisTimeout(AnalysisAbandoned):
+    """Raised when an analysis does not finish within its time budget."""
+
+
+class AnalysisCancelled(AnalysisAbandoned):
+    """Raised when the client went away before the analysis finished."""
+
+
+def _compute_in_worker(analysis_type: AnalysisType) -> pd.DataFrame:
+    if _WORKER_ANALYZER is None:
+        raise RuntimeError("Worker started without a dataset")
+    return _WORKER_ANALYZER.compute(analysis_type)
+
+
+def cpu_limit() -> float:
+    """CPUs available to this container: the cgroup quota if any, else the host count."""
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()
+        if quota != "max":
+            return int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        quota_us = int(Path("/sys/fs/cgroup/cpu/cpu.cfs_quota_us").read_text())
+        period_us = int(Path("/sys/fs/cgroup/cpu/cpu.cfs_period_us").read_text())
+        if quota_us > 0:
+            return quota_us / period_us
+    except (OSError, ValueError):
+        pass
+    return float(os.cpu_count() or 1)
+
+
+def resolve_pool_size(setting: str) -> int:
+    """``auto`` keeps one CPU of the limit for the event loop; ``0`` disables the pool."""
+    if setting.strip().lower() == "auto":
+        return max(1, math.floor(cpu_limit()) - 1)
+    return max(0, int(setting))
+
+
+class AnalysisExecutor:
+    """Runs analyses off the event loop, in worker processes when a pool is configured.
+
+    Without a pool (``workers=0``) analyses run in FastAPI's threadpool as
+    before. With a pool, the pandas work runs in forked processes holding
+    the dataset read-only, so a heavy analysis no longer holds the serving
+    process' GIL. In both modes identical concurrent calls are coalesced by
+    the analyzer's single-flight, each analysis has a timeout, and a request
+    whose client disconnects stops waiting (and cancels the work if it is
+    still queued and no other request is waiting for it). Work that cannot be
+    stopped is reported in ``AnalysisAbandoned.running``, so its admission
+    slot can stay taken until it ends.
+    """
+
+    def __init__(self, workers: int = 0):
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_version: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def start(self, analyzer: DataAnylizer) -> None:
+        """(Re)create the worker pool around ``analyzer``'s dataset."""
+        global _WORKER_ANALYZER
+
+        if self.workers <= 0:
+            return
+        with self._lock:
+            previous = self._pool
+            _WORKER_ANALYZER = analyzer
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("fork")
+            )
+            self._pool_version = analyzer.version
+            # The fork context launches every worker on the first submit.
+            self._pool.submit(os.getpid).result()
+        if previous is not None:
+            # Let the old pool drain the work of requests still on the old dataset.
+            previous.shutdown(wait=False)
+        struct_logger.info("analysis_pool_started", workers=self.workers, version=analyzer.version)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, analyzer: DataAnylizer, analysis_type: AnalysisType) -> Optional[Future]:
+        with self._lock:
+            pool = self._pool if self._pool_version == analyzer.version else None
+        if pool is None:
+            return None
+        return analyzer.single_flight.submit(
+            ("pool", analysis_type, analyzer.version),
+            lambda: pool.submit(_compute_in_worker, analysis_type),
+        )
+
+    async def run(
+        self,
+        analyzer: DataAnylizer,
+        analysis_type: AnalysisType,
+        is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+    ) -> pd.DataFrame:
+        precomputed = analyzer.precomputed(analysis_type)
+        if precomputed is not None:
+            return precomputed
+
+        timeout = ANALYSIS_TIMEOUTS.get(analysis_type, DEFAULT_TIMEOUT_SECONDS)
+        future = self._submit(analyzer, analysis_type)
+
+        if future is None:
+            abandoned = threading.Event()
+
+            def compute() -> pd.DataFrame:
+                # Work abandoned while it waited for a thread is skipped.
+                if abandoned.is_set():
+                    raise AnalysisCancelled(str(analysis_type))
+                return analyzer.process_data(analysis_type)
+
+            task: asyncio.Future = asyncio.ensure_future(anyio.to_thread.run_sync(compute))
+            # Once abandoned nobody awaits the task: its outcome is consumed here.
+            task.add_done_callback(lambda done: done.cancelled() or done.exception())
+
+            def abandon() -> None:
+                # A running thread cannot be interrupted: the task (and so
+                # ``running``) ends with the thread, and its result is dropped.
+                abandoned.set()
+
+        else:
+            task = asyncio.wrap_future(future)
+            key = ("pool", analysis_type, analyzer.version)
+
+            def abandon() -> None:
+                analyzer.single_flight.abandon(key, future)
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                abandon()
+                struct_logger.warning("analysis_timeout", analysis=analysis_type, timeout=timeout)
+                raise AnalysisTimeout(f"{analysis_type} exceeded {timeout:.0f}s", running=task)
+
+            done, _ = await asyncio.wait({task}, timeout=min(DISCONNECT_POLL_SECONDS, remaining))
+            if done:
+                return task.result()
+
+            if is_disconnected is not None and await is_disconnected():
+                abandon()
+                struct_logger.info("analysis_abandoned", analysis=analysis_type)
+                raise AnalysisCancelled(str(analysis_type), running=task)
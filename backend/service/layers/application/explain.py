@@ -0,0 +1,95 @@
+import time
+import tracemalloc
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Optional, TypeVar
+
+from service.layers.application.profiling import exclusive, tracing
+from service.layers.logger import close_stage
+
+T = TypeVar("T")
+
+
+@dataclass
+class StageRecord:
+    kind: str
+    label: str
+    rows_in: Optional[int]
+    rows_out: Optional[int]
+    seconds: float
+    bytes_allocated: int
+
+
+@dataclass
+class _Explain:
+    stages: list[StageRecord] = field(default_factory=list)
+    lap_started: float = field(default_factory=time.perf_counter)
+    lap_baseline: int = 0
+
+    def start_lap(self) -> None:
+        tracemalloc.reset_peak()
+        self.lap_baseline = tracemalloc.get_traced_memory()[0]
+        self.lap_started = time.perf_counter()
+
+
+_active: ContextVar[Optional[_Explain]] = ContextVar("explain", default=None)
+
+
+def _rows(frame: Any) -> Optional[int]:
+    return len(frame) if hasattr(frame, "__len__") and hasattr(frame, "shape") else None
+
+
+def mark(kind: str, label: str, output: Any = None, *inputs: Any) -> None:
+    """Close the current analysis stage as a tracing span and, under ``explain_call``, a record.
+
+    A stage spans everything since the previous mark (or since the analysis
+    started), so analyses call ``mark`` right after each step: ``kind`` is
+    one of select, filter, groupby, merge, bin, sort or transform, ``output``
+    the frame the step produced and ``inputs`` the frames it read.
+    """
+    close_stage(label, kind=kind, rows_out=_rows(output))
+    explain = _active.get()
+    if explain is None:
+        return
+    seconds = time.perf_counter() - explain.lap_started
+    _, peak = tracemalloc.get_traced_memory()
+    known_inputs = [n for n in map(_rows, inputs) if n is not None]
+    explain.stages.append(
+        StageRecord(
+            kind=kind,
+            label=label,
+            rows_in=sum(known_inputs) if known_inputs else None,
+            rows_out=_rows(output),
+            seconds=round(seconds, 6),
+            bytes_allocated=max(0, peak - explain.lap_baseline),
+        )
+    )
+    explain.start_lap()
+
+
+def explain_call(fn: Callable[[], T], name: str) -> tuple[T, dict[str, Any]]:
+    """Run ``fn`` recording the stages it marks, with tracemalloc for allocations.
+
+    Stage peaks reset the process-wide tracemalloc peak, so explained runs
+    and profiles are serialized (``ProfilerBusy`` when one is running). The
+    peaks still count memory allocated concurrently by other requests, and
+    wall times include tracemalloc overhead.
+    """
+    explain = _Explain()
+    with exclusive(), tracing():
+        token = _active.set(explain)
+        started = time.perf_counter()
+        explain.start_lap()
+        try:
+            result = fn()
+        finally:
+            seconds = time.perf_counter() - started
+            _active.reset(token)
+
+    staged = sum(stage.seconds for stage in explain.stages)
+    return result, {
+        "analysis": name,
+        "seconds": round(seconds, 6),
+        "unattributed_seconds": round(max(0.0, seconds - staged), 6),
+        "stages": [asdict(stage) for stage in explain.stages],
+    }
@@ -1,9 +1,13 @@
 from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Optional
 
 import pandas as pd
 
 from service.layers.infrastructure.types import DataType
 
+if TYPE_CHECKING:
+    from service.layers.infrastructure.indexes import TableIndex
+
 
 class IDataAdapter(ABC):
 
@@ -14,3 +18,26 @@ class IDataAdapter(ABC):
     @abstractmethod
     def save(self, df: pd.DataFrame, data_type: DataType) -> None:
         pass
+
+    @abstractmethod
+    def version(self, data_type: DataType) -> str:
+        """Identify the content of the processed ``data_type`` table.
+
+        Called on every cache lookup: it must be cheap (e.g. a snapshot id or
+        file metadata) and never load the table.
+        """
+
+    def load_index(self, data_type: DataType) -> Optional["TableIndex"]:
+        """Prebuilt row index of the processed table, if the storage keeps one."""
+        return None
+
+    def load_results(self, version: str) -> Optional[dict[str, pd.DataFrame]]:
+        """Analysis results persisted for dataset ``version``, if any."""
+        return None
+
+    def save_results(self, version: str, results: dict[str, pd.DataFrame]) -> None:
+        """Persist analysis results of dataset ``version`` (no-op by default)."""
+
+    def snapshots(self, data_type: DataType) -> list[str]:
+        """Published snapshot ids of ``data_type``, oldest first (none if unversioned)."""
+        return []
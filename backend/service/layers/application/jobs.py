@@ -0,0 +1,241 @@
+import multiprocessing
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from enum import StrEnum
+from multiprocessing.connection import Connection
+from typing import Any, Callable, Optional
+
+from service.layers.application.data_cleaning import CLEANING_STAGES, clean_frame
+from service.layers.application.interfaces.interface import IDataAdapter
+from service.layers.infrastructure.types import DataType
+from service.layers.logger import struct_logger
+
+POLL_SECONDS = 0.2
+
+
+class JobStatus(StrEnum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+FINISHED = {JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED}
+
+
+class JobQueueFull(Exception):
+    """Raised when no more cleaning jobs can be queued."""
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+@dataclass
+class StageProgress:
+    stage: str
+    rows: int
+    at: str
+
+
+@dataclass
+class Job:
+    id: str
+    data_type: DataType
+    status: JobStatus = JobStatus.QUEUED
+    stages: list[StageProgress] = field(default_factory=list)
+    rows: Optional[int] = None
+    error: Optional[str] = None
+    created_at: str = field(default_factory=_now)
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+
+    @property
+    def progress(self) -> float:
+        done = {s.stage for s in self.stages}
+        return round(len(done) / len(CLEANING_STAGES), 2)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "progress": self.progress}
+
+
+def _run_cleaning(
+    adapter_factory: Callable[[], IDataAdapter], data_type: DataType, conn: Connection
+) -> None:
+    """Child process entry point: clean ``data_type`` and report over ``conn``."""
+    try:
+        df = clean_frame(
+            adapter_factory(), data_type, progress=lambda stage, rows: conn.send((stage, rows))
+        )
+        conn.send(("done", len(df)))
+    except Exception as e:  # noqa: BLE001 - the job fails, reported to the parent
+        struct_logger.exception("clean_job_error", data_type=data_type)
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+class JobManager:
+    """Runs data cleaning jobs in child processes and tracks their progress.
+
+    Each job gets its own forked process, so the memory of a cleaning run is
+    returned to the OS when it ends and never grows the serving process.
+    Children stream ``(stage, rows)`` messages back through a pipe; a monitor
+    thread per job records them. At most ``max_running`` jobs run at once,
+    the others wait in a bounded FIFO queue. Finished jobs are kept for
+    inspection up to ``max_history``; ``on_success`` is called from the
+    monitor thread once a job has published its output.
+    """
+
+    def __init__(
+        self,
+        adapter_factory: Callable[[], IDataAdapter],
+        max_running: int = 1,
+        max_queued: int = 4,
+        max_history: int = 50,
+        on_success: Optional[Callable[[Job], None]] = None,
+    ):
+        self.adapter_factory = adapter_factory
+        self.on_success = on_success
+        self.max_running = max_running
+        self.max_queued = max_queued
+        self.max_history = max_history
+        self._lock = threading.Lock()
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._queue: deque[str] = deque()
+        self._processes: dict[str, multiprocessing.Process] = {}
+        self._cancelled: set[str] = set()
+        self._monitors: list[threading.Thread] = []
+
+    def submit(self, data_type: DataType) -> Job:
+        with self._lock:
+            if len(self._queue) >= self.max_queued:
+                raise JobQueueFull(f"{len(self._queue)} cleaning jobs already queued")
+            job = Job(id=uuid.uuid4().hex, data_type=data_type)
+            self._jobs[job.id] = job
+            self._queue.append(job.id)
+            self._trim_history()
+            self._start_queued()
+        struct_logger.info("clean_job_submitted", job_id=job.id, data_type=data_type)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self) -> list[Job]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in FINISHED:
+                return job
+            if job.status == JobStatus.QUEUED:
+                self._queue.remove(job_id)
+                self._finish(job, JobStatus.CANCELLED)
+                return job
+            self._cancelled.add(job_id)
+            process = self._processes.get(job_id)
+        if process is not None:
+            process.terminate()
+        struct_logger.info("clean_job_cancel_requested", job_id=job_id)
+        return job
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Block until running and queued jobs are finished (used on shutdown and in tests)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                alive = [m for m in self._monitors if m.is_alive()]
+            if not alive:
+                return
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return
+            alive[0].join(remaining)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._queue.clear()
+            running = list(self._processes)
+        for job_id in running:
+            self.cancel(job_id)
+        self.wait(timeout=5)
+
+    def _trim_history(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in FINISHED]
+        for job_id in finished[: max(0, len(self._jobs) - self.max_history)]:
+            del self._jobs[job_id]
+
+    def _finish(self, job: Job, status: JobStatus, error: Optional[str] = None) -> None:
+        job.status = status
+        job.error = error
+        job.finished_at = _now()
+        struct_logger.info("clean_job_finished", job_id=job.id, status=status, error=error)
+
+    def _start_queued(self) -> None:
+        """Start queued jobs while there is room (called with the lock held)."""
+        context = multiprocessing.get_context("fork")
+        while self._queue and len(self._processes) < self.max_running:
+            job = self._jobs[self._queue.popleft()]
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(
+                target=_run_cleaning,
+                args=(self.adapter_factory, job.data_type, sender),
+                name=f"clean-{job.id[:8]}",
+                daemon=True,
+            )
+            process.start()
+            sender.close()
+            job.status = JobStatus.RUNNING
+            job.started_at = _now()
+            self._processes[job.id] = process
+            monitor = threading.Thread(
+                target=self._monitor, args=(job, process, receiver), daemon=True
+            )
+            self._monitors = [m for m in self._monitors if m.is_alive()] + [monitor]
+            monitor.start()
+
+    def _monitor(self, job: Job, process: multiprocessing.Process, receiver: Connection) -> None:
+        error: Optional[str] = None
+        while True:
+            try:
+                if not receiver.poll(POLL_SECONDS):
+                    if process.is_alive():
+                        continue
+                    if not receiver.poll():
+                        break
+                stage, value = receiver.recv()
+            except (EOFError, OSError):
+                break
+            with self._lock:
+                match stage:
+                    case "done":
+                        job.rows = value
+                    case "error":
+                        error = value
+                    case _:
+                        job.stages.append(StageProgress(stage=stage, rows=value, at=_now()))
+        receiver.close()
+        process.join()
+
+        with self._lock:
+            self._processes.pop(job.id, None)
+            if job.id in self._cancelled:
+                self._cancelled.discard(job.id)
+                self._finish(job, JobStatus.CANCELLED)
+            elif error is not None or process.exitcode != 0:
+                self._finish(job, JobStatus.FAILED, error or f"exit code {process.exitcode}")
+            else:
+                self._finish(job, JobStatus.SUCCEEDED)
+            self._start_queued()
+
+        if job.status == JobStatus.SUCCEEDED and self.on_success is not None:
+            self.on_success(job)
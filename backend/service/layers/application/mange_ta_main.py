@@ -1,12 +1,18 @@
 import ast
+import hashlib
+import threading
 from enum import StrEnum
-from typing import Any, Dict, List, Optional, Sequence, Union
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
 
 import numpy as np
 import pandas as pd
 
+from service.layers.application import explain
 from service.layers.application.interfaces.interface import IDataAdapter
+from service.layers.application.single_flight import SingleFlight
+from service.layers.infrastructure.indexes import TableIndex
 from service.layers.infrastructure.types import DataType
+from service.layers.logger import PhaseTimer, struct_logger
 
 SEGMENT_INFO: Dict[int, Dict[str, Any]] = {
     0: {
@@ -68,6 +74,17 @@ class AnalysisType(StrEnum):
     REVIEWER_VS_RECIPES = "reviewer_vs_recipes"
 
 
+# Analyses exposed by the API, precomputed and persisted with each dataset version.
+SERVED_ANALYSES: tuple[AnalysisType, ...] = tuple(
+    a for a in AnalysisType if a not in (AnalysisType.NO_ANALYSIS, AnalysisType.NUMBER_COMMENTS)
+)
+
+# Analyses computed from the result of another one (see ``derive_analysis``).
+ANALYSIS_DEPENDENCIES: dict[AnalysisType, AnalysisType] = {
+    AnalysisType.TOP_TAGS_BY_SEGMENT: AnalysisType.USER_SEGMENTS,
+}
+
+
 def _parse_tags_to_list(v) -> List[str]:
     """Parse tags - optimized version with early returns."""
     if isinstance(v, list):
@@ -142,6 +159,9 @@ def _find_col(df: Optional[pd.DataFrame], candidates):
 def _non_empty_text_mask(series: Optional[pd.Series]) -> pd.Series:
     if series is None:
         return pd.Series(dtype=bool)
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # "" is usually not a category (never for an all-null column).
+        series = series.astype(object)
     return (
         series.fillna("").astype(str).str.replace(r"<br\\s*/?>", " ", regex=True).str.strip().ne("")
     )
@@ -161,6 +181,7 @@ def most_recipes_contributors(df_recipes: pd.DataFrame) -> pd.DataFrame:
         .sort_values(ascending=False)
         .reset_index()
     )
+    explain.mark("groupby", "recipes per contributor", number_recipes_contributors, df_recipes)
     return number_recipes_contributors
 
 
@@ -172,24 +193,35 @@ def best_ratings_contributors(
         .mean()
         .reset_index(name="avg_rating")
     )
+    explain.mark("groupby", "mean rating per recipe", avg_ratings, df_interactions)
 
     df = df_recipes[["id", "contributor_id"]].merge(
         avg_ratings, how="left", left_on="id", right_on="recipe_id"
     )
+    explain.mark("merge", "ratings onto recipes", df, df_recipes, avg_ratings)
 
     contributor_counts = (
         df.groupby("contributor_id", observed=True)["id"].count().reset_index(name="num_recipes")
     )
     contributor_avg = df.groupby("contributor_id", observed=True)["avg_rating"].mean().reset_index()
+    explain.mark("groupby", "recipes and mean rating per contributor", contributor_avg, df)
 
     contributor_stats = contributor_avg.merge(contributor_counts, on="contributor_id")
     contributor_stats = contributor_stats[contributor_stats["num_recipes"] >= 5]
+    explain.mark(
+        "filter",
+        "contributors with 5+ recipes",
+        contributor_stats,
+        contributor_avg,
+        contributor_counts,
+    )
 
     contributor_stats = (
         contributor_stats.sort_values(by="avg_rating", ascending=False)
         .reset_index(drop=True)
         .where(pd.notna(contributor_stats), None)
     )
+    explain.mark("sort", "order by mean rating", contributor_stats)
     return contributor_stats
 
 
@@ -208,6 +240,7 @@ def average_duration_distribution(
     df = df_recipes[cols_needed].copy()
     df[duration_col] = pd.to_numeric(df[duration_col], errors="coerce")
     df = df.dropna(subset=[duration_col])
+    explain.mark("select", "numeric durations", df, df_recipes)
 
     resolved_bins: Union[int, Sequence[float]]
     resolved_labels: Optional[Sequence[str]] = labels
@@ -237,6 +270,7 @@ def average_duration_distribution(
         include_lowest=True,
         right=False,
     )
+    explain.mark("bin", "duration bins", df)
 
     group_keys = group_cols_list + ["duration_bin"]
 
@@ -245,6 +279,7 @@ def average_duration_distribution(
         .agg(count=(duration_col, "size"), avg_duration_in_bin=(duration_col, "mean"))
         .reset_index()
     )
+    explain.mark("groupby", "count and mean duration per bin", agg, df)
 
     if group_cols_list:
         totals = (
@@ -265,6 +300,7 @@ def average_duration_distribution(
     else:
         out["cum_share"] = out["share"].cumsum().round(2)
 
+    explain.mark("transform", "shares and cumulative shares", out, agg)
     out = out.drop(columns=["total_count"])
     out["avg_duration_in_bin"] = pd.to_numeric(out["avg_duration_in_bin"], errors="coerce").round(1)
 
@@ -279,6 +315,7 @@ def duration_vs_recipe_count(
     df = df.dropna(subset=["contributor_id"])
     df[duration_col] = pd.to_numeric(df[duration_col], errors="coerce")
     df = df.dropna(subset=[duration_col])
+    explain.mark("select", "contributors with numeric durations", df, df_recipes)
 
     agg = (
         df.groupby("contributor_id", observed=True)
@@ -289,6 +326,7 @@ def duration_vs_recipe_count(
         )
         .reset_index()
     )
+    explain.mark("groupby", "recipe count and durations per contributor", agg, df)
 
     if agg.empty:
         return agg
@@ -308,9 +346,11 @@ def top_10_percent_contributors(
 
     contrib_count = df.groupby("contributor_id")["id"].count().reset_index(name="num_recipes")
     threshold = contrib_count["num_recipes"].quantile(0.90)
+    explain.mark("groupby", "recipes per contributor", contrib_count, df)
 
     top_contributors = contrib_count[contrib_count["num_recipes"] >= threshold]["contributor_id"]
     df_top = df[df["contributor_id"].isin(top_contributors)]
+    explain.mark("filter", "recipes of the top 10% contributors", df_top, df)
 
     avg_duration_top = df_top[duration_col].mean()
     avg_rating_top = (
@@ -325,10 +365,12 @@ def top_10_percent_contributors(
         .count()
         .mean()
     )
+    explain.mark("groupby", "ratings and comments of top recipes", None, df_interactions)
 
     avg_duration_global = df[duration_col].mean()
     avg_rating_global = df_interactions.groupby("recipe_id")["rating"].mean().mean()
     avg_comments_global = df_interactions.groupby("recipe_id")["rating"].count().mean()
+    explain.mark("groupby", "ratings and comments of all recipes", None, df_interactions)
 
     result = pd.DataFrame(
         [
@@ -371,10 +413,12 @@ def compute_user_segments(
 
     df_i = df_interactions[["recipe_id", "rating"]].copy()
     df_i["rating"] = pd.to_numeric(df_i["rating"], errors="coerce")
+    explain.mark("select", "numeric durations and ratings", df_i, df_recipes, df_interactions)
 
     g_minutes = (
         df_r.groupby("contributor_id", dropna=True)[duration_col].mean().rename("avg_minutes")
     )
+    explain.mark("groupby", "mean duration per contributor", g_minutes, df_r)
 
     recipe_avg_rating = df_i.groupby("recipe_id")["rating"].mean().rename("recipe_avg_rating")
     g_rating = (
@@ -383,6 +427,7 @@ def compute_user_segments(
         .mean()
         .rename("avg_rating")
     )
+    explain.mark("merge", "mean rating per contributor", g_rating, df_r, df_i)
 
     recipe_review_count = df_i.groupby("recipe_id")["rating"].count().rename("review_count")
     g_reviews = (
@@ -391,12 +436,14 @@ def compute_user_segments(
         .mean()
         .rename("avg_reviews")
     )
+    explain.mark("merge", "mean reviews per contributor", g_reviews, df_r, df_i)
 
     df_users = (
         pd.concat([g_minutes, g_rating, g_reviews], axis=1)
         .reset_index()
         .dropna(subset=["avg_minutes", "avg_rating", "avg_reviews"])
     )
+    explain.mark("merge", "contributor features", df_users, g_minutes, g_rating, g_reviews)
 
     if df_users.empty:
         return pd.DataFrame(
@@ -430,12 +477,14 @@ def compute_user_segments(
         seg_idx[i:end_idx] = distances_chunk.argmin(axis=1)
 
     df_users["segment"] = seg_idx
+    explain.mark("transform", "nearest segment centroid", df_users)
 
     df_users = df_users.merge(
         centroids_df.reset_index().rename(columns={"index": "segment"})[["segment", "persona"]],
         on="segment",
         how="left",
     )
+    explain.mark("merge", "segment personas", df_users)
 
     df_users["avg_minutes"] = df_users["avg_minutes"].round(2)
     df_users["avg_rating"] = df_users["avg_rating"].round(2)
@@ -464,11 +513,14 @@ def top_tags_by_segment_from_users(
         on="contributor_id",
         how="inner",
     )
+    explain.mark("merge", "recipes of segmented contributors", df_r, df_recipes, df_user_segments)
 
     # Use vectorized parsing instead of apply() for better performance
     df_r[tags_col] = _parse_tags_vectorized(df_r[tags_col])
+    explain.mark("transform", "parse tags", df_r)
 
     df_tags = df_r.explode(tags_col).dropna(subset=[tags_col])
+    explain.mark("transform", "one row per tag", df_tags, df_r)
     if df_tags.empty:
         return pd.DataFrame(columns=["segment", "persona", "tag", "count", "share_pct"])
 
@@ -477,6 +529,7 @@ def top_tags_by_segment_from_users(
         .size()
         .reset_index(name="count")
     )
+    explain.mark("groupby", "tag counts per segment", counts, df_tags)
 
     totals = (
         counts.groupby(["segment", "persona"], observed=False)["count"]
@@ -484,10 +537,12 @@ def top_tags_by_segment_from_users(
         .reset_index(name="segment_total")
     )
     counts = counts.merge(totals, on=["segment", "persona"], how="left")
+    explain.mark("merge", "segment totals", counts, totals)
     counts["share_pct"] = (counts["count"] / counts["segment_total"] * 100).round(2)
 
     counts = counts.sort_values(["segment", "count"], ascending=[True, False])
     topk = counts.groupby("segment").head(top_k).reset_index(drop=True)
+    explain.mark("sort", "top tags per segment", topk, counts)
 
     topk = topk.rename(columns={tags_col: "tag"})
     return (
@@ -523,6 +578,7 @@ def rating_distribution(
         .mean()
         .reset_index(name="avg_rating")
     )
+    explain.mark("groupby", "mean rating per recipe", per_recipe, df_interactions)
 
     contrib_col = _find_col(df_recipes, ["contributor_id", "contributor", "author", "user"])
     if contrib_col is None:
@@ -535,6 +591,7 @@ def rating_distribution(
     )
 
     merged = per_recipe.merge(recipes_meta, on=recipe_id_col, how="left")
+    explain.mark("merge", "contributors onto recipe ratings", merged, per_recipe, recipes_meta)
 
     avg = (
         merged.dropna(subset=["contributor_id"])
@@ -542,6 +599,7 @@ def rating_distribution(
         .mean()
         .reset_index(name="avg_rating")
     )
+    explain.mark("groupby", "mean rating per contributor", avg, merged)
 
     bins_sequence = list(bins) if bins is not None else [0, 1, 2, 3, 4, 5]
     if len(bins_sequence) < 2:
@@ -566,6 +624,7 @@ def rating_distribution(
         include_lowest=True,
         right=False,
     )
+    explain.mark("bin", "rating bins", avg)
 
     distribution = (
         avg.groupby("rating_bin", observed=False)
@@ -575,6 +634,7 @@ def rating_distribution(
         )
         .reset_index()
     )
+    explain.mark("groupby", "contributors per bin", distribution, avg)
 
     total = int(distribution["count"].sum()) if not distribution.empty else 0
     if total == 0:
@@ -613,6 +673,7 @@ def rating_vs_recipe_count(
         .reset_index(name="recipe_count")
         .rename(columns={contrib_col: "contributor_id"})
     )
+    explain.mark("groupby", "recipes per contributor", recipe_counts, df_recipes)
 
     if (
         df_interactions is None
@@ -631,6 +692,7 @@ def rating_vs_recipe_count(
         .reset_index()
         .rename(columns={"mean": "avg_rating", "median": "median_rating"})
     )
+    explain.mark("groupby", "mean and median rating per recipe", per_recipe, df_interactions)
 
     merged = per_recipe.merge(
         df_recipes[[recipe_id_in_recipes, contrib_col]].rename(
@@ -639,6 +701,7 @@ def rating_vs_recipe_count(
         on=recipe_id_col,
         how="left",
     ).dropna(subset=["contributor_id"])
+    explain.mark("merge", "contributors onto recipe ratings", merged, per_recipe, df_recipes)
 
     contrib_ratings = (
         merged.groupby("contributor_id", observed=False)
@@ -648,8 +711,10 @@ def rating_vs_recipe_count(
         )
         .reset_index()
     )
+    explain.mark("groupby", "ratings per contributor", contrib_ratings, merged)
 
     result = contrib_ratings.merge(recipe_counts, on="contributor_id", how="right")
+    explain.mark("merge", "ratings onto recipe counts", result, contrib_ratings, recipe_counts)
     result["recipe_count"] = (
         pd.to_numeric(result["recipe_count"], errors="coerce").fillna(0).astype(int)
     )
@@ -697,6 +762,7 @@ def review_overview(
     mask_reviews = _non_empty_text_mask(df_int[review_col])
     total_interactions = len(df_int)
     total_reviews = int(mask_reviews.sum())
+    explain.mark("filter", "non-empty reviews", df_int, df_interactions)
 
     recipes_with_reviews = int(
         df_int.loc[mask_reviews, recipe_id_interactions].nunique(dropna=True)
@@ -705,8 +771,9 @@ def review_overview(
     unique_reviewers = int(df_int.loc[mask_reviews, user_col].nunique(dropna=True))
 
     reviews_per_recipe = (
-        df_int.loc[mask_reviews].groupby(recipe_id_interactions, observed=False)[review_col].size()
+        df_int.loc[mask_reviews].groupby(recipe_id_interactions, observed=True)[review_col].size()
     )
+    explain.mark("groupby", "reviews per recipe", reviews_per_recipe, df_int)
 
     empty_reviews = total_interactions - total_reviews
     empty_ratio = (empty_reviews / total_interactions * 100) if total_interactions else 0.0
@@ -719,6 +786,7 @@ def review_overview(
     )
 
     review_lengths = _word_count(df_int.loc[mask_reviews, review_col])
+    explain.mark("transform", "review word counts", review_lengths)
     avg_review_length = float(review_lengths.mean()) if not review_lengths.empty else None
     median_review_length = float(review_lengths.median()) if not review_lengths.empty else None
 
@@ -781,6 +849,7 @@ def review_distribution_per_recipe(
 
     df_int = df_interactions[[recipe_id_interactions, review_col]].copy()
     mask_reviews = _non_empty_text_mask(df_int[review_col])
+    explain.mark("filter", "non-empty reviews", df_int, df_interactions)
 
     recipes_frame = (
         df_recipes[[recipe_id_recipes]]
@@ -796,11 +865,13 @@ def review_distribution_per_recipe(
         .reset_index()
         .rename(columns={recipe_id_interactions: "recipe_id", "count": "review_count"})
     )
+    explain.mark("groupby", "reviews per recipe", review_counts, df_int)
 
     merged = recipes_frame.merge(review_counts, on="recipe_id", how="left").fillna(
         {"review_count": 0}
     )
     merged["review_count"] = merged["review_count"].astype(int)
+    explain.mark("merge", "review counts onto recipes", merged, recipes_frame, review_counts)
 
     def _format_bin(lower, upper):
         lower_int = int(lower)
@@ -830,6 +901,7 @@ def review_distribution_per_recipe(
         right=False,
         labels=labels,
     )
+    explain.mark("bin", "review count bins", merged)
 
     distribution = (
         merged.groupby("reviews_bin", observed=False)
@@ -840,6 +912,7 @@ def review_distribution_per_recipe(
         .reset_index()
         .rename(columns={"reviews_bin": "reviews_bin"})
     )
+    explain.mark("groupby", "recipes per bin", distribution, merged)
     distribution["reviews_bin"] = distribution["reviews_bin"].astype(str)
 
     total_recipes = distribution["recipe_count"].sum()
@@ -899,6 +972,7 @@ def reviewer_activity(
     df_int = df_interactions[cols_needed].copy()
     mask_reviews = _non_empty_text_mask(df_int[review_col])
     df_reviews = df_int.loc[mask_reviews].copy()
+    explain.mark("filter", "non-empty reviews", df_reviews, df_interactions)
 
     if df_reviews.empty:
         return pd.DataFrame(
@@ -914,6 +988,7 @@ def reviewer_activity(
         )
 
     df_reviews["review_length_words"] = _word_count(df_reviews[review_col])
+    explain.mark("transform", "review word counts", df_reviews)
 
     agg_map = {
         "reviews_count": (review_col, "size"),
@@ -932,6 +1007,7 @@ def reviewer_activity(
         .reset_index()
         .rename(columns={user_col: "reviewer_id"})
     )
+    explain.mark("groupby", "activity per reviewer", activity, df_reviews)
 
     total_reviews = activity["reviews_count"].sum()
     activity["share_pct"] = (
@@ -954,6 +1030,7 @@ def reviewer_activity(
     activity = (
         activity.sort_values("reviews_count", ascending=False).head(top_n).reset_index(drop=True)
     )
+    explain.mark("sort", "top reviewers", activity)
 
     cols = ["reviewer_id", "reviews_count", "share_pct", "avg_review_length_words"]
     if "avg_rating_given" in activity.columns:
@@ -996,6 +1073,7 @@ def review_temporal_trend(
 
     mask_reviews = _non_empty_text_mask(df_int[review_col])
     df_reviews = df_int.loc[mask_reviews].copy()
+    explain.mark("filter", "dated non-empty reviews", df_reviews, df_interactions)
 
     if df_reviews.empty:
         return pd.DataFrame(
@@ -1016,6 +1094,7 @@ def review_temporal_trend(
         .reset_index()
         .rename(columns={date_col: "period_start"})
     )
+    explain.mark("groupby", "reviews per month", trend, df_reviews)
 
     trend["period"] = trend["period_start"].dt.to_period("M").astype(str)
 
@@ -1082,6 +1161,7 @@ def reviews_vs_rating(
         .reset_index(name="review_count")
         .rename(columns={recipe_id_interactions: "recipe_id"})
     )
+    explain.mark("groupby", "reviews per recipe", review_counts, df_int)
 
     avg_ratings = (
         df_int.groupby(recipe_id_interactions)[rating_col]
@@ -1089,6 +1169,7 @@ def reviews_vs_rating(
         .reset_index(name="avg_rating")
         .rename(columns={recipe_id_interactions: "recipe_id"})
     )
+    explain.mark("groupby", "mean rating per recipe", avg_ratings, df_int)
 
     meta_cols = [recipe_id_recipes]
     rename_map = {recipe_id_recipes: "recipe_id"}
@@ -1100,9 +1181,18 @@ def reviews_vs_rating(
         rename_map[contributor_col] = "contributor_id"
 
     recipes_meta = df_recipes[meta_cols].drop_duplicates().rename(columns=rename_map)
+    explain.mark("select", "recipe metadata", recipes_meta, df_recipes)
 
     result = review_counts.merge(avg_ratings, on="recipe_id", how="left")
     result = result.merge(recipes_meta, on="recipe_id", how="left")
+    explain.mark(
+        "merge",
+        "ratings and metadata onto review counts",
+        result,
+        review_counts,
+        avg_ratings,
+        recipes_meta,
+    )
 
     if "avg_rating" in result.columns:
         result["avg_rating"] = pd.to_numeric(result["avg_rating"], errors="coerce").round(2)
@@ -1163,6 +1253,7 @@ def reviewer_reviews_vs_recipes(
     if review_col:
         mask_reviews = _non_empty_text_mask(df_reviews[review_col])
         df_reviews = df_reviews.loc[mask_reviews]
+    explain.mark("filter", "non-empty reviews", df_reviews, df_interactions)
 
     reviews_count = (
         df_reviews.groupby(user_col)
@@ -1170,6 +1261,7 @@ def reviewer_reviews_vs_recipes(
         .reset_index(name="reviews_count")
         .rename(columns={user_col: "user_id"})
     )
+    explain.mark("groupby", "reviews per user", reviews_count, df_reviews)
 
     if rating_col and rating_col in df_interactions.columns:
         ratings = (
@@ -1179,6 +1271,7 @@ def reviewer_reviews_vs_recipes(
             .rename(columns={user_col: "user_id"})
         )
         reviews_count = reviews_count.merge(ratings, on="user_id", how="left")
+        explain.mark("merge", "mean rating given per user", reviews_count, df_interactions)
     else:
         reviews_count["avg_rating_given"] = np.nan
 
@@ -1191,8 +1284,10 @@ def reviewer_reviews_vs_recipes(
         )
     else:
         recipes_count = pd.DataFrame(columns=["user_id", "recipes_published"])
+    explain.mark("groupby", "recipes published per user", recipes_count, df_recipes)
 
     result = reviews_count.merge(recipes_count, on="user_id", how="outer")
+    explain.mark("merge", "reviews with recipes published", result, reviews_count, recipes_count)
     result["reviews_count"] = (
         pd.to_numeric(result["reviews_count"], errors="coerce").fillna(0).astype(int)
     )
@@ -1214,69 +1309,196 @@ def reviewer_reviews_vs_recipes(
     return result[["user_id", "reviews_count", "recipes_published", "avg_rating_given"]]
 
 
-class DataAnylizer:
-    def __init__(self, csv_adapter: IDataAdapter):
-        self.df_recipes = csv_adapter.load(DataType.RECIPES)
-        self.df_interactions = csv_adapter.load(DataType.INTERACTIONS)
+def compute_analysis(
+    analysis_type: AnalysisType, df_recipes: pd.DataFrame, df_interactions: pd.DataFrame
+) -> pd.DataFrame:
+    """Run ``analysis_type`` on the given frames: the pandas reference implementation."""
+    match analysis_type:
+        case AnalysisType.NUMBER_RECIPES:
+            return most_recipes_contributors(df_recipes)
 
-    def get_raw_data(self) -> tuple[pd.DataFrame, pd.DataFrame]:
-        return self.df_recipes, self.df_interactions
+        case AnalysisType.BEST_RECIPES:
+            return best_ratings_contributors(df_recipes, df_interactions)
 
-    def process_data(self, analysis_type: AnalysisType) -> pd.DataFrame:
-        match analysis_type:
-            case AnalysisType.NUMBER_RECIPES:
-                return most_recipes_contributors(self.df_recipes)
+        case AnalysisType.DURATION_DISTRIBUTION:
+            return average_duration_distribution(df_recipes, duration_col="minutes")
+
+        case AnalysisType.DURATION_VS_RECIPE_COUNT:
+            return duration_vs_recipe_count(df_recipes, duration_col="minutes")
 
-            case AnalysisType.BEST_RECIPES:
-                return best_ratings_contributors(self.df_recipes, self.df_interactions)
+        case AnalysisType.TOP_10_PERCENT_CONTRIBUTORS:
+            return top_10_percent_contributors(df_recipes, df_interactions, duration_col="minutes")
 
-            case AnalysisType.DURATION_DISTRIBUTION:
-                return average_duration_distribution(self.df_recipes, duration_col="minutes")
+        case AnalysisType.USER_SEGMENTS:
+            return compute_user_segments(df_recipes, df_interactions, duration_col="minutes")
 
-            case AnalysisType.DURATION_VS_RECIPE_COUNT:
-                return duration_vs_recipe_count(self.df_recipes, duration_col="minutes")
+        case AnalysisType.TOP_TAGS_BY_SEGMENT:
+            df_users = compute_analysis(AnalysisType.USER_SEGMENTS, df_recipes, df_interactions)
+            return derive_analysis(analysis_type, df_users, df_recipes)
 
-            case AnalysisType.TOP_10_PERCENT_CONTRIBUTORS:
-                return top_10_percent_contributors(
-                    self.df_recipes, self.df_interactions, duration_col="minutes"
-                )
+        case AnalysisType.RATING_DISTRIBUTION:
+            return rating_distribution(df_recipes, df_interactions)
 
-            case AnalysisType.USER_SEGMENTS:
-                return compute_user_segments(
-                    self.df_recipes, self.df_interactions, duration_col="minutes"
-                )
+        case AnalysisType.RATING_VS_RECIPES:
+            return rating_vs_recipe_count(df_recipes, df_interactions)
 
-            case AnalysisType.TOP_TAGS_BY_SEGMENT:
-                df_users = compute_user_segments(
-                    self.df_recipes, self.df_interactions, duration_col="minutes"
-                )
-                return top_tags_by_segment_from_users(
-                    self.df_recipes, df_users, tags_col="tags", top_k=5
-                )
+        case AnalysisType.REVIEW_OVERVIEW:
+            return review_overview(df_recipes, df_interactions)
 
-            case AnalysisType.RATING_DISTRIBUTION:
-                return rating_distribution(self.df_recipes, self.df_interactions)
+        case AnalysisType.REVIEW_DISTRIBUTION:
+            return review_distribution_per_recipe(df_recipes, df_interactions)
 
-            case AnalysisType.RATING_VS_RECIPES:
-                return rating_vs_recipe_count(self.df_recipes, self.df_interactions)
+        case AnalysisType.REVIEWER_ACTIVITY:
+            return reviewer_activity(df_interactions)
 
-            case AnalysisType.REVIEW_OVERVIEW:
-                return review_overview(self.df_recipes, self.df_interactions)
+        case AnalysisType.REVIEW_TEMPORAL_TREND:
+            return review_temporal_trend(df_interactions)
 
-            case AnalysisType.REVIEW_DISTRIBUTION:
-                return review_distribution_per_recipe(self.df_recipes, self.df_interactions)
+        case AnalysisType.REVIEWS_VS_RATING:
+            return reviews_vs_rating(df_recipes, df_interactions)
 
-            case AnalysisType.REVIEWER_ACTIVITY:
-                return reviewer_activity(self.df_interactions)
+        case AnalysisType.REVIEWER_VS_RECIPES:
+            return reviewer_reviews_vs_recipes(df_recipes, df_interactions)
+
+        case _:
+            raise ValueError(f"Analyse non supportée : {analysis_type}")
+
+
+def derive_analysis(
+    analysis_type: AnalysisType, dependency: pd.DataFrame, df_recipes: pd.DataFrame
+) -> pd.DataFrame:
+    """Compute ``analysis_type`` from the result of its ``ANALYSIS_DEPENDENCIES`` entry."""
+    match analysis_type:
+        case AnalysisType.TOP_TAGS_BY_SEGMENT:
+            return top_tags_by_segment_from_users(df_recipes, dependency, tags_col="tags", top_k=5)
 
-            case AnalysisType.REVIEW_TEMPORAL_TREND:
-                return review_temporal_trend(self.df_interactions)
+        case _:
+            raise ValueError(f"Analyse non dérivable : {analysis_type}")
 
-            case AnalysisType.REVIEWS_VS_RATING:
-                return reviews_vs_rating(self.df_recipes, self.df_interactions)
 
-            case AnalysisType.REVIEWER_VS_RECIPES:
-                return reviewer_reviews_vs_recipes(self.df_recipes, self.df_interactions)
+def dataset_version(csv_adapter: IDataAdapter) -> str:
+    """Combined version of the processed tables served by a ``DataAnylizer``."""
+    versions = [csv_adapter.version(t) for t in (DataType.RECIPES, DataType.INTERACTIONS)]
+    return hashlib.sha1("|".join(versions).encode()).hexdigest()[:16]
 
+
+class DataAnylizer:
+    def __init__(self, csv_adapter: IDataAdapter):
+        # Read before loading: if a snapshot is published meanwhile, the data is
+        # at worst newer than its label and the next refresh reloads it.
+        timer = PhaseTimer("dataset_load_phase")
+        with timer.phase("version"):
+            self.version = dataset_version(csv_adapter)
+        with timer.phase("recipes"):
+            self.df_recipes = csv_adapter.load(DataType.RECIPES)
+        with timer.phase("interactions"):
+            self.df_interactions = csv_adapter.load(DataType.INTERACTIONS)
+        with timer.phase("indexes"):
+            self._indexes: dict[DataType, TableIndex] = {
+                t: index
+                for t in (DataType.RECIPES, DataType.INTERACTIONS)
+                if (index := csv_adapter.load_index(t)) is not None
+            }
+        with timer.phase("results"):
+            stored = csv_adapter.load_results(self.version) or {}
+            self._results = {AnalysisType(k): v for k, v in stored.items()}
+        self.load_timings = timer.phases
+        self._adapter = csv_adapter
+        self._index_lock = threading.Lock()
+        self._frame_bytes: Optional[dict[str, int]] = None
+        self.single_flight = SingleFlight()
+
+    def get_raw_data(self) -> tuple[pd.DataFrame, pd.DataFrame]:
+        return self.df_recipes, self.df_interactions
+
+    def get_frame(self, data_type: DataType) -> pd.DataFrame:
+        match data_type:
+            case DataType.RECIPES:
+                return self.df_recipes
+            case DataType.INTERACTIONS:
+                return self.df_interactions
             case _:
-                raise ValueError(f"Analyse non supportée : {analysis_type}")
+                raise ValueError(f"Unknown data type: {data_type}")
+
+    def get_index(self, data_type: DataType) -> TableIndex:
+        """Return the row index of a table, building it on first use."""
+        with self._index_lock:
+            if data_type not in self._indexes:
+                self._indexes[data_type] = TableIndex.build(self.get_frame(data_type), data_type)
+            return self._indexes[data_type]
+
+    def frame_memory(self) -> dict[str, int]:
+        """Deep memory usage of each served table, computed once (the frames never change)."""
+        if self._frame_bytes is None:
+            self._frame_bytes = {
+                data_type.value: int(self.get_frame(data_type).memory_usage(deep=True).sum())
+                for data_type in (DataType.RECIPES, DataType.INTERACTIONS)
+            }
+        return self._frame_bytes
+
+    def memory_usage(self) -> dict[str, int]:
+        """Bytes held by the frames, the row indexes and the precomputed results."""
+        with self._index_lock:
+            indexes = sum(index.nbytes for index in self._indexes.values())
+        results = list(self._results.values())
+        return {
+            "frames": sum(self.frame_memory().values()),
+            "indexes": indexes,
+            "results": sum(int(df.memory_usage(deep=True).sum()) for df in results),
+        }
+
+    def drop_indexes(self) -> int:
+        """Release the row indexes (rebuilt on next use); return the bytes they held."""
+        with self._index_lock:
+            freed = sum(index.nbytes for index in self._indexes.values())
+            self._indexes = {}
+        return freed
+
+    def drop_results(self) -> int:
+        """Release the precomputed results (recomputed on demand); return their size."""
+        results, self._results = self._results, {}
+        return sum(int(df.memory_usage(deep=True).sum()) for df in results.values())
+
+    def precomputed(self, analysis_type: AnalysisType) -> Optional[pd.DataFrame]:
+        return self._results.get(analysis_type)
+
+    def process_data(self, analysis_type: AnalysisType) -> pd.DataFrame:
+        """Run an analysis, sharing one computation between concurrent identical calls."""
+        result = self._results.get(analysis_type)
+        if result is not None:
+            return result
+        return self.single_flight.do(
+            (analysis_type, self.version), lambda: self.compute(analysis_type)
+        )
+
+    def precompute(self, progress: Optional[Callable[[float], None]] = None) -> None:
+        """Compute every served analysis once and persist them for the next start.
+
+        ``progress`` is called with the fraction of analyses done after each one.
+        """
+        missing = [a for a in SERVED_ANALYSES if a not in self._results]
+        if not missing:
+            return
+        timer = PhaseTimer("precompute_phase")
+        for done, analysis_type in enumerate(missing, start=1):
+            with timer.phase(analysis_type.value):
+                self._results[analysis_type] = self.process_data(analysis_type)
+            if progress is not None:
+                progress(done / len(missing))
+        self._adapter.save_results(self.version, {a.value: df for a, df in self._results.items()})
+        struct_logger.info(
+            "analyses_precomputed", version=self.version, seconds=sum(timer.phases.values())
+        )
+
+    def compute(self, analysis_type: AnalysisType) -> pd.DataFrame:
+        return compute_analysis(analysis_type, self.df_recipes, self.df_interactions)
+
+    def derive(self, analysis_type: AnalysisType, dependency: pd.DataFrame) -> pd.DataFrame:
+        """``process_data`` computing from ``dependency``, sharing its single flight."""
+        result = self._results.get(analysis_type)
+        if result is not None:
+            return result
+        return self.single_flight.do(
+            (analysis_type, self.version),
+            lambda: derive_analysis(analysis_type, dependency, self.df_recipes),
+        )
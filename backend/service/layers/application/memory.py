@@ -0,0 +1,289 @@
+import itertools
+import os
+import threading
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+import psutil
+
+from service.layers.application.mange_ta_main import AnalysisType, DataAnylizer
+from service.layers.logger import struct_logger
+
+# cgroup limits above this are "no limit" (cgroup v1 reports a huge number).
+_UNLIMITED = 1 << 60
+
+# Share of the limit used as budget with ``MEMORY_BUDGET_MB=auto``.
+AUTO_BUDGET_RATIO = 0.9
+
+# Retry-After of rejected analyses: long enough for a running one to finish.
+RETRY_AFTER_SECONDS = 5
+
+
+class MemoryBudgetExceeded(Exception):
+    """Raised when starting an analysis would push memory usage past the budget."""
+
+    def __init__(self, analysis: AnalysisType, projected: int, budget: int, retry_after: int):
+        super().__init__(
+            f"{analysis} would need {projected / 1024**2:.0f} MiB of a "
+            f"{budget / 1024**2:.0f} MiB memory budget"
+        )
+        self.analysis = analysis
+        self.projected = projected
+        self.budget = budget
+        self.retry_after = retry_after
+
+
+def _read_int(path: str) -> Optional[int]:
+    try:
+        value = Path(path).read_text().strip()
+    except OSError:
+        return None
+    return int(value) if value.isdigit() else None
+
+
+def memory_limit() -> Optional[int]:
+    """Memory limit of this container (cgroup v2, then v1), ``None`` when unlimited."""
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        limit = _read_int(path)
+        if limit is not None:
+            return limit if limit < _UNLIMITED else None
+    return None
+
+
+def memory_usage() -> int:
+    """Memory charged to this container, or the RSS of this process and its workers.
+
+    The cgroup figure is what the OOM killer looks at; summing RSS double
+    counts the pages forked pool workers share with the parent.
+    """
+    for path in ("/sys/fs/cgroup/memory.current", "/sys/fs/cgroup/memory/memory.usage_in_bytes"):
+        usage = _read_int(path)
+        if usage is not None:
+            return usage
+    process = psutil.Process(os.getpid())
+    rss = process.memory_info().rss
+    for child in process.children(recursive=True):
+        try:
+            rss += child.memory_info().rss
+        except psutil.Error:
+            pass
+    return rss
+
+
+def resolve_budget(setting: str) -> Optional[int]:
+    """``auto`` budgets 90% of the container limit, ``0`` disables, else a size in MiB."""
+    if setting.strip().lower() == "auto":
+        limit = memory_limit()
+        return int(limit * AUTO_BUDGET_RATIO) if limit is not None else None
+    mib = int(setting)
+    return mib * 1024**2 if mib > 0 else None
+
+
+@dataclass
+class Evictable:
+    """Memory held by a cache that can be dropped and rebuilt on demand.
+
+    Caches are evicted by increasing ``priority``; ``evict`` is called with
+    the bytes still to release and returns the bytes it released.
+    """
+
+    name: str
+    priority: int
+    nbytes: Callable[[], int]
+    evict: Callable[[int], int]
+
+
+@dataclass
+class AnalysisMemory:
+    calls: int = 0
+    last_peak_bytes: int = 0
+    max_peak_bytes: int = 0
+
+
+class _PeakSampler:
+    """Samples memory usage while analyses run, keeping each one's highest reading."""
+
+    def __init__(self, usage: Callable[[], int], interval: float):
+        self.usage = usage
+        self.interval = interval
+        self._peaks: dict[int, int] = {}
+        self._tokens = itertools.count()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def enter(self, current: int) -> int:
+        with self._lock:
+            token = next(self._tokens)
+            self._peaks[token] = current
+            if len(self._peaks) == 1:
+                self._stop = threading.Event()
+                threading.Thread(
+                    target=self._run, args=(self._stop,), name="memory-sampler", daemon=True
+                ).start()
+            return token
+
+    def exit(self, token: int) -> int:
+        """Stop sampling for ``token`` and return its peak."""
+        self._observe(self.usage())
+        with self._lock:
+            peak = self._peaks.pop(token)
+            if not self._peaks:
+                self._stop.set()
+            return peak
+
+    def _observe(self, current: int) -> None:
+        with self._lock:
+            for token, peak in self._peaks.items():
+                self._peaks[token] = max(peak, current)
+
+    def _run(self, stop: threading.Event) -> None:
+        while not stop.wait(self.interval):
+            self._observe(self.usage())
+
+
+class MemoryGovernor:
+    """Accounts for the memory held by the service and keeps it within a budget.
+
+    It tracks the bytes held by the served frames, their row indexes, the
+    precomputed results and any registered cache, and the peak growth of
+    memory usage during each ``AnalysisType`` call (sampled from the cgroup
+    or the process tree, so pool workers count too). Before an analysis
+    starts, ``reserve`` projects the usage it would reach from the current
+    usage, the reservations of analyses still running and the largest peak
+    recorded for that analysis; if that is over budget, caches are evicted
+    by priority and, when this does not free enough, the analysis is
+    rejected. Usage above ``pressure_ratio`` of the budget also triggers
+    eviction once an analysis finishes.
+
+    Without a budget (``budget_bytes=None``) memory is only accounted.
+    """
+
+    def __init__(
+        self,
+        budget_bytes: Optional[int],
+        pressure_ratio: float = 0.85,
+        usage: Callable[[], int] = memory_usage,
+        sample_interval: float = 0.05,
+    ):
+        self.budget_bytes = budget_bytes
+        self.pressure_ratio = pressure_ratio
+        self.usage = usage
+        self._caches: list[Evictable] = []
+        self._analyzer: Optional[DataAnylizer] = None
+        self._analyses: dict[AnalysisType, AnalysisMemory] = {}
+        self._reserved = 0
+        self._lock = threading.Lock()
+        self._sampler = _PeakSampler(usage, sample_interval)
+        self.rejected = 0
+        self.evictions: dict[str, int] = {}
+
+    def track(self, cache: Evictable) -> None:
+        self._caches.append(cache)
+
+    def start(self, analyzer: DataAnylizer) -> None:
+        """Account for (and evict from) ``analyzer``, the one now being served."""
+        self._analyzer = analyzer
+
+    def _evictables(self) -> list[Evictable]:
+        caches = list(self._caches)
+        analyzer = self._analyzer
+        if analyzer is not None:
+            held = analyzer.memory_usage
+            caches += [
+                Evictable(
+                    "indexes", 10, lambda: held()["indexes"], lambda _: analyzer.drop_indexes()
+                ),
+                Evictable(
+                    "results", 20, lambda: held()["results"], lambda _: analyzer.drop_results()
+                ),
+            ]
+        return sorted(caches, key=lambda cache: cache.priority)
+
+    def holdings(self) -> dict[str, int]:
+        """Bytes held per account: frames, indexes, results and registered caches."""
+        held = {} if self._analyzer is None else dict(self._analyzer.memory_usage())
+        for cache in self._caches:
+            held[cache.name] = cache.nbytes()
+        return held
+
+    def estimate(self, analysis: AnalysisType) -> int:
+        """Growth expected from ``analysis``: its largest recorded peak, else the largest of all."""
+        record = self._analyses.get(analysis)
+        if record is not None and record.calls:
+            return record.max_peak_bytes
+        return max((r.max_peak_bytes for r in self._analyses.values()), default=0)
+
+    def relieve(self, needed: int) -> int:
+        """Evict caches by priority until ``needed`` bytes are released (or none are left)."""
+        freed = 0
+        for cache in self._evictables():
+            if freed >= needed:
+                break
+            if cache.nbytes() <= 0:
+                continue
+            released = cache.evict(needed - freed)
+            freed += released
+            self.evictions[cache.name] = self.evictions.get(cache.name, 0) + 1
+            struct_logger.warning("memory_evicted", cache=cache.name, bytes=released)
+        return freed
+
+    @contextmanager
+    def reserve(self, analysis: AnalysisType) -> Iterator[None]:
+        """Admit ``analysis`` within the budget and record its peak memory growth."""
+        need = self.estimate(analysis)
+        with self._lock:
+            current = self.usage()
+            projected = current + self._reserved + need
+            if self.budget_bytes is not None and projected > self.budget_bytes:
+                projected -= self.relieve(projected - self.budget_bytes)
+                if projected > self.budget_bytes:
+                    self.rejected += 1
+                    struct_logger.warning(
+                        "memory_budget_rejected",
+                        analysis=analysis,
+                        projected_bytes=projected,
+                        budget_bytes=self.budget_bytes,
+                    )
+                    raise MemoryBudgetExceeded(
+                        analysis, projected, self.budget_bytes, RETRY_AFTER_SECONDS
+                    )
+                # Growth is measured from what is left after the eviction.
+                current = self.usage()
+            self._reserved += need
+
+        token = self._sampler.enter(current)
+        try:
+            yield
+        finally:
+            peak = self._sampler.exit(token)
+            with self._lock:
+                self._reserved -= need
+                record = self._analyses.setdefault(analysis, AnalysisMemory())
+                record.calls += 1
+                record.last_peak_bytes = max(0, peak - current)
+                record.max_peak_bytes = max(record.max_peak_bytes, record.last_peak_bytes)
+            self.check_pressure()
+
+    def check_pressure(self) -> None:
+        if self.budget_bytes is None:
+            return
+        threshold = int(self.budget_bytes * self.pressure_ratio)
+        current = self.usage()
+        if current > threshold:
+            with self._lock:
+                self.relieve(current - threshold)
+
+    def stats(self) -> dict[str, Any]:
+        holdings = self.holdings()
+        with self._lock:
+            return {
+                "budget_bytes": self.budget_bytes,
+                "usage_bytes": self.usage(),
+                "reserved_bytes": self._reserved,
+                "holdings_bytes": holdings,
+                "rejected": self.rejected,
+                "evictions": dict(self.evictions),
+                "analyses": {a.value: asdict(r) for a, r in self._analyses.items()},
+            }
@@ -0,0 +1,196 @@
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from types import FrameType
+from typing import Any, Callable, Iterator, Optional, TypeVar
+
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+DEFAULT_INTERVAL_SECONDS = 0.002
+TOP_ALLOCATIONS = 15
+# Frames kept by tracemalloc per allocation; 1 keeps tracing overhead low.
+TRACEMALLOC_FRAMES = 1
+
+T = TypeVar("T")
+
+FrameKey = tuple[str, str, int]
+
+# Profiling slows the whole process down and resets the process-wide tracemalloc
+# peak, so only one profile (or explained analysis) runs at a time.
+_profile_lock = threading.Lock()
+
+# tracemalloc is process-wide: it runs while at least one caller needs it.
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_started = False
+
+
+class ProfilerBusy(Exception):
+    """Raised when a profile is requested while another one is running."""
+
+
+class _Sampler:
+    """Records the stack of one thread every ``interval`` seconds from a background thread.
+
+    Only stacks running inside the ``root`` frame (set by ``call``) are kept,
+    and frames at and above it (the profiling harness and the threadpool
+    machinery) are left out, so stacks start at the profiled call.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.root: Optional[FrameType] = None
+        self.interval = interval
+        self.frames: dict[FrameKey, int] = {}
+        self.samples: list[list[int]] = []
+        self.weights: list[float] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def call(self, fn: Callable[[], T]) -> T:
+        self.root = sys._getframe()
+        try:
+            return fn()
+        finally:
+            self.root = None
+
+    def _stack(self, frame: Optional[FrameType]) -> list[int]:
+        root = self.root
+        keys = []
+        while frame is not None and frame is not root:
+            code = frame.f_code
+            keys.append((code.co_name, code.co_filename, code.co_firstlineno))
+            frame = frame.f_back
+        if root is None or frame is None:
+            return []
+        return [self.frames.setdefault(key, len(self.frames)) for key in reversed(keys)]
+
+    def _run(self) -> None:
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            now = time.perf_counter()
+            stack = self._stack(frame)
+            if stack:
+                self.samples.append(stack)
+                self.weights.append(now - last)
+            last = now
+
+    def speedscope(self, name: str, seconds: float) -> dict[str, Any]:
+        frames = sorted(self.frames, key=self.frames.__getitem__)
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": name,
+            "exporter": "mange_ta_main",
+            "shared": {
+                "frames": [{"name": n, "file": file, "line": line} for n, file, line in frames]
+            },
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": name,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": seconds,
+                    "samples": self.samples,
+                    "weights": self.weights,
+                }
+            ],
+        }
+
+
+@contextmanager
+def exclusive() -> Iterator[None]:
+    """Hold the profiler for the block; ``ProfilerBusy`` if a profile or explain runs."""
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusy("a profile is already running")
+    try:
+        yield
+    finally:
+        _profile_lock.release()
+
+
+@contextmanager
+def tracing() -> Iterator[None]:
+    """Keep tracemalloc running for the duration of the block (reference counted)."""
+    global _tracing_users, _tracing_started
+
+    with _tracing_lock:
+        if _tracing_users == 0:
+            # Leave tracing started by someone else (e.g. PYTHONTRACEMALLOC) running.
+            _tracing_started = not tracemalloc.is_tracing()
+            if _tracing_started:
+                tracemalloc.start(TRACEMALLOC_FRAMES)
+        _tracing_users += 1
+    try:
+        yield
+    finally:
+        with _tracing_lock:
+            _tracing_users -= 1
+            if _tracing_users == 0 and _tracing_started:
+                tracemalloc.stop()
+
+
+def _top_allocations(snapshot: tracemalloc.Snapshot, limit: int) -> list[dict[str, Any]]:
+    sites = []
+    for stat in snapshot.statistics("lineno")[:limit]:
+        frame = stat.traceback[0]
+        sites.append(
+            {
+                "file": frame.filename,
+                "line": frame.lineno,
+                "size_bytes": stat.size,
+                "count": stat.count,
+            }
+        )
+    return sites
+
+
+def profile_call(
+    fn: Callable[[], T],
+    name: str,
+    interval: float = DEFAULT_INTERVAL_SECONDS,
+    top: int = TOP_ALLOCATIONS,
+) -> tuple[T, dict[str, Any]]:
+    """Run ``fn`` in the calling thread under a sampling profiler and tracemalloc.
+
+    Returns ``fn``'s result and a report holding the wall time, the
+    speedscope document of the samples, the tracemalloc peak and the
+    ``top`` allocation sites still alive when ``fn`` returned.
+    """
+    with exclusive(), tracing():
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+
+        sampler = _Sampler(threading.get_ident(), interval)
+        sampler.start()
+        started = time.perf_counter()
+        try:
+            result = sampler.call(fn)
+        finally:
+            seconds = time.perf_counter() - started
+            sampler.stop()
+            current, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot()
+
+    report = {
+        "name": name,
+        "seconds": round(seconds, 4),
+        "samples": len(sampler.samples),
+        "interval_s": interval,
+        "memory": {
+            "peak_bytes": peak - baseline,
+            "retained_bytes": current - baseline,
+            "top_allocations": _top_allocations(snapshot, top),
+        },
+        "speedscope": sampler.speedscope(name, seconds),
+    }
+    return result, report
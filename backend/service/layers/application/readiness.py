@@ -0,0 +1,89 @@
+import math
+import threading
+import time
+from typing import Any, Optional
+
+# Loading phases in order, with the overall percentage reached when each starts.
+PHASE_PERCENT: dict[str, float] = {
+    "starting": 0,
+    "reading": 5,
+    "typing": 40,
+    "indexing": 60,
+    "warming": 70,
+    "ready": 100,
+}
+
+PHASES = tuple(PHASE_PERCENT)
+
+
+class Readiness:
+    """Progress of the background dataset load, as reported by ``/ready``.
+
+    Phases only move forward: with two tables loaded one after the other,
+    reading the second table after typing the first keeps reporting
+    ``typing`` (with the table as ``detail``) rather than going back. Once
+    ready or failed, later reports (e.g. from a dataset refresh) are ignored.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self.phase = "starting"
+        self.detail: Optional[str] = None
+        self.fraction = 0.0
+        self.error: Optional[str] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.phase == "ready"
+
+    @property
+    def failed(self) -> bool:
+        return self.error is not None
+
+    def enter(self, phase: str, detail: Optional[str] = None) -> None:
+        with self._lock:
+            if self.ready or self.failed:
+                return
+            if PHASES.index(phase) > PHASES.index(self.phase):
+                self.phase = phase
+                self.fraction = 0.0
+            self.detail = detail
+
+    def advance(self, fraction: float) -> None:
+        """Report progress within the current phase, from 0 to 1."""
+        with self._lock:
+            self.fraction = min(max(fraction, self.fraction), 1.0)
+
+    def complete(self) -> None:
+        self.enter("ready")
+
+    def fail(self, error: str) -> None:
+        with self._lock:
+            self.error = error
+
+    @property
+    def percent(self) -> float:
+        index = PHASES.index(self.phase)
+        start = PHASE_PERCENT[self.phase]
+        end = PHASE_PERCENT[PHASES[min(index + 1, len(PHASES) - 1)]]
+        return round(start + (end - start) * self.fraction, 1)
+
+    def retry_after(self) -> int:
+        """Seconds until ready, extrapolated from the progress so far (1 to 60)."""
+        elapsed = time.monotonic() - self._started
+        percent = self.percent
+        if percent <= 0:
+            return 5
+        return min(60, max(1, math.ceil(elapsed * (100 - percent) / percent)))
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "ready": self.ready,
+                "phase": "failed" if self.failed else self.phase,
+                "detail": self.detail,
+                "percent": self.percent,
+                "elapsed_s": round(time.monotonic() - self._started, 1),
+                "error": self.error,
+            }
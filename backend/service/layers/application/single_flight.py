@@ -0,0 +1,96 @@
+import threading
+from concurrent.futures import Future
+from typing import Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Collapse concurrent calls sharing a key into one execution.
+
+    The first caller for a key runs ``fn``; callers arriving while it is still
+    running block on the same future and receive the same result (or
+    exception). Nothing is kept once the call finishes, so this coalesces
+    concurrent work without acting as a cache. Results are shared between
+    callers and must be treated as read-only.
+
+    ``do`` runs the work on the calling thread; ``submit`` coalesces work
+    started elsewhere (e.g. in a process pool) and lets waiters ``abandon``
+    it, cancelling the underlying future once nobody is waiting any more.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._inflight: dict[Hashable, Future] = {}
+        self._waiters: dict[Hashable, int] = {}
+        self.executions = 0
+        self.coalesced = 0
+        self.abandoned = 0
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if future is None:
+                future = Future()
+                self._inflight[key] = future
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._forget(key, future)
+
+    def submit(self, key: Hashable, start: Callable[[], Future]) -> Future:
+        """Return the in-flight future for ``key``, calling ``start`` if there is none."""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                self._waiters[key] = self._waiters.get(key, 0) + 1
+                return future
+            future = start()
+            self._inflight[key] = future
+            self._waiters[key] = 1
+            self.executions += 1
+
+        future.add_done_callback(lambda done: self._forget(key, done))
+        return future
+
+    def abandon(self, key: Hashable, future: Future) -> None:
+        """Drop one waiter of ``future``; cancel it if it was the last one."""
+        with self._lock:
+            if self._inflight.get(key) is not future:
+                return
+            self.abandoned += 1
+            self._waiters[key] = self._waiters.get(key, 1) - 1
+            if self._waiters[key] > 0:
+                return
+        # Only effective while the work is still queued.
+        future.cancel()
+
+    def _forget(self, key: Hashable, future: Future) -> None:
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+                self._waiters.pop(key, None)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "in_flight": len(self._inflight),
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "abandoned": self.abandoned,
+            }
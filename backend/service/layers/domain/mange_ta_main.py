@@ -1 +1,48 @@
+import os
+from pathlib import Path
+
 SERVICE_PREFIX = "mange_ta_main"
+
+CACHE_MAX_AGE_SECONDS = int(os.getenv("CACHE_MAX_AGE_SECONDS", "60"))
+
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_MB", "256")) * 1024**2
+
+# Worker processes for CPU-bound analyses: "0" runs them in the threadpool,
+# "auto" sizes the pool from the container CPU limit.
+ANALYSIS_POOL_WORKERS = os.getenv("ANALYSIS_POOL_WORKERS", "0")
+
+# Interval at which newly published dataset snapshots are picked up ("0" disables).
+SNAPSHOT_POLL_SECONDS = float(os.getenv("SNAPSHOT_POLL_SECONDS", "60"))
+
+# Requests of all cost classes running at once (see the admission controller).
+ADMISSION_MAX_CONCURRENT = int(os.getenv("ADMISSION_MAX_CONCURRENT", "8"))
+
+# Shared secret expected in the X-Debug-Token header by guarded debug routes
+# (on-demand profiling); those routes are disabled when it is unset.
+DEBUG_TOKEN = os.getenv("DEBUG_TOKEN", "")
+
+# Directory of the raw tables and published snapshots; unset uses the data
+# bundled with the service (set it to serve a synthetic benchmark dataset).
+DATA_DIR = Path(os.environ["DATA_DIR"]) if os.getenv("DATA_DIR") else None
+
+# File the tracing spans of every request are appended to, as OTLP/JSON lines
+# (one trace per line); unset only logs them.
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "")
+
+# "json" renders logs as JSON lines from a background thread (production);
+# anything else keeps the human-readable console output.
+LOG_FORMAT = os.getenv("LOG_FORMAT", "console")
+
+# Keep-rates of high-volume info/debug events, e.g. "span=0.1,*=1" (see
+# ``logger.parse_sampling``); warnings and errors are never sampled.
+LOG_SAMPLING = os.getenv("LOG_SAMPLING", "")
+
+# Log records waiting to be written in json mode; beyond that they are dropped.
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+# Memory the service may use, in MiB: "auto" is 90% of the container limit,
+# "0" only accounts memory without enforcing a budget.
+MEMORY_BUDGET_MB = os.getenv("MEMORY_BUDGET_MB", "auto")
+
+# Share of the budget above which caches are evicted after each analysis.
+MEMORY_PRESSURE_RATIO = float(os.getenv("MEMORY_PRESSURE_RATIO", "0.85"))
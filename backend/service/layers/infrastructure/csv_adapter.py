@@ -1,8 +1,16 @@
+import hashlib
+import hmac
+import mmap
+import os
+import pickle
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import IO, Any, Callable, Optional
 
 import pandas as pd
 
 from service.layers.application.interfaces.interface import IDataAdapter
+from service.layers.infrastructure.indexes import TableIndex
 from service.layers.infrastructure.types import DataType
 from service.layers.logger import struct_logger
 
@@ -49,46 +57,241 @@ class CSVAdapter(IDataAdapter):
         DataType.RECIPES: "RAW_recipes.csv",
     }
 
-    def __init__(self, data_dir: Path | None = None):
+    SNAPSHOT_DIR = "snapshots"
+    RESULTS_DIR = "results"
+    CURRENT_POINTER = "CURRENT"
+    KEEP_SNAPSHOTS = 3
+    # Bump when the pickled layout changes; older binaries are then ignored.
+    BINARY_FORMAT = 1
+    # SHA-256 of a pickled file whose digest is not in a ``CURRENT`` pointer.
+    DIGEST_SUFFIX = ".sha256"
+
+    def __init__(
+        self,
+        data_dir: Path | None = None,
+        on_phase: Optional[Callable[[str, Optional[str]], None]] = None,
+    ):
         self.data_dir = data_dir or (Path(__file__).parent / "data")
         self.data_dir.mkdir(exist_ok=True, parents=True)
+        # Notified with ("reading" | "typing", table) while processed tables load.
+        self.on_phase = on_phase
         self._cache = {}
+        self._indexes: dict[tuple[DataType, str], TableIndex] = {}
+
+    def _phase(self, phase: str, data_type: DataType) -> None:
+        if self.on_phase is not None:
+            self.on_phase(phase, data_type.value)
+
+    def _snapshot_dir(self, data_type: DataType) -> Path:
+        return self.data_dir / self.SNAPSHOT_DIR / data_type.value
+
+    def _pointer(self, data_type: DataType) -> tuple[Optional[str], Optional[str]]:
+        """``(snapshot id, SHA-256 of its binary)`` as the ``CURRENT`` pointer records them."""
+        try:
+            fields = (self._snapshot_dir(data_type) / self.CURRENT_POINTER).read_text().split()
+        except FileNotFoundError:
+            return None, None
+        if not fields:
+            return None, None
+        return fields[0], fields[1] if len(fields) > 1 else None
+
+    def _point_at(self, data_type: DataType, snapshot: str, digest: str) -> None:
+        _atomic_write(
+            self._snapshot_dir(data_type) / self.CURRENT_POINTER,
+            lambda fh: fh.write(f"{snapshot} {digest}".encode()),
+        )
+
+    def current_snapshot(self, data_type: DataType) -> Optional[str]:
+        """Id of the snapshot the ``CURRENT`` pointer designates, if any."""
+        return self._pointer(data_type)[0]
+
+    def snapshots(self, data_type: DataType) -> list[str]:
+        """Published snapshot ids of ``data_type``, oldest first."""
+        return sorted(p.stem for p in self._snapshot_dir(data_type).glob("*.csv"))
+
+    def processed_path(self, data_type: DataType) -> Path:
+        """The current snapshot, or the legacy unversioned file when none was published."""
+        snapshot = self.current_snapshot(data_type)
+        if snapshot is None:
+            return self.data_dir / self.FILE_MAP[data_type]
+        return self._snapshot_dir(data_type) / f"{snapshot}.csv"
+
+    def binary_path(self, data_type: DataType) -> Path:
+        """Binary sibling of the current snapshot (or of the legacy unversioned file)."""
+        return self._binary_path(data_type, self.current_snapshot(data_type))
+
+    def _binary_path(self, data_type: DataType, snapshot: Optional[str]) -> Path:
+        if snapshot is None:
+            return self.data_dir / f"{data_type.value}.pkl"
+        return self._snapshot_dir(data_type) / f"{snapshot}.pkl"
 
     def load(self, data_type: DataType, raw: bool = False) -> pd.DataFrame:
-        cache_key = (data_type, raw)
+        version = None if raw else self.version(data_type)
+        cache_key = (data_type, raw, version)
 
         if cache_key in self._cache:
             return self._cache[cache_key]
 
-        file_map = self.RAW_FILE_MAP if raw else self.FILE_MAP
-        path = self.data_dir / file_map[data_type]
+        if not raw:
+            self._phase("reading", data_type)
+            binary = self._read_binary(data_type)
+            if binary is not None:
+                df, index = binary
+                self._remember(cache_key, df)
+                self._indexes = {k: v for k, v in self._indexes.items() if k[0] != data_type}
+                self._indexes[(data_type, str(version))] = index
+                return df
+
+        path = (
+            self.data_dir / self.RAW_FILE_MAP[data_type] if raw else self.processed_path(data_type)
+        )
 
         try:
-            df = pd.read_csv(path)
-            df = df.astype(object).where(pd.notna(df), None)
-
-            if not raw:
-                # Pre-convert numeric columns before optimization
-                df = self._preconvert_types(df, data_type)
-                df = self._optimize_memory(df)
-
-            self._cache[cache_key] = df
-            return df
-
+            df = self._read_csv(path, data_type, raw)
         except FileNotFoundError:
             struct_logger.info(f"[WARN] File {path} does not exist yet.")
             return pd.DataFrame()
 
-    def save(self, df: pd.DataFrame, data_type: DataType) -> Path:
-        path = self.data_dir / self.FILE_MAP[data_type]
-        df.to_csv(path, index=False)
+        self._remember(cache_key, df)
+        if not raw:
+            # Legacy file or snapshot from an older release: next start is fast.
+            self._rewrite_binary(df, data_type, str(version))
+        return df
 
-        cache_key = (data_type, False)
-        if cache_key in self._cache:
-            del self._cache[cache_key]
+    def load_index(self, data_type: DataType) -> Optional[TableIndex]:
+        """Row index stored with the current binary snapshot, if it was loaded from one."""
+        return self._indexes.get((data_type, self.version(data_type)))
+
+    def _remember(self, cache_key: tuple, df: pd.DataFrame) -> None:
+        # Only the latest version of a table is kept in memory.
+        for key in [k for k in self._cache if k[:2] == cache_key[:2]]:
+            del self._cache[key]
+        self._cache[cache_key] = df
+
+    def _read_csv(self, path: Path, data_type: DataType, raw: bool) -> pd.DataFrame:
+        df = pd.read_csv(path)
+        df = df.astype(object).where(pd.notna(df), None)
+
+        if not raw:
+            self._phase("typing", data_type)
+            # Pre-convert numeric columns before optimization
+            df = self._preconvert_types(df, data_type)
+            df = self._optimize_memory(df)
+        return df
 
+    def _read_binary(self, data_type: DataType) -> Optional[tuple[pd.DataFrame, TableIndex]]:
+        snapshot, digest = self._pointer(data_type)
+        path = self._binary_path(data_type, snapshot)
+        if not path.exists():
+            return None
+        try:
+            payload = _load_verified(path, {digest, _read_digest(path)})
+        except (OSError, ValueError, pickle.UnpicklingError, EOFError, AttributeError) as e:
+            struct_logger.warning("binary_snapshot_unreadable", path=str(path), error=str(e))
+            return None
+        if (payload.get("format"), payload.get("version")) != (
+            self.BINARY_FORMAT,
+            self.version(data_type),
+        ):
+            return None
+        return payload["frame"], payload["index"]
+
+    def _write_binary(self, path: Path, df: pd.DataFrame, data_type: DataType, version: str) -> str:
+        """Store the typed frame and its row index, exactly as ``load`` returns them.
+
+        Returns the SHA-256 of the file, which must be recorded for ``load``
+        to trust it.
+        """
+        payload = {
+            "format": self.BINARY_FORMAT,
+            "version": version,
+            "frame": df,
+            "index": TableIndex.build(df, data_type),
+        }
+        return _pickle_atomically(path, payload)
+
+    def _rewrite_binary(self, df: pd.DataFrame, data_type: DataType, version: str) -> None:
+        """Binary of a table read from CSV, its digest beside it (``CURRENT`` is not rewritten)."""
+        snapshot = self.current_snapshot(data_type)
+        if snapshot is not None and snapshot != version:
+            return  # another snapshot was published meanwhile
+        path = self._binary_path(data_type, snapshot)
+        _write_digest(path, self._write_binary(path, df, data_type, version))
+
+    def save(self, df: pd.DataFrame, data_type: DataType) -> Path:
+        """Publish ``df`` as a new immutable snapshot and point ``CURRENT`` at it.
+
+        The CSV and its preoptimized binary form are written to temporary
+        files, fsynced and renamed into place before the pointer is swapped
+        with another rename, so readers only ever see complete snapshots and
+        a crash mid-write leaves the previous one current. The pointer also
+        records the binary's SHA-256: a pickle it does not match is never
+        loaded.
+        """
+        snapshot_dir = self._snapshot_dir(data_type)
+        snapshot_dir.mkdir(parents=True, exist_ok=True)
+        snapshot = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+        path = snapshot_dir / f"{snapshot}.csv"
+
+        _atomic_write(path, lambda fh: fh.write(df.to_csv(index=False).encode("utf-8")))
+        # The binary is built from the CSV as ``load`` would read it, so both
+        # forms of a snapshot hold the same data, and exists before CURRENT
+        # points at the snapshot.
+        typed = self._read_csv(path, data_type, raw=False)
+        digest = self._write_binary(snapshot_dir / f"{snapshot}.pkl", typed, data_type, snapshot)
+        self._point_at(data_type, snapshot, digest)
+
+        self._prune_snapshots(data_type)
+        struct_logger.info("snapshot_published", data_type=data_type, snapshot=snapshot)
         return path
 
+    def _prune_snapshots(self, data_type: DataType) -> None:
+        current = self.current_snapshot(data_type)
+        stale = [s for s in self.snapshots(data_type) if s != current]
+        for snapshot in stale[: max(0, len(stale) - (self.KEEP_SNAPSHOTS - 1))]:
+            # Already open readers keep their file handle on POSIX.
+            for suffix in (".csv", ".pkl", ".pkl" + self.DIGEST_SUFFIX):
+                (self._snapshot_dir(data_type) / f"{snapshot}{suffix}").unlink(missing_ok=True)
+
+    def _results_path(self, version: str) -> Path:
+        return self.data_dir / self.SNAPSHOT_DIR / self.RESULTS_DIR / f"{version}.pkl"
+
+    def load_results(self, version: str) -> Optional[dict[str, pd.DataFrame]]:
+        """Analysis results precomputed for dataset ``version``, if they were saved."""
+        path = self._results_path(version)
+        try:
+            payload = _load_verified(path, {_read_digest(path)})
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, pickle.UnpicklingError, EOFError, AttributeError) as e:
+            struct_logger.warning("results_snapshot_unreadable", version=version, error=str(e))
+            return None
+        if payload.get("format") != self.BINARY_FORMAT:
+            return None
+        return payload["results"]
+
+    def save_results(self, version: str, results: dict[str, pd.DataFrame]) -> None:
+        path = self._results_path(version)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"format": self.BINARY_FORMAT, "results": results}
+        _write_digest(path, _pickle_atomically(path, payload))
+        stale = sorted(path.parent.glob("*.pkl"), key=lambda p: p.stat().st_mtime)
+        for old in stale[: max(0, len(stale) - self.KEEP_SNAPSHOTS)]:
+            old.unlink(missing_ok=True)
+            _digest_path(old).unlink(missing_ok=True)
+
+    def version(self, data_type: DataType) -> str:
+        """Current snapshot id, or size and mtime of a legacy unversioned file."""
+        snapshot = self.current_snapshot(data_type)
+        if snapshot is not None:
+            return snapshot
+        path = self.data_dir / self.FILE_MAP[data_type]
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return "missing"
+        return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
     @staticmethod
     def _preconvert_types(df: pd.DataFrame, data_type: DataType) -> pd.DataFrame:
         """Pre-convert known numeric columns to avoid repeated conversions later."""
@@ -118,13 +321,16 @@ class CSVAdapter(IDataAdapter):
 
         initial_memory = df.memory_usage(deep=True).sum() / 1024**2
 
-        numeric_cols = {'rating', 'minutes', 'n_steps', 'n_ingredients'}
+        # Exact names (any case) analyses look numeric columns up by, e.g. the
+        # ``["rating", "score", "stars"]`` candidates of ``_find_col``.
+        numeric_cols = {'rating', 'score', 'stars', 'minutes', 'n_steps', 'n_ingredients'}
 
         for col in df.columns:
             col_type = df[col].dtype
 
             if col_type == 'object':
                 if col.lower() in numeric_cols:
+                    df[col] = pd.to_numeric(df[col], errors='coerce', downcast='float')
                     continue
 
                 num_unique = df[col].nunique()
@@ -159,3 +365,74 @@ class CSVAdapter(IDataAdapter):
         )
 
         return df
+
+
+def _atomic_write(path: Path, write: Callable[[IO[bytes]], Any]) -> None:
+    """Write ``path`` through a fsynced temporary file renamed over it."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as fh:
+        write(fh)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp_path, path)
+
+
+class _HashingWriter:
+    """File-like object hashing what it forwards to ``fh``."""
+
+    def __init__(self, fh: IO[bytes]):
+        self.fh = fh
+        self.sha256 = hashlib.sha256()
+
+    def write(self, data: bytes) -> int:
+        self.sha256.update(data)
+        return self.fh.write(data)
+
+
+def _pickle_atomically(path: Path, payload: Any) -> str:
+    """Pickle ``payload`` to ``path`` with ``_atomic_write``; returns the file's SHA-256."""
+    writers: list[_HashingWriter] = []
+
+    def write(fh: IO[bytes]) -> None:
+        writers.append(_HashingWriter(fh))
+        pickle.dump(payload, writers[-1], protocol=pickle.HIGHEST_PROTOCOL)
+
+    _atomic_write(path, write)
+    return writers[-1].sha256.hexdigest()
+
+
+def _digest_path(path: Path) -> Path:
+    return path.with_name(path.name + CSVAdapter.DIGEST_SUFFIX)
+
+
+def _write_digest(path: Path, digest: str) -> None:
+    _atomic_write(_digest_path(path), lambda fh: fh.write(digest.encode()))
+
+
+def _read_digest(path: Path) -> Optional[str]:
+    try:
+        return _digest_path(path).read_text().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _load_verified(path: Path, digests: set[Optional[str]]) -> Any:
+    """Unpickle ``path`` only if its SHA-256 is one recorded when it was written.
+
+    Pickles execute code when loaded: a file dropped in the data directory,
+    or one written by an older release that recorded no digest, is refused
+    with ``ValueError``. The bytes checked are the bytes loaded (one mapping).
+    """
+    with open(path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        actual = hashlib.sha256(data).hexdigest()
+        if not any(d is not None and hmac.compare_digest(actual, d) for d in digests):
+            raise ValueError(f"{path.name} does not match its recorded SHA-256")
+        return pickle.loads(data)
+
+
+if __name__ == "__main__":
+    # Build the binary form of the current tables ahead of time (e.g. in the image).
+    adapter = CSVAdapter()
+    for table in (DataType.RECIPES, DataType.INTERACTIONS):
+        adapter.load(table)
+        struct_logger.info("binary_snapshot_ready", path=str(adapter.binary_path(table)))
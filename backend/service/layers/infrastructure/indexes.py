@@ -0,0 +1,111 @@
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from service.layers.infrastructure.types import DataType
+
+INDEXED_COLUMNS: dict[DataType, tuple[str, ...]] = {
+    DataType.RECIPES: ("id", "contributor_id", "submitted", "minutes"),
+    DataType.INTERACTIONS: ("user_id", "recipe_id", "date", "rating"),
+}
+
+DATE_COLUMNS = {"submitted", "date"}
+
+
+class QueryError(ValueError):
+    """Raised when a row query references unknown columns or filters."""
+
+
+@dataclass(frozen=True)
+class SortedColumnIndex:
+    """Column values sorted once, with the row positions that produced them.
+
+    Equality and range lookups become two ``searchsorted`` calls instead of
+    a boolean scan over the whole column.
+    """
+
+    kind: str
+    values: np.ndarray
+    positions: np.ndarray
+
+    @classmethod
+    def build(cls, column: str, series: pd.Series) -> "SortedColumnIndex":
+        kind, keys = _index_keys(column, series)
+        valid = ~pd.isna(keys)
+        valid_positions = np.flatnonzero(valid)
+        valid_keys = keys[valid]
+        order = np.argsort(valid_keys, kind="stable")
+        return cls(kind=kind, values=valid_keys[order], positions=valid_positions[order])
+
+    def coerce(self, value: Any) -> Any:
+        """``value`` as a key comparable with the index; ``QueryError`` when it cannot be."""
+        try:
+            match self.kind:
+                case "datetime":
+                    return np.datetime64(pd.Timestamp(value).to_datetime64(), "ns")
+                case "numeric":
+                    return float(value)
+                case _:
+                    return str(value)
+        except (TypeError, ValueError) as e:
+            raise QueryError(f"Invalid {self.kind} filter value: {value!r}") from e
+
+    def between(self, low: Any = None, high: Any = None) -> np.ndarray:
+        """Sorted row positions whose value lies in ``[low, high]``."""
+        start = 0 if low is None else np.searchsorted(self.values, self.coerce(low), "left")
+        stop = (
+            len(self.values)
+            if high is None
+            else np.searchsorted(self.values, self.coerce(high), "right")
+        )
+        return np.sort(self.positions[start:stop])
+
+    def equal(self, value: Any) -> np.ndarray:
+        return self.between(value, value)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.values.nbytes + self.positions.nbytes)
+
+
+class TableIndex:
+    """Sorted indexes over the filterable columns of one loaded table."""
+
+    def __init__(self, columns: dict[str, SortedColumnIndex], row_count: int):
+        self.columns = columns
+        self.row_count = row_count
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, data_type: DataType) -> "TableIndex":
+        columns = {
+            col: SortedColumnIndex.build(col, df[col])
+            for col in INDEXED_COLUMNS.get(data_type, ())
+            if col in df.columns
+        }
+        return cls(columns, len(df))
+
+    def get(self, column: str) -> SortedColumnIndex | None:
+        return self.columns.get(column)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(index.nbytes for index in self.columns.values())
+
+
+def _index_keys(column: str, series: pd.Series) -> tuple[str, np.ndarray]:
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype(object)
+
+    if column in DATE_COLUMNS:
+        dates = pd.to_datetime(series, errors="coerce")
+        return "datetime", dates.to_numpy(dtype="datetime64[ns]")
+
+    numeric = pd.to_numeric(series, errors="coerce")
+    if numeric.isna().sum() == series.isna().sum():
+        return "numeric", numeric.to_numpy(dtype=float, na_value=np.nan)
+
+    text = series.astype(object).where(series.notna(), None)
+    keys = np.array([None if v is None else str(v) for v in text], dtype=object)
+    return "text", keys
@@ -4,3 +4,15 @@ from enum import StrEnum
 class DataType(StrEnum):
     INTERACTIONS = "interactions"
     RECIPES = "recipes"
+
+
+class ResponseFormat(StrEnum):
+    JSON = "json"
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+class ExportFormat(StrEnum):
+    CSV = "csv"
+    CSV_GZIP = "csv.gz"
+    PARQUET = "parquet"
@@ -1,27 +1,432 @@
 # service/layers/logger.py
+import atexit
+import json
 import logging
+import logging.handlers
+import os
+import queue
+import random
+import secrets
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO, Any, Iterator, Optional
 
 import structlog
 from structlog.dev import ConsoleRenderer
+from structlog.typing import EventDict, WrappedLogger
 
-logging.basicConfig(
-    format="%(message)s",
-    level=logging.INFO,
-)
-
-structlog.configure(
-    processors=[
-        structlog.contextvars.merge_contextvars,
-        structlog.processors.add_log_level,
-        structlog.processors.TimeStamper(fmt="%Y-%m-%d %H:%M:%S"),
-        structlog.processors.StackInfoRenderer(),
-        structlog.processors.format_exc_info,
-        ConsoleRenderer(),
-    ],
-    context_class=dict,
-    logger_factory=structlog.stdlib.LoggerFactory(),
-    wrapper_class=structlog.make_filtering_bound_logger(logging.INFO),
-    cache_logger_on_first_use=True,
-)
+from service.layers.domain.mange_ta_main import LOG_FORMAT, LOG_QUEUE_SIZE, LOG_SAMPLING
+
+
+def parse_sampling(setting: str) -> dict[str, float]:
+    """``"span=0.1,*=0.5"``: keep-rates of info/debug events, by event name or ``*``."""
+    rates = {}
+    for item in filter(None, (part.strip() for part in setting.split(","))):
+        event, _, rate = item.rpartition("=")
+        if not event or not 0.0 <= float(rate) <= 1.0:
+            raise ValueError(f"Invalid log sampling rule: {item!r}")
+        rates[event.strip()] = float(rate)
+    return rates
+
+
+class EventSampler:
+    """Drops a share of info/debug events, per event name; warnings and errors are all kept.
+
+    Kept events of a sampled name carry ``sample_rate`` so counts can be
+    scaled back up.
+    """
+
+    def __init__(self, rates: dict[str, float]):
+        self.rates = dict(rates)
+        self.default = self.rates.pop("*", 1.0)
+
+    def __call__(self, logger: WrappedLogger, method_name: str, event_dict: EventDict) -> EventDict:
+        if method_name not in ("debug", "info"):
+            return event_dict
+        rate = self.rates.get(event_dict.get("event"), self.default)
+        if rate < 1.0:
+            if random.random() >= rate:
+                raise structlog.DropEvent
+            event_dict["sample_rate"] = rate
+        return event_dict
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Hands records, unformatted, to the listener thread; drops them when the queue is full.
+
+    Rendering and writing happen on the listener thread, so a log call on a
+    request path costs a queue put and never waits on a slow stream.
+    """
+
+    def __init__(self, log_queue: "queue.Queue[logging.LogRecord]"):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _capture_exc_info(logger: WrappedLogger, method_name: str, event_dict: EventDict) -> EventDict:
+    # The traceback is only reachable from the thread handling the exception.
+    if event_dict.get("exc_info") is True:
+        event_dict["exc_info"] = sys.exc_info()
+    return event_dict
+
+
+def _record_timestamp(logger: WrappedLogger, method_name: str, event_dict: EventDict) -> EventDict:
+    record = event_dict.get("_record")
+    created = record.created if record is not None else time.time()
+    event_dict["timestamp"] = datetime.fromtimestamp(created, timezone.utc).isoformat()
+    return event_dict
+
+
+def json_formatter() -> structlog.stdlib.ProcessorFormatter:
+    """Renders structlog and stdlib records as one JSON object per line."""
+    return structlog.stdlib.ProcessorFormatter(
+        foreign_pre_chain=[structlog.stdlib.add_log_level, structlog.stdlib.add_logger_name],
+        processors=[
+            _record_timestamp,
+            structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+            structlog.processors.format_exc_info,
+            structlog.processors.JSONRenderer(default=str),
+        ],
+    )
+
+
+_queue_handler: Optional[DroppingQueueHandler] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def configure_logging(
+    log_format: str = LOG_FORMAT,
+    sampling: str = LOG_SAMPLING,
+    queue_size: int = LOG_QUEUE_SIZE,
+    stream: Optional[IO[str]] = None,
+) -> Optional[logging.handlers.QueueListener]:
+    """Console logs for development; ``json`` renders through a background queue listener.
+
+    In ``json`` mode only the event dict is built on the calling thread; the
+    listener renders it and writes it to ``stream`` (stderr by default) and
+    records are dropped, not waited for, once ``queue_size`` are pending.
+    Returns the started listener, stopped (and drained) at exit. Forked
+    children do not inherit the listener thread and write directly instead.
+    """
+    global _queue_handler, _listener
+
+    sampler = EventSampler(parse_sampling(sampling))
+    if log_format != "json":
+        logging.basicConfig(format="%(message)s", level=logging.INFO, stream=stream)
+        structlog.configure(
+            processors=[
+                sampler,
+                structlog.contextvars.merge_contextvars,
+                structlog.processors.add_log_level,
+                structlog.processors.TimeStamper(fmt="%Y-%m-%d %H:%M:%S"),
+                structlog.processors.StackInfoRenderer(),
+                structlog.processors.format_exc_info,
+                ConsoleRenderer(),
+            ],
+            context_class=dict,
+            logger_factory=structlog.stdlib.LoggerFactory(),
+            wrapper_class=structlog.make_filtering_bound_logger(logging.INFO),
+            cache_logger_on_first_use=True,
+        )
+        return None
+
+    output = logging.StreamHandler(stream)
+    output.setFormatter(json_formatter())
+    _queue_handler = DroppingQueueHandler(queue.Queue(maxsize=queue_size))
+    listener = _listener = logging.handlers.QueueListener(_queue_handler.queue, output)
+    root = logging.getLogger()
+    root.handlers = [_queue_handler]
+    root.setLevel(logging.INFO)
+    structlog.configure(
+        processors=[
+            sampler,
+            structlog.contextvars.merge_contextvars,
+            structlog.processors.add_log_level,
+            _capture_exc_info,
+            structlog.stdlib.ProcessorFormatter.wrap_for_formatter,
+        ],
+        context_class=dict,
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        wrapper_class=structlog.make_filtering_bound_logger(logging.INFO),
+        cache_logger_on_first_use=True,
+    )
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
+def logging_stats() -> dict[str, int]:
+    """Records dropped and pending in the JSON log queue (zeros in console mode)."""
+    if _queue_handler is None:
+        return {"dropped": 0, "queued": 0}
+    return {"dropped": _queue_handler.dropped, "queued": _queue_handler.queue.qsize()}
+
+
+def _log_directly_after_fork() -> None:
+    """In a forked child, swap the queue handler for the listener's own output handler.
+
+    Only the forking thread survives a fork: nothing would drain the queue
+    (and its lock may have been held by the listener thread), so the child's
+    records are rendered and written on the calling thread, as in console mode.
+    """
+    global _queue_handler, _listener
+    if _queue_handler is None or _listener is None:
+        return
+    root = logging.getLogger()
+    root.handlers = [h for h in root.handlers if h is not _queue_handler] + list(_listener.handlers)
+    atexit.unregister(_listener.stop)
+    _queue_handler = _listener = None
+
+
+os.register_at_fork(after_in_child=_log_directly_after_fork)
+
+configure_logging()
 
 struct_logger = structlog.get_logger()
+
+
+class PhaseTimer:
+    """Times named phases of a longer operation, logging each one as ``event``."""
+
+    def __init__(self, event: str):
+        self.event = event
+        self.phases: dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            with span(name, log=False, operation=self.event):
+                yield
+        finally:
+            self.phases[name] = round(time.perf_counter() - started, 3)
+            struct_logger.info(self.event, phase=name, seconds=self.phases[name])
+
+    def add(self, prefix: str, phases: dict[str, float]) -> None:
+        """Merge the phases of a sub-operation, already logged, under ``prefix``."""
+        self.phases.update({f"{prefix}.{name}": seconds for name, seconds in phases.items()})
+
+
+# --------------------------------------------------------------------------------------
+# Request-scoped tracing spans
+# --------------------------------------------------------------------------------------
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+
+@dataclass
+class Span:
+    """A timed operation of a trace, nested under the span active when it started."""
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_span_id: Optional[str]
+    kind: int = SPAN_KIND_INTERNAL
+    attributes: dict[str, Any] = field(default_factory=dict)
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: Optional[int] = None
+    status: int = STATUS_OK
+    # Shared by the spans of a trace, exported together when the root span ends.
+    finished: list["Span"] = field(default_factory=list, repr=False)
+    # Start of the current stage (see ``close_stage``).
+    lap_ns: int = 0
+
+    @property
+    def seconds(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+
+class SpanFileExporter:
+    """Appends finished traces to ``path``, one OTLP/JSON ``ExportTraceServiceRequest`` per line.
+
+    This is the format of the OpenTelemetry collector's file exporter, so the
+    file can be replayed with its ``otlpjsonfile`` receiver into any tracing
+    backend, or read line by line with ``json``.
+    """
+
+    def __init__(self, path: Path, service_name: str = "mange_ta_main"):
+        self.path = path
+        self.service_name = service_name
+        self._lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+    def export(self, spans: list[Span]) -> None:
+        line = json.dumps(self.encode(spans), separators=(",", ":"), default=str) + "\n"
+        with self._lock, open(self.path, "a", encoding="utf-8") as fh:
+            fh.write(line)
+
+    def encode(self, spans: list[Span]) -> dict[str, Any]:
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": _otlp_attributes({"service.name": self.service_name})
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": __name__},
+                            "spans": [_otlp_span(s) for s in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: dict[str, Any]) -> list[dict[str, Any]]:
+    return [{"key": k, "value": _otlp_value(v)} for k, v in attributes.items() if v is not None]
+
+
+def _otlp_span(s: Span) -> dict[str, Any]:
+    encoded = {
+        "traceId": s.trace_id,
+        "spanId": s.span_id,
+        "name": s.name,
+        "kind": s.kind,
+        "startTimeUnixNano": str(s.start_ns),
+        "endTimeUnixNano": str(s.end_ns),
+        "attributes": _otlp_attributes(s.attributes),
+        "status": {"code": s.status},
+    }
+    if s.parent_span_id is not None:
+        encoded["parentSpanId"] = s.parent_span_id
+    return encoded
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+_exporter: Optional[SpanFileExporter] = None
+
+
+def set_span_exporter(exporter: Optional[SpanFileExporter]) -> None:
+    """Export finished traces with ``exporter`` (``None`` only logs spans)."""
+    global _exporter
+    _exporter = exporter
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def new_request_id() -> str:
+    return secrets.token_hex(16)
+
+
+@contextmanager
+def bind_request(request_id: str) -> Iterator[None]:
+    """Add ``request_id`` to every log event emitted in this context, threads included."""
+    with structlog.contextvars.bound_contextvars(request_id=request_id):
+        yield
+
+
+def _start_span(name: str, kind: int, attributes: dict[str, Any]) -> Span:
+    parent = _current_span.get()
+    if parent is None:
+        return Span(
+            name=name,
+            trace_id=secrets.token_hex(16),
+            span_id=secrets.token_hex(8),
+            parent_span_id=None,
+            kind=kind,
+            attributes=attributes,
+        )
+    return Span(
+        name=name,
+        trace_id=parent.trace_id,
+        span_id=secrets.token_hex(8),
+        parent_span_id=parent.span_id,
+        kind=kind,
+        attributes=attributes,
+        finished=parent.finished,
+    )
+
+
+def _finish_span(s: Span, log: bool) -> None:
+    s.finished.append(s)
+    if log:
+        fields = {
+            "span": s.name,
+            "trace_id": s.trace_id,
+            "span_id": s.span_id,
+            "parent_span_id": s.parent_span_id,
+            "seconds": round(s.seconds, 6),
+            "error": s.status == STATUS_ERROR or None,
+            **s.attributes,
+        }
+        struct_logger.info("span", **{k: v for k, v in fields.items() if v is not None})
+    if s.parent_span_id is None and _exporter is not None:
+        try:
+            _exporter.export(s.finished)
+        except OSError as e:
+            struct_logger.warning("span_export_failed", error=str(e))
+
+
+@contextmanager
+def span(
+    name: str, kind: int = SPAN_KIND_INTERNAL, log: bool = True, **attributes: Any
+) -> Iterator[Span]:
+    """Time the enclosed block as a child of the current span (or as a new trace).
+
+    The span is logged as a ``span`` event carrying the bound request id and,
+    when an exporter is set, its whole trace is exported once the root span
+    ends. Spans follow the context into threadpool work, not into worker
+    processes. ``log=False`` is for callers that already log the timing.
+    """
+    s = _start_span(name, kind, attributes)
+    s.lap_ns = s.start_ns
+    token = _current_span.set(s)
+    try:
+        yield s
+    except BaseException:
+        s.status = STATUS_ERROR
+        raise
+    finally:
+        _current_span.reset(token)
+        s.end_ns = time.time_ns()
+        _finish_span(s, log)
+
+
+def close_stage(name: str, **attributes: Any) -> None:
+    """Record everything since the previous stage of the current span as a child span.
+
+    For steps that are only marked once done (analysis stages); a no-op
+    outside a span.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return
+    s = _start_span(name, SPAN_KIND_INTERNAL, attributes)
+    s.start_ns = parent.lap_ns
+    s.end_ns = parent.lap_ns = time.time_ns()
+    _finish_span(s, log=True)
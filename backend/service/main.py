@@ -1,24 +1,107 @@
+import threading
 from contextlib import asynccontextmanager
+from functools import partial
+from pathlib import Path
 
+from dependency_injector import providers
 from fastapi import FastAPI
 
 from service.container import Container
-from service.layers.api.mange_ta_main import router
-from service.layers.logger import struct_logger
+from service.layers.api.mange_ta_main import router, warm_analyses
+from service.layers.api.metrics import RequestMetricsMiddleware
+from service.layers.api.tracing import RequestTracingMiddleware
+from service.layers.application.mange_ta_main import DataAnylizer
+from service.layers.application.memory import Evictable
+from service.layers.domain.mange_ta_main import TRACE_EXPORT_PATH
+from service.layers.infrastructure.types import DataType
+from service.layers.logger import (
+    PhaseTimer,
+    SpanFileExporter,
+    set_span_exporter,
+    span,
+    struct_logger,
+)
+
+# An interrupted load is abandoned (the thread is a daemon) after this delay.
+SHUTDOWN_LOAD_WAIT_SECONDS = 5
+
+
+def install_analyzer(container: Container, data_analyzer: DataAnylizer) -> None:
+    """Make ``data_analyzer`` the one served to new requests."""
+    container.analysis_executor().start(data_analyzer)
+    container.memory_governor().start(data_analyzer)
+    container.data_analyzer.override(providers.Object(data_analyzer))
+
+
+def load_dataset(container: Container) -> None:
+    """Load, index and warm the dataset, then mark the service ready.
+
+    Runs in a background thread so ``/health`` answers during the load and
+    ``/ready`` can report its progress; the adapter reports the reading and
+    typing phases itself.
+    """
+    readiness = container.readiness()
+    timer = PhaseTimer("startup_phase")
+    with span("startup"):
+        try:
+            with timer.phase("dataset"):
+                data_analyzer = container.data_analyzer()
+            timer.add("dataset", data_analyzer.load_timings)
+            readiness.enter("indexing")
+            with timer.phase("indexing"):
+                for data_type in DataType:
+                    data_analyzer.get_index(data_type)
+            with timer.phase("analysis_pool"):
+                container.analysis_executor().start(data_analyzer)
+            container.memory_governor().start(data_analyzer)
+            readiness.enter("warming")
+            with timer.phase("warming"):
+                data_analyzer.precompute(progress=readiness.advance)
+                warm_analyses(data_analyzer, container.response_cache())
+            container.dataset_refresher().start(
+                current=container.data_analyzer,
+                install=partial(install_analyzer, container),
+                warmers=[
+                    lambda analyzer: analyzer.precompute(),
+                    partial(warm_analyses, response_cache=container.response_cache()),
+                ],
+            )
+        except Exception as e:  # noqa: BLE001 - reported by /ready, the process stays up
+            readiness.fail(f"{type(e).__name__}: {e}")
+            struct_logger.exception("startup_failed", **timer.phases)
+            return
+        readiness.complete()
+        struct_logger.info("startup_complete", **timer.phases)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     container = Container()
     app.state.container = container
-    struct_logger.info("Preloading data at startup...")
-    container.data_analyzer()
-    struct_logger.info("Data preloaded successfully")
+    if TRACE_EXPORT_PATH:
+        set_span_exporter(SpanFileExporter(Path(TRACE_EXPORT_PATH)))
+    response_cache = container.response_cache()
+    container.memory_governor().track(
+        Evictable("response_cache", 0, lambda: response_cache.nbytes, response_cache.trim)
+    )
+    struct_logger.info("Loading data in the background...")
+    loader = threading.Thread(
+        target=load_dataset, args=(container,), name="dataset-load", daemon=True
+    )
+    loader.start()
     yield
     struct_logger.info("Shutting down...")
+    loader.join(timeout=SHUTDOWN_LOAD_WAIT_SECONDS)
+    container.dataset_refresher().stop()
+    container.analysis_executor().shutdown()
+    container.job_manager().shutdown()
+    set_span_exporter(None)
 
 
 app = FastAPI(lifespan=lifespan)
+app.add_middleware(RequestMetricsMiddleware)
+# Added last so it runs first: metrics and handlers see the bound request id.
+app.add_middleware(RequestTracingMiddleware)
 
 struct_logger.info("App starting...")
 
@@ -1,3 +1,4 @@
+import time
 from typing import Iterator
 from unittest.mock import MagicMock
 
@@ -8,7 +9,18 @@ from fastapi.testclient import TestClient
 
 import service.main as service_main
 from service.layers.api import mange_ta_main as api_module
+from service.layers.api.admission import AdmissionController
+from service.layers.api.metrics import MetricsRegistry
+from service.layers.api.response_cache import ResponseCache
+from service.layers.application.executor import AnalysisExecutor
+from service.layers.application.interfaces.interface import IDataAdapter
+from service.layers.application.jobs import JobManager
 from service.layers.application.mange_ta_main import AnalysisType
+from service.layers.application.memory import MemoryGovernor
+from service.layers.application.readiness import Readiness
+from service.layers.application.single_flight import SingleFlight
+from service.layers.infrastructure.indexes import TableIndex
+from service.layers.infrastructure.types import DataType
 from service.main import app
 
 
@@ -213,7 +225,11 @@ def rich_interactions() -> pd.DataFrame:
 @pytest.fixture
 def api_stub_analyzer():
     class StubAnalyzer:
+        version = "test"
+
         def __init__(self):
+            self.load_timings: dict[str, float] = {}
+            self.single_flight = SingleFlight()
             self.raw = (
                 pd.DataFrame([{"id": 1, "value": "recipes"}]),
                 pd.DataFrame([{"id": 2, "value": "interactions"}]),
@@ -222,16 +238,73 @@ def api_stub_analyzer():
         def get_raw_data(self):
             return self.raw
 
+        def get_frame(self, data_type: DataType) -> pd.DataFrame:
+            return self.raw[0] if data_type == DataType.RECIPES else self.raw[1]
+
+        def get_index(self, data_type: DataType) -> TableIndex:
+            return TableIndex.build(self.get_frame(data_type), data_type)
+
+        def precomputed(self, analysis_type: AnalysisType) -> None:
+            return None
+
+        def frame_memory(self) -> dict[str, int]:
+            return {"recipes": 0, "interactions": 0}
+
+        def memory_usage(self) -> dict[str, int]:
+            return {"frames": 0, "indexes": 0, "results": 0}
+
+        def drop_indexes(self) -> int:
+            return 0
+
+        def drop_results(self) -> int:
+            return 0
+
+        def precompute(self, progress=None) -> None:
+            pass
+
         def process_data(self, analysis_type: AnalysisType) -> pd.DataFrame:
             return pd.DataFrame([{"analysis": analysis_type.value}])
 
+        def derive(self, analysis_type: AnalysisType, dependency: pd.DataFrame) -> pd.DataFrame:
+            return pd.DataFrame(
+                [{"analysis": analysis_type.value, "from": dependency["analysis"].iloc[0]}]
+            )
+
     return StubAnalyzer()
 
 
 @pytest.fixture
-def stub_container(api_stub_analyzer):
+def raw_adapter_factory():
+    """Adapter class serving a tiny raw dataset, as forked cleaning jobs expect."""
+
+    class RawAdapter(IDataAdapter):
+        def load(self, data_type: DataType, raw: bool = False) -> pd.DataFrame:
+            if data_type == DataType.RECIPES:
+                return pd.DataFrame(
+                    {"name": ["Cake", None], "id": [1, 2], "contributor_id": ["a", "b"]}
+                )
+            return pd.DataFrame({"user_id": ["x"], "rating": [5], "review": ["Nice"]})
+
+        def save(self, df: pd.DataFrame, data_type: DataType) -> None:
+            pass
+
+        def version(self, data_type: DataType) -> str:
+            return "raw"
+
+    return RawAdapter
+
+
+@pytest.fixture
+def stub_container(api_stub_analyzer, raw_adapter_factory):
     container = MagicMock()
     container.data_analyzer.return_value = api_stub_analyzer
+    container.response_cache.return_value = ResponseCache()
+    container.analysis_executor.return_value = AnalysisExecutor(workers=0)
+    container.admission.return_value = AdmissionController()
+    container.job_manager.return_value = JobManager(adapter_factory=raw_adapter_factory)
+    container.readiness.return_value = Readiness()
+    container.metrics.return_value = MetricsRegistry()
+    container.memory_governor.return_value = MemoryGovernor(budget_bytes=None)
     return container
 
 
@@ -240,5 +313,11 @@ def api_client(api_stub_analyzer, stub_container, monkeypatch) -> Iterator[TestC
     monkeypatch.setattr(service_main, "Container", lambda: stub_container)
     app.dependency_overrides[api_module.get_data_analyzer] = lambda: api_stub_analyzer
     with TestClient(app) as client:
+        # Tests start once the background load is done, from a cold response cache.
+        readiness = stub_container.readiness()
+        deadline = time.monotonic() + 10
+        while not readiness.ready and time.monotonic() < deadline:
+            time.sleep(0.01)
+        stub_container.response_cache().clear()
         yield client
     app.dependency_overrides.clear()
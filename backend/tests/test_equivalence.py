@@ -0,0 +1,300 @@
+"""Reference-equivalence harness for the analyses.
+
+Random recipe/interaction frames (NaNs, empty and ``<br/>`` reviews, invalid
+dates, list and string tags, optional columns dropped or renamed to the
+variants ``_find_col`` resolves) are run through the pandas reference,
+``compute_analysis``, and through every other path that can serve an
+analysis. Each path must return the same frame, within float tolerance, or
+raise the same exception type.
+
+A faster engine is checked by adding it to ``CANDIDATES``. Set
+``EQUIVALENCE_EXAMPLES`` to run more random datasets than the default.
+"""
+
+import asyncio
+import json
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from service.layers.api.mange_ta_main import iter_encoded_rows, render_json
+from service.layers.application.executor import AnalysisExecutor
+from service.layers.application.interfaces.interface import IDataAdapter
+from service.layers.application.mange_ta_main import (
+    SERVED_ANALYSES,
+    AnalysisType,
+    DataAnylizer,
+    compute_analysis,
+)
+from service.layers.infrastructure.csv_adapter import CSVAdapter
+from service.layers.infrastructure.types import DataType, ResponseFormat
+
+EXAMPLES = int(os.getenv("EQUIVALENCE_EXAMPLES", "20"))
+# Published snapshots store floats as float32 (``CSVAdapter._optimize_memory``),
+# so results computed from them match the reference to float32 precision.
+RTOL = 1e-6
+ATOL = 1e-9
+
+Outcome = Union[pd.DataFrame, Exception]
+Results = dict[AnalysisType, Outcome]
+
+TAGS = ["quick", "easy", "Dessert", "main-dish", " vegan ", "60-minutes-or-less"]
+WORDS = ["great", "easy", "loved", "it", "<br/>", "too", "salty", "will", "make", "again"]
+
+# Optional columns and the alternative names ``_find_col`` resolves for them.
+INTERACTION_VARIANTS = {
+    "review": ["Review", "review_text"],
+    "date": ["Date", "review_date"],
+    "rating": ["Rating", "stars"],
+}
+
+
+def _tags(rng: np.random.Generator) -> object:
+    picked = [str(t) for t in rng.choice(TAGS, int(rng.integers(0, 4)), replace=False)]
+    match int(rng.integers(0, 6)):
+        case 0:
+            return None
+        case 1:
+            return ""
+        case 2:
+            return ", ".join(picked)
+        case 3:
+            return picked
+        case _:
+            return str(picked)
+
+
+def _review(rng: np.random.Generator) -> object:
+    match int(rng.integers(0, 8)):
+        case 0:
+            return None
+        case 1:
+            return ""
+        case 2:
+            return "  <br/> "
+        case _:
+            return " ".join(rng.choice(WORDS, int(rng.integers(1, 12))))
+
+
+def _date(rng: np.random.Generator) -> object:
+    match int(rng.integers(0, 12)):
+        case 0:
+            return None
+        case 1:
+            return "not-a-date"
+        case _:
+            day = pd.Timestamp("2001-01-01") + pd.Timedelta(days=int(rng.integers(0, 6000)))
+            return day.strftime("%Y-%m-%d")
+
+
+def _with_nans(rng: np.random.Generator, values: np.ndarray, share: float) -> np.ndarray:
+    values = values.astype(float)
+    values[rng.random(len(values)) < share] = np.nan
+    return values
+
+
+def random_dataset(seed: int) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Small recipe and interaction frames with the irregularities of real data."""
+    rng = np.random.default_rng(seed)
+    n_recipes = int(rng.choice([0, 1, 3, 12, 40]))
+    n_interactions = int(rng.choice([0, 1, 5, 30, 150])) if n_recipes else 0
+    n_contributors = max(1, n_recipes // 3)
+
+    ids = rng.permutation(np.arange(100, 100 + 3 * max(n_recipes, 1)))[:n_recipes]
+    recipes = pd.DataFrame(
+        {
+            "name": [f"recipe {i}" for i in range(n_recipes)],
+            "id": ids,
+            "minutes": _with_nans(rng, rng.lognormal(3.5, 1.2, n_recipes).round(), 0.1),
+            "contributor_id": rng.integers(1, n_contributors + 1, n_recipes),
+            "tags": [_tags(rng) for _ in range(n_recipes)],
+            "n_steps": rng.integers(1, 15, n_recipes),
+        }
+    )
+
+    known = ids if n_recipes else np.array([0])
+    recipe_ids = np.where(
+        rng.random(n_interactions) < 0.9,
+        rng.choice(known, n_interactions),
+        rng.integers(10_000, 10_100, n_interactions),
+    )
+    interactions = pd.DataFrame(
+        {
+            "user_id": rng.integers(1, max(2, n_interactions // 2), n_interactions),
+            "recipe_id": recipe_ids,
+            "date": [_date(rng) for _ in range(n_interactions)],
+            "rating": _with_nans(rng, rng.choice([0, 1, 2, 3, 4, 5], n_interactions), 0.05),
+            "review": [_review(rng) for _ in range(n_interactions)],
+        }
+    )
+
+    for column, variants in INTERACTION_VARIANTS.items():
+        match int(rng.integers(0, 6)):
+            case 0:
+                interactions = interactions.drop(columns=column)
+            case 1:
+                interactions = interactions.rename(columns={column: str(rng.choice(variants))})
+    if rng.random() < 0.15:
+        recipes = recipes.drop(columns="tags")
+    return recipes, interactions
+
+
+def _outcome(fn: Callable[..., pd.DataFrame], *args: Any) -> Outcome:
+    """``fn(*args)``, or the exception it raised: paths must fail the way the reference does."""
+    try:
+        return fn(*args)
+    except Exception as e:  # noqa: BLE001 - compared with the reference's exception type
+        return e
+
+
+class FrameAdapter(IDataAdapter):
+    """Serves in-memory frames, keeping persisted results pickled like ``CSVAdapter``."""
+
+    def __init__(self, recipes: pd.DataFrame, interactions: pd.DataFrame):
+        self.frames = {DataType.RECIPES: recipes, DataType.INTERACTIONS: interactions}
+        self.results: dict[str, bytes] = {}
+
+    def load(self, data_type: DataType, raw: bool = False) -> pd.DataFrame:
+        return self.frames[data_type]
+
+    def save(self, df: pd.DataFrame, data_type: DataType) -> None:
+        self.frames[data_type] = df
+
+    def version(self, data_type: DataType) -> str:
+        return f"{data_type.value}-{len(self.frames[data_type])}"
+
+    def load_results(self, version: str) -> Optional[dict[str, pd.DataFrame]]:
+        payload = self.results.get(version)
+        return None if payload is None else pickle.loads(payload)
+
+    def save_results(self, version: str, results: dict[str, pd.DataFrame]) -> None:
+        self.results[version] = pickle.dumps(results, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+# --------------------------------------------------------------------------------------
+# Paths that serve analyses, each compared with the reference
+# --------------------------------------------------------------------------------------
+
+
+def reference(recipes: pd.DataFrame, interactions: pd.DataFrame, tmp_path: Path) -> Results:
+    return {
+        a: _outcome(compute_analysis, a, recipes.copy(), interactions.copy())
+        for a in SERVED_ANALYSES
+    }
+
+
+def single_flight(recipes: pd.DataFrame, interactions: pd.DataFrame, tmp_path: Path) -> Results:
+    analyzer = DataAnylizer(FrameAdapter(recipes.copy(), interactions.copy()))
+    return {a: _outcome(analyzer.process_data, a) for a in SERVED_ANALYSES}
+
+
+def precomputed_results(
+    recipes: pd.DataFrame, interactions: pd.DataFrame, tmp_path: Path
+) -> Results:
+    """Results persisted as ``precompute`` does and read back by the next analyzer.
+
+    ``precompute`` itself stops at the first failing analysis, so failures
+    are kept as computed and only the results that exist are persisted.
+    """
+    adapter = FrameAdapter(recipes.copy(), interactions.copy())
+    analyzer = DataAnylizer(adapter)
+    computed = {a: _outcome(analyzer.process_data, a) for a in SERVED_ANALYSES}
+    adapter.save_results(
+        analyzer.version,
+        {a.value: df for a, df in computed.items() if isinstance(df, pd.DataFrame)},
+    )
+    restarted = DataAnylizer(adapter)
+    return {
+        a: outcome if isinstance(outcome, Exception) else restarted.precomputed(a)
+        for a, outcome in computed.items()
+    }
+
+
+def published_snapshot(
+    recipes: pd.DataFrame, interactions: pd.DataFrame, tmp_path: Path
+) -> Results:
+    """Tables published as CSV snapshots and loaded back typed and memory-optimized."""
+    adapter = CSVAdapter(tmp_path / "data")
+    adapter.save(recipes.copy(), DataType.RECIPES)
+    adapter.save(interactions.copy(), DataType.INTERACTIONS)
+    analyzer = DataAnylizer(CSVAdapter(tmp_path / "data"))
+    return {a: _outcome(analyzer.compute, a) for a in SERVED_ANALYSES}
+
+
+def process_pool(recipes: pd.DataFrame, interactions: pd.DataFrame, tmp_path: Path) -> Results:
+    analyzer = DataAnylizer(FrameAdapter(recipes.copy(), interactions.copy()))
+    executor = AnalysisExecutor(workers=1)
+    executor.start(analyzer)
+    try:
+        return {a: _outcome(asyncio.run, executor.run(analyzer, a)) for a in SERVED_ANALYSES}
+    finally:
+        executor.shutdown()
+
+
+CANDIDATES: dict[str, Callable[[pd.DataFrame, pd.DataFrame, Path], Results]] = {
+    "single_flight": single_flight,
+    "precomputed_results": precomputed_results,
+    "published_snapshot": published_snapshot,
+    "process_pool": process_pool,
+}
+
+
+def _normalized(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.reset_index(drop=True)
+    for column in df.columns:
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype(object)
+        if df[column].dtype == object:
+            # None and NaN are both served as null.
+            df[column] = df[column].where(df[column].notna(), np.nan)
+    return df
+
+
+def assert_equivalent(expected: Outcome, actual: Outcome, context: str) -> None:
+    if isinstance(expected, Exception) or isinstance(actual, Exception):
+        assert type(actual) is type(expected), f"{context}: {actual!r} != {expected!r}"
+        return
+    assert list(actual.columns) == list(expected.columns), context
+    pd.testing.assert_frame_equal(
+        _normalized(actual),
+        _normalized(expected),
+        check_dtype=False,
+        check_column_type=False,
+        check_index_type=False,
+        check_categorical=False,
+        rtol=RTOL,
+        atol=ATOL,
+        obj=context,
+    )
+
+
+@pytest.mark.parametrize("seed", range(EXAMPLES))
+@pytest.mark.parametrize("candidate", sorted(CANDIDATES))
+def test_candidate_matches_reference(candidate: str, seed: int, tmp_path: Path):
+    recipes, interactions = random_dataset(seed)
+    expected = reference(recipes, interactions, tmp_path)
+    actual = CANDIDATES[candidate](recipes, interactions, tmp_path)
+
+    for analysis in SERVED_ANALYSES:
+        assert_equivalent(expected[analysis], actual[analysis], f"{candidate}/{analysis}/{seed}")
+
+
+@pytest.mark.parametrize("seed", range(EXAMPLES))
+def test_streamed_json_matches_response_body(seed: int):
+    recipes, interactions = random_dataset(seed)
+    for analysis, result in reference(recipes, interactions, Path()).items():
+        if isinstance(result, Exception):
+            continue
+        body = json.loads(render_json(result))
+        streamed = json.loads(
+            b"".join(iter_encoded_rows(result, ResponseFormat.JSON, chunk_size=7))
+        )
+        assert len(streamed) == len(body)
+        assert_equivalent(
+            pd.DataFrame(body), pd.DataFrame(streamed), f"streamed_json/{analysis}/{seed}"
+        )
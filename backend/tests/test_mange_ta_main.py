@@ -1,3 +1,17 @@
+import asyncio
+import atexit
+import gzip
+import io
+import json
+import logging
+import logging.handlers
+import multiprocessing
+import pickle
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
 from pathlib import Path
 from types import SimpleNamespace
 from typing import cast
@@ -6,25 +20,84 @@ from unittest.mock import MagicMock
 import numpy as np
 import pandas as pd
 import pytest
+import structlog
 from dependency_injector import providers
-from fastapi import Request
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
 from fastapi.testclient import TestClient
+from starlette.requests import ClientDisconnect
 
 import service.main as service_main
+from benchmarks import load_test, logging_overhead
+from benchmarks import run as bench
+from benchmarks import synthetic
 from service.container import Container
+from service.layers.api import export
 from service.layers.api import mange_ta_main as api_module
+from service.layers.api.admission import (
+    AdmissionController,
+    AdmissionRejected,
+    AdmittedStreamingResponse,
+    ClassBudget,
+    CostClass,
+)
+from service.layers.api.metrics import (
+    Histogram,
+    MetricsRegistry,
+    RequestMetricsMiddleware,
+)
+from service.layers.api.response_cache import (
+    EncodedResponse,
+    ResponseCache,
+    negotiate_encoding,
+)
+from service.layers.api.tracing import RequestTracingMiddleware
+from service.layers.application import executor as executor_module
 from service.layers.application import mange_ta_main as mtm
 from service.layers.application.data_cleaning import (
+    CLEANING_STAGES,
     clean_data,
+    clean_frame,
     normalize_ids,
     remove_outliers,
 )
+from service.layers.application.data_query import QueryError, RowQuery, select_rows
+from service.layers.application.dataset_refresh import DatasetRefresher
+from service.layers.application.executor import (
+    AnalysisCancelled,
+    AnalysisExecutor,
+    AnalysisTimeout,
+    resolve_pool_size,
+)
+from service.layers.application.explain import explain_call
 from service.layers.application.interfaces.interface import IDataAdapter
+from service.layers.application.jobs import JobManager, JobQueueFull, JobStatus
 from service.layers.application.mange_ta_main import AnalysisType, DataAnylizer
+from service.layers.application.memory import (
+    Evictable,
+    MemoryBudgetExceeded,
+    MemoryGovernor,
+)
+from service.layers.application.profiling import exclusive, profile_call
+from service.layers.application.readiness import Readiness
+from service.layers.application.single_flight import SingleFlight
 from service.layers.domain.mange_ta_main import SERVICE_PREFIX
 from service.layers.infrastructure.csv_adapter import CSVAdapter
+from service.layers.infrastructure.indexes import TableIndex
 from service.layers.infrastructure.types import DataType
-from service.layers.logger import struct_logger
+from service.layers.logger import (
+    DroppingQueueHandler,
+    EventSampler,
+    SpanFileExporter,
+    bind_request,
+    configure_logging,
+    current_span,
+    json_formatter,
+    parse_sampling,
+    set_span_exporter,
+    span,
+    struct_logger,
+)
 from service.main import app, lifespan
 
 # --------------------------------------------------------------------------------------
@@ -49,6 +122,21 @@ def test_review_overview_metrics(sample_recipes: pd.DataFrame, sample_interactio
     assert metrics["avg_rating_given"] == pytest.approx(4.33, rel=1e-3)
 
 
+def test_review_overview_ignores_unobserved_recipe_categories(
+    sample_recipes: pd.DataFrame, sample_interactions: pd.DataFrame
+):
+    # Snapshots load low-cardinality ids as categoricals, with every recipe as a category.
+    interactions = sample_interactions.copy()
+    interactions["recipe_id"] = pd.Categorical(interactions["recipe_id"], categories=range(1, 10))
+
+    expected = mtm.review_overview(sample_recipes, sample_interactions)
+    overview = mtm.review_overview(sample_recipes, interactions)
+
+    pd.testing.assert_frame_equal(overview, expected)
+    metrics = dict(zip(overview["metric"], overview["value"]))
+    assert metrics["avg_reviews_per_recipe"] == pytest.approx(1.5)
+
+
 def test_review_distribution_per_recipe(
     sample_recipes: pd.DataFrame, sample_interactions: pd.DataFrame
 ):
@@ -167,6 +255,15 @@ def test_non_empty_text_and_word_count(sample_interactions: pd.DataFrame):
     assert words.iloc[1] == 2
 
 
+def test_non_empty_text_mask_on_categorical_reviews(sample_interactions: pd.DataFrame):
+    reviews = sample_interactions["review"].astype("category")
+    assert mtm._non_empty_text_mask(reviews).tolist() == [True, True, True, False, False]
+
+    # An all-null column loaded from a snapshot is an empty categorical.
+    empty = pd.Series([None, None], dtype="category")
+    assert mtm._non_empty_text_mask(empty).tolist() == [False, False]
+
+
 def test_most_and_best_contributors(rich_recipes: pd.DataFrame, rich_interactions: pd.DataFrame):
     most = mtm.most_recipes_contributors(rich_recipes)
     assert str(most.iloc[0]["contributor_id"]) == "c1"
@@ -236,6 +333,19 @@ def test_compute_user_segments_and_tags(
     assert mtm.top_tags_by_segment_from_users(rich_recipes, empty_segments).empty
 
 
+def test_derived_analysis_matches_its_reference(
+    rich_recipes: pd.DataFrame, rich_interactions: pd.DataFrame
+):
+    segments = mtm.compute_analysis(AnalysisType.USER_SEGMENTS, rich_recipes, rich_interactions)
+    derived = mtm.derive_analysis(AnalysisType.TOP_TAGS_BY_SEGMENT, segments, rich_recipes)
+    reference = mtm.compute_analysis(
+        AnalysisType.TOP_TAGS_BY_SEGMENT, rich_recipes, rich_interactions
+    )
+    pd.testing.assert_frame_equal(derived, reference)
+    with pytest.raises(ValueError):
+        mtm.derive_analysis(AnalysisType.RATING_DISTRIBUTION, segments, rich_recipes)
+
+
 def test_rating_distribution_branches(rich_recipes: pd.DataFrame, rich_interactions: pd.DataFrame):
     dist = mtm.rating_distribution(rich_recipes, rich_interactions)
     assert "rating_bin" in dist.columns
@@ -353,6 +463,9 @@ class StubAdapter(IDataAdapter):
     def save(self, df: pd.DataFrame, data_type: DataType) -> None:
         self.saved[data_type] = df.copy()
 
+    def version(self, data_type: DataType) -> str:
+        return f"{data_type.value}-{len(self.load(data_type))}"
+
 
 def test_data_analyzer_process_all_types(
     rich_recipes: pd.DataFrame, rich_interactions: pd.DataFrame
@@ -381,6 +494,128 @@ def test_data_analyzer_process_all_types(
         assert isinstance(df, pd.DataFrame)
 
 
+def test_single_flight_coalesces_concurrent_calls():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(timeout=5)
+        return pd.DataFrame({"x": [1]})
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        leader = pool.submit(flight.do, "key", slow)
+        started.wait(timeout=5)
+        followers = [pool.submit(flight.do, "key", slow) for _ in range(3)]
+        while flight.stats()["coalesced"] < 3:
+            time.sleep(0.01)
+        release.set()
+        results = [leader.result()] + [f.result() for f in followers]
+
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+    assert flight.stats() == {"in_flight": 0, "executions": 1, "coalesced": 3, "abandoned": 0}
+
+    with pytest.raises(ZeroDivisionError):
+        flight.do("boom", lambda: 1 / 0)
+    assert flight.do("boom", lambda: 2) == 2
+
+
+def test_data_analyzer_process_data_uses_single_flight(
+    rich_recipes: pd.DataFrame, rich_interactions: pd.DataFrame
+):
+    analyzer = DataAnylizer(StubAdapter(rich_recipes, rich_interactions))
+    analyzer.process_data(AnalysisType.NUMBER_RECIPES)
+    assert analyzer.single_flight.stats()["executions"] == 1
+    assert api_module.get_single_flight_stats(data_analyzer=analyzer)["coalesced"] == 0
+
+
+def test_analysis_executor_process_pool(
+    rich_recipes: pd.DataFrame, rich_interactions: pd.DataFrame
+):
+    import asyncio
+
+    analyzer = DataAnylizer(StubAdapter(rich_recipes, rich_interactions))
+    executor = AnalysisExecutor(workers=1)
+    executor.start(analyzer)
+    try:
+        result = asyncio.run(executor.run(analyzer, AnalysisType.USER_SEGMENTS))
+    finally:
+        executor.shutdown()
+
+    expected = analyzer.compute(AnalysisType.USER_SEGMENTS)
+    pd.testing.assert_frame_equal(result.reset_index(drop=True), expected.reset_index(drop=True))
+    assert analyzer.single_flight.stats()["executions"] == 1
+
+
+def test_analysis_executor_timeout_and_disconnect(monkeypatch):
+    import asyncio
+
+    release = threading.Event()
+
+    class SlowAnalyzer:
+        version = "v"
+
+        def precomputed(self, analysis_type):
+            return None
+
+        def process_data(self, analysis_type):
+            release.wait(timeout=5)
+            return pd.DataFrame()
+
+    monkeypatch.setattr(executor_module, "DISCONNECT_POLL_SECONDS", 0.01)
+    monkeypatch.setitem(executor_module.ANALYSIS_TIMEOUTS, AnalysisType.USER_SEGMENTS, 0.05)
+    executor = AnalysisExecutor(workers=0)
+    analyzer = cast(DataAnylizer, SlowAnalyzer())
+
+    with pytest.raises(AnalysisTimeout):
+        asyncio.run(executor.run(analyzer, AnalysisType.USER_SEGMENTS))
+
+    async def disconnected() -> bool:
+        return True
+
+    with pytest.raises(AnalysisCancelled):
+        asyncio.run(executor.run(analyzer, AnalysisType.NUMBER_RECIPES, disconnected))
+    release.set()
+
+
+def test_timed_out_analysis_keeps_its_slot_until_the_thread_ends(
+    api_client: TestClient, api_stub_analyzer, stub_container, monkeypatch
+):
+    release = threading.Event()
+
+    def slow(analysis_type: AnalysisType) -> pd.DataFrame:
+        release.wait(timeout=5)
+        return pd.DataFrame([{"analysis": analysis_type.value}])
+
+    api_stub_analyzer.process_data = slow
+    monkeypatch.setattr(executor_module, "DEFAULT_TIMEOUT_SECONDS", 0.05)
+    admission = stub_container.admission()
+
+    response = api_client.get(f"/{SERVICE_PREFIX}/most-recipes-contributors")
+
+    assert response.status_code == 504
+    # The thread still computes: its slot is not handed to another request yet.
+    assert admission.stats()["interactive"]["running"] == 1
+    release.set()
+    deadline = time.monotonic() + 5
+    while admission.stats()["interactive"]["running"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert admission.stats()["interactive"]["running"] == 0
+
+
+def test_resolve_pool_size(monkeypatch):
+    assert resolve_pool_size("0") == 0
+    assert resolve_pool_size("3") == 3
+    monkeypatch.setattr(executor_module, "cpu_limit", lambda: 4.0)
+    assert resolve_pool_size("auto") == 3
+    monkeypatch.setattr(executor_module, "cpu_limit", lambda: 1.5)
+    assert resolve_pool_size("auto") == 1
+
+
 def test_data_analyzer_invalid_analysis(
     rich_recipes: pd.DataFrame, rich_interactions: pd.DataFrame
 ):
@@ -421,6 +656,9 @@ class InterfaceConcrete(IDataAdapter):
     def save(self, df: pd.DataFrame, data_type: DataType) -> None:
         super().save(df, data_type)
 
+    def version(self, data_type: DataType) -> str:
+        return super().version(data_type)
+
 
 def test_interface_concrete_invocation():
     concrete = InterfaceConcrete()
@@ -444,6 +682,9 @@ def test_clean_data_with_dummy_adapter(tmp_path):
         def save(self, df: pd.DataFrame, data_type: DataType) -> None:
             self.saved[data_type] = df
 
+        def version(self, data_type: DataType) -> str:
+            return "raw"
+
     adapter = DummyAdapter()
     cleaned_recipes = clean_data(adapter, DataType.RECIPES)
     cleaned_interactions = clean_data(adapter, DataType.INTERACTIONS)
@@ -469,6 +710,253 @@ def test_csv_adapter_load_and_save(tmp_path: Path):
     assert loaded.equals(df.astype(object))
 
 
+def test_memory_optimizer_converts_only_numeric_column_aliases():
+    df = pd.DataFrame(
+        {
+            "Rating": ["4", "5", "x"],
+            "stars": ["1", "2", "3"],
+            "rating_comment": ["good", "fine", "bad"],
+            "minutes_note": ["long", "short", "long"],
+        },
+        dtype=object,
+    )
+
+    optimized = CSVAdapter._optimize_memory(df)
+
+    assert optimized["Rating"].tolist()[:2] == [4.0, 5.0]
+    assert pd.isna(optimized["Rating"].iloc[2])
+    assert optimized["stars"].tolist() == [1.0, 2.0, 3.0]
+    assert optimized["rating_comment"].astype(str).tolist() == ["good", "fine", "bad"]
+    assert optimized["minutes_note"].astype(str).tolist() == ["long", "short", "long"]
+
+
+def test_dataset_version_tracks_saved_data(tmp_path: Path):
+    adapter = CSVAdapter(data_dir=tmp_path)
+    assert adapter.version(DataType.RECIPES) == "missing"
+
+    adapter.save(pd.DataFrame({"id": [1], "name": ["Test"]}), DataType.RECIPES)
+    before = DataAnylizer(adapter).version
+    adapter.save(pd.DataFrame({"id": [1, 2], "name": ["Test", "Other"]}), DataType.RECIPES)
+    assert DataAnylizer(adapter).version != before
+
+    stub = StubAdapter(pd.DataFrame({"id": [1]}), pd.DataFrame({"id": [2]}))
+    assert stub.version(DataType.RECIPES) != stub.version(DataType.INTERACTIONS)
+
+
+def test_csv_adapter_publishes_atomic_snapshots(tmp_path: Path):
+    adapter = CSVAdapter(data_dir=tmp_path)
+    for n in range(1, 5):
+        adapter.save(pd.DataFrame({"id": list(range(n))}), DataType.RECIPES)
+
+    snapshots = adapter.snapshots(DataType.RECIPES)
+    assert len(snapshots) == CSVAdapter.KEEP_SNAPSHOTS
+    assert adapter.current_snapshot(DataType.RECIPES) == snapshots[-1]
+    assert adapter.version(DataType.RECIPES) == snapshots[-1]
+    assert not (tmp_path / "recipes.csv").exists()
+    assert len(adapter.load(DataType.RECIPES)) == 4
+
+    # A write interrupted before its rename is never visible.
+    (tmp_path / "snapshots" / "recipes" / "99999999T999999999999Z.csv.tmp").write_text("id\n")
+    assert adapter.snapshots(DataType.RECIPES) == snapshots
+    assert len(adapter.load(DataType.RECIPES)) == 4
+
+
+def test_binary_snapshot_loads_without_csv(tmp_path: Path, rich_recipes, monkeypatch):
+    writer = CSVAdapter(data_dir=tmp_path)
+    writer.save(rich_recipes, DataType.RECIPES)
+    expected = writer._read_csv(writer.processed_path(DataType.RECIPES), DataType.RECIPES, False)
+
+    def no_csv(*args, **kwargs):
+        raise AssertionError("CSV re-read")
+
+    monkeypatch.setattr(pd, "read_csv", no_csv)
+    adapter = CSVAdapter(data_dir=tmp_path)
+    loaded = adapter.load(DataType.RECIPES)
+
+    pd.testing.assert_frame_equal(loaded, expected)
+    assert adapter.load_index(DataType.RECIPES) is not None
+    assert adapter.load_index(DataType.INTERACTIONS) is None
+
+
+class _Payload:
+    """Pickle that touches ``marker`` when loaded."""
+
+    def __init__(self, marker: Path):
+        self.marker = marker
+
+    def __reduce__(self):
+        return (Path.touch, (self.marker,))
+
+
+def test_tampered_binary_snapshot_is_not_unpickled(tmp_path: Path, rich_recipes):
+    writer = CSVAdapter(data_dir=tmp_path)
+    writer.save(rich_recipes, DataType.RECIPES)
+    expected = writer.load(DataType.RECIPES)
+    marker = tmp_path / "executed"
+    writer.binary_path(DataType.RECIPES).write_bytes(pickle.dumps(_Payload(marker)))
+
+    loaded = CSVAdapter(data_dir=tmp_path).load(DataType.RECIPES)
+
+    assert not marker.exists()
+    pd.testing.assert_frame_equal(loaded, expected)
+
+
+def test_tampered_results_are_not_unpickled(tmp_path: Path, rich_recipes):
+    adapter = CSVAdapter(data_dir=tmp_path)
+    adapter.save(rich_recipes, DataType.RECIPES)
+    version = adapter.version(DataType.RECIPES)
+    adapter.save_results(version, {"stats": 1})
+    assert adapter.load_results(version) == {"stats": 1}
+
+    marker = tmp_path / "executed"
+    adapter._results_path(version).write_bytes(pickle.dumps(_Payload(marker)))
+    assert adapter.load_results(version) is None
+    assert not marker.exists()
+
+
+def test_legacy_csv_gets_binary_on_first_load(tmp_path: Path, rich_recipes):
+    rich_recipes.to_csv(tmp_path / "recipes.csv", index=False)
+    first = CSVAdapter(data_dir=tmp_path).load(DataType.RECIPES)
+    assert (tmp_path / "recipes.pkl").exists()
+
+    adapter = CSVAdapter(data_dir=tmp_path)
+    pd.testing.assert_frame_equal(adapter.load(DataType.RECIPES), first)
+    assert adapter.load_index(DataType.RECIPES) is not None
+
+    # A changed CSV invalidates the binary.
+    rich_recipes.head(3).to_csv(tmp_path / "recipes.csv", index=False)
+    assert len(CSVAdapter(data_dir=tmp_path).load(DataType.RECIPES)) == 3
+
+
+def test_precomputed_results_persist_across_restarts(
+    tmp_path: Path, rich_recipes, rich_interactions, monkeypatch
+):
+    adapter = CSVAdapter(data_dir=tmp_path)
+    adapter.save(rich_recipes, DataType.RECIPES)
+    adapter.save(rich_interactions, DataType.INTERACTIONS)
+    analyzer = DataAnylizer(adapter)
+    assert set(analyzer.load_timings) == {
+        "version",
+        "recipes",
+        "interactions",
+        "indexes",
+        "results",
+    }
+    analyzer.precompute()
+    expected = analyzer.process_data(AnalysisType.USER_SEGMENTS)
+
+    restarted = DataAnylizer(CSVAdapter(data_dir=tmp_path))
+    monkeypatch.setattr(
+        DataAnylizer, "compute", MagicMock(side_effect=AssertionError("recomputed"))
+    )
+    assert restarted.version == analyzer.version
+    pd.testing.assert_frame_equal(restarted.process_data(AnalysisType.USER_SEGMENTS), expected)
+    assert all(restarted.precomputed(a) is not None for a in mtm.SERVED_ANALYSES)
+    assert set(restarted._indexes) == {DataType.RECIPES, DataType.INTERACTIONS}
+
+
+def test_dataset_refresher_swaps_in_new_snapshot(
+    tmp_path: Path, rich_recipes: pd.DataFrame, rich_interactions: pd.DataFrame
+):
+    adapter = CSVAdapter(data_dir=tmp_path)
+    adapter.save(rich_recipes, DataType.RECIPES)
+    adapter.save(rich_interactions, DataType.INTERACTIONS)
+    served = [DataAnylizer(adapter)]
+    warmed: list[str] = []
+
+    refresher = DatasetRefresher(adapter)
+    refresher.start(
+        current=lambda: served[-1],
+        install=served.append,
+        warmers=[lambda analyzer: warmed.append(analyzer.version)],
+    )
+    assert refresher.refresh() is False
+
+    adapter.save(rich_recipes.head(5), DataType.RECIPES)
+    refresher.request_refresh()
+    refresher.wait(timeout=10)
+
+    assert len(served) == 2
+    assert len(served[-1].df_recipes) == 5
+    assert len(served[0].df_recipes) == len(rich_recipes)
+    assert warmed == [served[-1].version]
+    assert refresher.status()["swaps"] == 1
+    assert refresher.status()["version"] == served[-1].version
+
+
+def test_install_analyzer_and_warm_analyses(
+    rich_recipes: pd.DataFrame, rich_interactions: pd.DataFrame
+):
+    container = Container()
+    container.csv_adapter.override(providers.Object(StubAdapter(rich_recipes, rich_interactions)))
+    old = container.data_analyzer()
+    new = DataAnylizer(StubAdapter(rich_recipes.head(5), rich_interactions))
+    service_main.install_analyzer(container, new)
+    assert container.data_analyzer() is new
+    assert old is not new
+
+    cache = ResponseCache()
+    api_module.warm_analyses(new, cache)
+    assert cache.stats()["entries"] == len(api_module.ANALYSIS_ROUTES)
+    key = api_module.analysis_cache_key(f"/{SERVICE_PREFIX}/user-segments", (), new.version)
+    assert cache.get(key) is not None
+
+    paths = {route.path for route in api_module.router.routes}
+    assert {f"/{SERVICE_PREFIX}/{r}" for r in api_module.ANALYSIS_ROUTES} <= paths
+
+
+def test_synthetic_dataset_is_deterministic_and_food_com_shaped(tmp_path: Path):
+    spec = synthetic.generate(tmp_path / "a", scale=0.002, seed=7)
+    synthetic.generate(tmp_path / "b", scale=0.002, seed=7)
+
+    for name in CSVAdapter.RAW_FILE_MAP.values():
+        assert (tmp_path / "a" / name).read_bytes() == (tmp_path / "b" / name).read_bytes()
+
+    recipes = pd.read_csv(tmp_path / "a" / "RAW_recipes.csv")
+    interactions = pd.read_csv(tmp_path / "a" / "RAW_interactions.csv")
+    assert list(recipes.columns) == [
+        "name", "id", "minutes", "contributor_id", "submitted", "tags", "nutrition",
+        "n_steps", "steps", "description", "ingredients", "n_ingredients",
+    ]  # fmt: skip
+    assert list(interactions.columns) == ["user_id", "recipe_id", "date", "rating", "review"]
+    assert (len(recipes), len(interactions)) == (spec.recipes, spec.interactions)
+    assert interactions["recipe_id"].isin(recipes["id"]).all()
+    assert set(interactions["rating"]) <= {0, 1, 2, 3, 4, 5}
+    # Power law: the busiest contributor publishes far more than the median one.
+    per_contributor = recipes["contributor_id"].value_counts()
+    assert per_contributor.iloc[0] > 5 * per_contributor.median()
+
+
+def test_benchmark_covers_every_stage(tmp_path: Path):
+    report = bench.run_scale(tmp_path, scale=0.001, memory=False)
+
+    names = {stage.name for stage in report.stages}
+    assert {"clean_data[recipes]", "clean_data[interactions]", "load[recipes]"} <= names
+    for analysis in mtm.SERVED_ANALYSES:
+        assert {f"analysis[{analysis.value}]", f"df_to_response[{analysis.value}]"} <= names
+    assert "analysis[user_segments]" in bench.format_report(report)
+
+
+def test_load_test_replays_served_routes():
+    routes = set(api_module.ANALYSIS_ROUTES) | {"load-data"}
+    replayed = [r for page in load_test.PAGES.values() for r in page] + [load_test.DOWNLOAD]
+    assert {request.path for request in replayed} <= routes
+    assert load_test.DOWNLOAD.name == "/mange_ta_main/load-data?data_type=recipes&format=csv"
+
+    latencies = [float(i) for i in range(1, 101)]
+    assert [load_test.percentile(latencies, q) for q in (50, 95, 99)] == [50.0, 95.0, 99.0]
+    assert load_test.percentile([], 50) is None
+
+
+def test_logging_overhead_benchmark_compares_with_sampled_out_baseline():
+    results = logging_overhead.measure(requests=20, modes=["json"])
+
+    assert [r.mode for r in results] == ["off", "json"]
+    assert all(r.requests == 20 and r.mean_us > 0 and r.dropped == 0 for r in results)
+    assert results[0].overhead_us is None and results[1].overhead_us is not None
+    assert "json" in logging_overhead.format_report(results)
+
+
 # --------------------------------------------------------------------------------------
 # Container, domain, logger, and app lifespan
 # --------------------------------------------------------------------------------------
@@ -489,6 +977,81 @@ def test_domain_and_logger_usage(caplog):
     assert SERVICE_PREFIX == "mange_ta_main"
 
 
+def test_event_sampler_drops_only_sampled_info_events():
+    sampler = EventSampler(parse_sampling("span=0, analyses_warmed=0.5"))
+
+    with pytest.raises(structlog.DropEvent):
+        sampler(None, "info", {"event": "span"})
+    assert sampler(None, "warning", {"event": "span"}) == {"event": "span"}
+    assert sampler(None, "info", {"event": "startup_complete"}) == {"event": "startup_complete"}
+    kept = 0
+    for _ in range(200):
+        try:
+            kept += sampler(None, "info", {"event": "analyses_warmed"})["sample_rate"] == 0.5
+        except structlog.DropEvent:
+            pass
+    assert 50 < kept < 150
+    with pytest.raises(ValueError):
+        parse_sampling("span=2")
+
+
+def test_json_logs_are_rendered_by_the_listener_and_dropped_when_full():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=2))
+    logger = logging.getLogger("tests.json_logging")
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        # As emitted by structlog (wrap_for_formatter), then by a stdlib library.
+        args, kwargs = structlog.stdlib.ProcessorFormatter.wrap_for_formatter(
+            logger, "info", {"event": "analysis", "request_id": "r-1"}
+        )
+        logger.info(*args, **kwargs)
+        logger.warning("pool %s", "restarted")
+        logger.info("dropped: the queue is full")
+    finally:
+        logger.removeHandler(handler)
+
+    assert handler.dropped == 1
+    stream = io.StringIO()
+    output = logging.StreamHandler(stream)
+    output.setFormatter(json_formatter())
+    listener = logging.handlers.QueueListener(handler.queue, output)
+    listener.start()
+    listener.stop()
+
+    first, second = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert first["event"] == "analysis" and first["request_id"] == "r-1"
+    assert first["timestamp"].endswith("+00:00")
+    assert second == {**second, "event": "pool restarted", "level": "warning"}
+
+
+def _log_in_forked_child() -> None:
+    structlog.get_logger().error("clean_job_error", job_id="j-1")
+
+
+def test_json_logs_of_forked_children_are_written(tmp_path: Path, monkeypatch):
+    root = logging.getLogger()
+    monkeypatch.setattr(root, "handlers", list(root.handlers))
+    monkeypatch.setattr("service.layers.logger._queue_handler", None)
+    monkeypatch.setattr("service.layers.logger._listener", None)
+    structlog_config = dict(structlog.get_config())
+    with open(tmp_path / "log.jsonl", "w") as stream:
+        listener = configure_logging(log_format="json", stream=stream)
+        assert listener is not None
+        try:
+            child = multiprocessing.get_context("fork").Process(target=_log_in_forked_child)
+            child.start()
+            child.join(timeout=10)
+        finally:
+            listener.stop()
+            atexit.unregister(listener.stop)
+            structlog.configure(**structlog_config)
+
+    assert child.exitcode == 0
+    (line,) = (tmp_path / "log.jsonl").read_text().splitlines()
+    assert json.loads(line) == {**json.loads(line), "event": "clean_job_error", "job_id": "j-1"}
+
+
 def test_lifespan_context(monkeypatch):
     import asyncio
 
@@ -515,6 +1078,310 @@ def test_health_endpoint(api_client: TestClient):
     assert response.json() == {"status": "ok"}
 
 
+def test_readiness_phases_only_move_forward(tmp_path: Path, rich_recipes: pd.DataFrame):
+    readiness = Readiness()
+    adapter = CSVAdapter(data_dir=tmp_path, on_phase=readiness.enter)
+    rich_recipes.to_csv(tmp_path / "recipes.csv", index=False)
+    adapter.load(DataType.RECIPES)
+    assert (readiness.phase, readiness.detail) == ("typing", "recipes")
+
+    readiness.enter("reading", "interactions")
+    assert readiness.phase == "typing"
+    readiness.enter("warming")
+    readiness.advance(0.5)
+    assert readiness.percent == 85.0
+    readiness.complete()
+    readiness.enter("reading")
+    assert readiness.snapshot()["ready"] is True
+    assert readiness.percent == 100
+
+
+def test_analysis_routes_wait_for_readiness(api_client: TestClient, stub_container: MagicMock):
+    assert api_client.get(f"/{SERVICE_PREFIX}/ready").json()["phase"] == "ready"
+
+    app.dependency_overrides.clear()
+    loading = Readiness()
+    loading.enter("reading", "recipes")
+    stub_container.readiness.return_value = loading
+
+    ready = api_client.get(f"/{SERVICE_PREFIX}/ready")
+    assert ready.status_code == 503
+    assert ready.json()["phase"] == "reading"
+    analysis = api_client.get(f"/{SERVICE_PREFIX}/most-recipes-contributors")
+    assert analysis.status_code == 503
+    assert 1 <= int(analysis.headers["Retry-After"]) <= 60
+    assert api_client.get(f"/{SERVICE_PREFIX}/health").status_code == 200
+
+    loading.complete()
+    assert api_client.get(f"/{SERVICE_PREFIX}/most-recipes-contributors").status_code == 200
+
+
+def test_failed_background_load_is_unhealthy(stub_container: MagicMock, monkeypatch):
+    stub_container.data_analyzer.side_effect = OSError("disk gone")
+    monkeypatch.setattr(service_main, "Container", lambda: stub_container)
+
+    with TestClient(app) as client:
+        readiness = stub_container.readiness()
+        deadline = time.monotonic() + 10
+        while not readiness.failed and time.monotonic() < deadline:
+            time.sleep(0.01)
+        ready = client.get(f"/{SERVICE_PREFIX}/ready")
+        health = client.get(f"/{SERVICE_PREFIX}/health")
+
+    assert ready.status_code == 503
+    assert ready.json()["phase"] == "failed"
+    assert health.status_code == 503
+    assert health.json() == {"status": "failed", "error": "OSError: disk gone"}
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, route='/a"b')
+
+    assert histogram.render() == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/a\\"b",le="0.1"} 2',
+        'latency_seconds_bucket{route="/a\\"b",le="1"} 3',
+        'latency_seconds_bucket{route="/a\\"b",le="+Inf"} 4',
+        'latency_seconds_sum{route="/a\\"b"} 3.65',
+        'latency_seconds_count{route="/a\\"b"} 4',
+    ]
+    with pytest.raises(ValueError):
+        histogram.observe(1.0)
+
+
+def test_metrics_endpoint_reports_analysis_phases(
+    api_client: TestClient, stub_container: MagicMock, api_stub_analyzer
+):
+    api_stub_analyzer.single_flight.do("analysis", lambda: None)
+    for _ in range(2):
+        assert api_client.get(f"/{SERVICE_PREFIX}/most-recipes-contributors").status_code == 200
+
+    response = api_client.get(f"/{SERVICE_PREFIX}/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    metrics = stub_container.metrics()
+    for phase in ("compute", "serialize"):
+        assert metrics.analysis_duration.count(analysis="number_recipes", phase=phase) == 1
+    assert 'analysis_responses_total{analysis="number_recipes",cache="hit"} 1' in text
+    assert 'response_cache_hit_ratio 0.5' in text
+    assert 'admission_queued{cost_class="interactive"} 0' in text
+    assert 'dataframe_memory_bytes{table="recipes"}' in text
+    assert "threadpool_queued_tasks 0" in text
+    assert 'single_flight_calls_total{result="executions"} 1' in text
+    assert 'single_flight_calls_total{result="coalesced"} 0' in text
+    assert "single_flight_in_flight 0" in text
+    assert (
+        metrics.requests.value(
+            route="/mange_ta_main/most-recipes-contributors", method="GET", status="200"
+        )
+        == 2
+    )
+    assert "http_requests_in_flight 1" in text
+
+
+def test_profile_call_returns_speedscope_and_allocations():
+    def build() -> list[bytes]:
+        return [bytes(1024) for _ in range(20000)]
+
+    result, report = profile_call(build, name="build", interval=0.0005)
+
+    assert len(result) == 20000
+    assert report["memory"]["peak_bytes"] >= 20000 * 1024
+    assert report["memory"]["top_allocations"][0]["size_bytes"] > 0
+    speedscope = report["speedscope"]
+    profile = speedscope["profiles"][0]
+    assert profile["type"] == "sampled"
+    assert len(profile["samples"]) == len(profile["weights"]) == report["samples"]
+    frame_names = {frame["name"] for frame in speedscope["shared"]["frames"]}
+    if report["samples"]:
+        assert not frame_names & {"profile_call", "call", "stop"}
+        assert frame_names & {"build", "<listcomp>"}
+
+
+def test_profile_endpoint_is_guarded(
+    api_client: TestClient,
+    monkeypatch,
+    tmp_path: Path,
+    rich_recipes: pd.DataFrame,
+    rich_interactions: pd.DataFrame,
+):
+    adapter = CSVAdapter(data_dir=tmp_path)
+    adapter.save(rich_recipes, DataType.RECIPES)
+    adapter.save(rich_interactions, DataType.INTERACTIONS)
+    analyzer = DataAnylizer(adapter)
+    app.dependency_overrides[api_module.get_data_analyzer] = lambda: analyzer
+    url = f"/{SERVICE_PREFIX}/debug/profile"
+    params = {"analysis": AnalysisType.REVIEWER_VS_RECIPES.value}
+
+    assert api_client.get(url, params=params).status_code == 404
+    monkeypatch.setattr(api_module, "DEBUG_TOKEN", "s3cret")
+    assert api_client.get(url, params=params).status_code == 403
+
+    headers = {"X-Debug-Token": "s3cret"}
+    report = api_client.get(url, params=params, headers=headers)
+    assert report.status_code == 200
+    body = report.json()
+    assert body["analysis"] == AnalysisType.REVIEWER_VS_RECIPES.value
+    assert body["rows"] > 0
+    assert body["memory"]["peak_bytes"] > 0
+
+    speedscope = api_client.get(url, params={**params, "format": "speedscope"}, headers=headers)
+    assert speedscope.json()["$schema"].startswith("https://www.speedscope.app")
+    assert "attachment" in speedscope.headers["content-disposition"]
+    no_analysis = {"analysis": AnalysisType.NO_ANALYSIS.value}
+    assert api_client.get(url, params=no_analysis, headers=headers).status_code == 400
+
+
+def test_explain_call_records_analysis_stages(
+    rich_recipes: pd.DataFrame, rich_interactions: pd.DataFrame
+):
+    expected = mtm.reviewer_reviews_vs_recipes(rich_recipes, rich_interactions)
+
+    result, report = explain_call(
+        lambda: mtm.reviewer_reviews_vs_recipes(rich_recipes, rich_interactions),
+        name="reviewer_vs_recipes",
+    )
+
+    pd.testing.assert_frame_equal(result, expected)
+    stages = report["stages"]
+    assert [s["kind"] for s in stages] == ["filter", "groupby", "merge", "groupby", "merge"]
+    assert stages[0]["rows_in"] == len(rich_interactions)
+    assert stages[-1]["rows_out"] == len(result)
+    assert all(s["seconds"] >= 0 and s["bytes_allocated"] >= 0 for s in stages)
+    assert report["seconds"] >= sum(s["seconds"] for s in stages)
+
+
+def test_explain_query_returns_stages_with_data(
+    api_client: TestClient,
+    tmp_path: Path,
+    rich_recipes: pd.DataFrame,
+    rich_interactions: pd.DataFrame,
+    monkeypatch,
+):
+    adapter = CSVAdapter(data_dir=tmp_path)
+    adapter.save(rich_recipes, DataType.RECIPES)
+    adapter.save(rich_interactions, DataType.INTERACTIONS)
+    analyzer = DataAnylizer(adapter)
+    app.dependency_overrides[api_module.get_data_analyzer] = lambda: analyzer
+
+    url = f"/{SERVICE_PREFIX}/rating-distribution"
+    plain = api_client.get(url)
+    explain = {"explain": "true"}
+    assert api_client.get(url, params=explain).status_code == 404
+
+    monkeypatch.setattr(api_module, "DEBUG_TOKEN", "s3cret")
+    assert api_client.get(url, params=explain).status_code == 403
+    headers = {"X-Debug-Token": "s3cret"}
+    with exclusive():
+        assert api_client.get(url, params=explain, headers=headers).status_code == 409
+    response = api_client.get(url, params=explain, headers=headers)
+
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "no-store"
+    body = response.json()
+    assert body["data"] == plain.json()
+    assert body["explain"]["analysis"] == AnalysisType.RATING_DISTRIBUTION.value
+    kinds = [stage["kind"] for stage in body["explain"]["stages"]]
+    assert kinds == ["groupby", "merge", "groupby", "bin", "groupby"]
+
+
+def test_spans_nest_and_export_one_trace_per_root(tmp_path: Path):
+    exporter = SpanFileExporter(tmp_path / "traces.jsonl")
+    set_span_exporter(exporter)
+    try:
+        with bind_request("req-1"), span("outer", analysis="x") as outer:
+            with span("inner") as inner:
+                pass
+            with pytest.raises(ValueError), span("failing"):
+                raise ValueError("boom")
+            assert structlog.contextvars.get_contextvars()["request_id"] == "req-1"
+        with span("other"):
+            pass
+    finally:
+        set_span_exporter(None)
+
+    assert inner.trace_id == outer.trace_id and inner.parent_span_id == outer.span_id
+    assert outer.end_ns >= inner.end_ns >= inner.start_ns >= outer.start_ns
+    assert "request_id" not in structlog.contextvars.get_contextvars()
+    lines = (tmp_path / "traces.jsonl").read_text().splitlines()
+    assert len(lines) == 2
+    spans = json.loads(lines[0])["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert [s["name"] for s in spans] == ["inner", "failing", "outer"]
+    assert spans[1]["status"]["code"] == 2 and spans[2]["status"]["code"] == 1
+    assert "parentSpanId" not in spans[2]
+    assert {"key": "analysis", "value": {"stringValue": "x"}} in spans[2]["attributes"]
+
+
+def test_request_trace_breaks_down_analysis_latency(
+    api_client: TestClient,
+    tmp_path: Path,
+    rich_recipes: pd.DataFrame,
+    rich_interactions: pd.DataFrame,
+):
+    adapter = CSVAdapter(data_dir=tmp_path / "data")
+    adapter.save(rich_recipes, DataType.RECIPES)
+    adapter.save(rich_interactions, DataType.INTERACTIONS)
+    analyzer = DataAnylizer(adapter)
+    app.dependency_overrides[api_module.get_data_analyzer] = lambda: analyzer
+    set_span_exporter(SpanFileExporter(tmp_path / "traces.jsonl"))
+    try:
+        response = api_client.get(
+            f"/{SERVICE_PREFIX}/rating-distribution", headers={"X-Request-ID": "slow-1"}
+        )
+        generated = api_client.get(f"/{SERVICE_PREFIX}/health")
+    finally:
+        set_span_exporter(None)
+
+    assert response.headers["x-request-id"] == "slow-1"
+    assert len(generated.headers["x-request-id"]) == 32
+    traces = [json.loads(line) for line in (tmp_path / "traces.jsonl").read_text().splitlines()]
+    spans = traces[0]["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    by_name = {s["name"]: s for s in spans}
+    root = by_name["http.request"]
+    assert {"key": "request_id", "value": {"stringValue": "slow-1"}} in root["attributes"]
+    assert by_name["compute"]["parentSpanId"] == root["spanId"]
+    assert by_name["serialize"]["parentSpanId"] == root["spanId"]
+    stages = [s for s in spans if s.get("parentSpanId") == by_name["compute"]["spanId"]]
+    assert len(stages) == 5
+    assert {s["traceId"] for s in spans} == {root["traceId"]}
+
+
+def test_request_middleware_waits_for_the_streamed_body():
+    metrics = MetricsRegistry()
+    streaming_app = FastAPI()
+    streaming_app.state.container = SimpleNamespace(metrics=lambda: metrics)
+    streaming_app.add_middleware(RequestMetricsMiddleware)
+    streaming_app.add_middleware(RequestTracingMiddleware)
+    seen = {}
+
+    @streaming_app.get("/stream")
+    async def stream() -> StreamingResponse:
+        seen["root"] = current_span()
+
+        def body():
+            yield b"first"
+            time.sleep(0.05)
+            seen["in_flight"] = metrics.in_flight.value()
+            seen["last_chunk_ns"] = time.time_ns()
+            yield b"last"
+
+        return StreamingResponse(body())
+
+    response = TestClient(streaming_app).get("/stream")
+
+    assert response.content == b"firstlast"
+    assert len(response.headers["x-request-id"]) == 32
+    assert seen["in_flight"] == 1 and metrics.in_flight.value() == 0
+    assert metrics.requests.value(route="/stream", method="GET", status="200") == 1
+    root = seen["root"]
+    assert root.name == "http.request" and root.end_ns >= seen["last_chunk_ns"]
+    assert root.attributes["http.status_code"] == 200
+
+
 def test_load_data_recipes_and_interactions(api_client: TestClient):
     recipes = api_client.get(f"/{SERVICE_PREFIX}/load-data")
     assert recipes.status_code == 200
@@ -525,9 +1392,213 @@ def test_load_data_recipes_and_interactions(api_client: TestClient):
     assert interactions.status_code == 200
 
 
+def test_load_data_streaming_formats(api_client: TestClient):
+    url = f"/{SERVICE_PREFIX}/load-data"
+
+    as_json = api_client.get(url)
+    assert as_json.json() == [{"id": 1, "value": "recipes"}]
+    assert as_json.headers["x-total-count"] == "1"
+
+    ndjson = api_client.get(url, params={"data_type": "interactions", "format": "ndjson"})
+    assert ndjson.headers["content-type"].startswith("application/x-ndjson")
+    assert ndjson.text.splitlines() == ['{"id":2,"value":"interactions"}']
+
+    csv = api_client.get(url, params={"format": "csv"})
+    assert csv.headers["content-type"].startswith("text/csv")
+    assert "attachment" in csv.headers["content-disposition"]
+    assert csv.text.splitlines() == ["id,value", "1,recipes"]
+
+
+def test_export_streams_dataset_files(api_client: TestClient):
+    url = f"/{SERVICE_PREFIX}/export"
+
+    csv = api_client.get(url)
+    assert csv.headers["content-type"].startswith("text/csv")
+    assert csv.headers["content-disposition"] == 'attachment; filename="recipes_test.csv"'
+    assert csv.text.splitlines() == ["id,value", "1,recipes"]
+    assert api_client.get(url, headers={"If-None-Match": csv.headers["etag"]}).status_code == 304
+
+    gzipped = api_client.get(url, params={"data_type": "interactions", "format": "csv.gz"})
+    assert gzipped.headers["content-type"] == "application/gzip"
+    assert "content-encoding" not in gzipped.headers
+    assert gzip.decompress(gzipped.content).decode().splitlines() == ["id,value", "2,interactions"]
+
+    assert api_client.get(url, params={"columns": "nope"}).status_code == 400
+
+    parquet = api_client.get(url, params={"format": "parquet"})
+    if not export.parquet_available():
+        assert parquet.status_code == 501
+        return
+    assert parquet.headers["content-type"] == "application/vnd.apache.parquet"
+    table = export.pq.read_table(io.BytesIO(parquet.content))
+    assert table.to_pylist() == [{"id": 1, "value": "recipes"}]
+
+
+def test_iter_parquet_writes_one_row_group_per_chunk():
+    pytest.importorskip("pyarrow")
+    df = pd.DataFrame({"a": range(5), "b": pd.Categorical(["x", "y", None, "x", "y"])})
+
+    chunks = list(export.iter_parquet(df, row_group_rows=2))
+    parquet = export.pq.ParquetFile(io.BytesIO(b"".join(chunks)))
+    assert parquet.metadata.num_row_groups == 3
+    assert parquet.read().to_pandas().equals(df)
+
+
+def test_iter_parquet_types_columns_from_the_whole_frame():
+    pytest.importorskip("pyarrow")
+    df = pd.DataFrame(
+        {
+            "a": range(5),
+            "tags": pd.Series([None, None, "x", None, "y"], dtype=object),
+            "empty": pd.Series([None] * 5, dtype=object),
+        }
+    )
+
+    chunks = list(export.iter_parquet(df, row_group_rows=2))
+    table = export.pq.read_table(io.BytesIO(b"".join(chunks)))
+    assert table.column("tags").to_pylist() == [None, None, "x", None, "y"]
+    assert str(table.schema.field("empty").type) == "string"
+
+
+def test_iter_encoded_rows_chunks_without_duplicating_headers():
+    df = pd.DataFrame({"a": [1, 2, 3], "b": [np.inf, None, 2.5], "c": ["x", None, "z"]})
+
+    csv_chunks = list(api_module.iter_encoded_rows(df, api_module.ResponseFormat.CSV, 2))
+    assert len(csv_chunks) == 2
+    assert b"".join(csv_chunks).decode().splitlines() == ["a,b,c", "1,0.0,x", "2,0.0,", "3,2.5,z"]
+
+    json_body = b"".join(api_module.iter_encoded_rows(df, api_module.ResponseFormat.JSON, 2))
+    assert [row["a"] for row in json.loads(json_body)] == [1, 2, 3]
+
+    empty = b"".join(api_module.iter_encoded_rows(pd.DataFrame(), api_module.ResponseFormat.JSON))
+    assert empty == b"[]"
+
+
+def test_select_rows_filters_from_index(sample_interactions: pd.DataFrame):
+    index = TableIndex.build(sample_interactions, DataType.INTERACTIONS)
+
+    by_user = select_rows(sample_interactions, DataType.INTERACTIONS, RowQuery(user_id="u1"), index)
+    assert by_user.frame["recipe_id"].tolist() == [1, 2]
+
+    february = RowQuery(date_from=date(2024, 2, 1), min_rating=3.0, columns=["user_id", "rating"])
+    result = select_rows(sample_interactions, DataType.INTERACTIONS, february, index)
+    assert list(result.frame.columns) == ["user_id", "rating"]
+    assert result.frame["user_id"].tolist() == ["u3", "u1"]
+    assert result.total == 2
+
+    with pytest.raises(QueryError):
+        select_rows(sample_interactions, DataType.INTERACTIONS, RowQuery(contributor_id="c1"))
+    with pytest.raises(QueryError):
+        select_rows(sample_interactions, DataType.INTERACTIONS, RowQuery(columns=["nope"]))
+
+
+def test_select_rows_date_to_includes_the_whole_day():
+    interactions = pd.DataFrame(
+        {
+            "user_id": ["u1", "u2", "u3"],
+            "date": pd.to_datetime(["2024-01-31 00:00", "2024-01-31 18:30", "2024-02-01 00:00"]),
+        }
+    )
+
+    january = select_rows(interactions, DataType.INTERACTIONS, RowQuery(date_to=date(2024, 1, 31)))
+
+    assert january.frame["user_id"].tolist() == ["u1", "u2"]
+
+
+def test_select_rows_pages_unfiltered_rows_by_slicing():
+    df = pd.DataFrame({"id": range(10), "name": [f"r{i}" for i in range(10)]})
+
+    page = select_rows(df, DataType.RECIPES, RowQuery(offset=2, limit=3, columns=["id"]))
+    assert page.frame["id"].tolist() == [2, 3, 4] and list(page.frame.columns) == ["id"]
+    assert page.total == 10 and page.next_cursor == 4
+    resumed = select_rows(df, DataType.RECIPES, RowQuery(cursor=page.next_cursor, limit=3))
+    assert resumed.frame["id"].tolist() == [5, 6, 7]
+
+    last = select_rows(df, DataType.RECIPES, RowQuery(offset=8, limit=5))
+    assert last.frame["id"].tolist() == [8, 9] and last.next_cursor is None
+    assert select_rows(df, DataType.RECIPES, RowQuery(offset=4, limit=0)).next_cursor is None
+    assert select_rows(df, DataType.RECIPES, RowQuery(offset=7)).frame["id"].tolist() == [7, 8, 9]
+
+
+def test_non_numeric_filters_are_query_errors(api_client: TestClient, api_stub_analyzer):
+    recipes = pd.DataFrame(
+        {
+            "id": [1, 2],
+            "contributor_id": [10, 11],
+            "submitted": ["2024-01-01"] * 2,
+            "minutes": [5, 9],
+        }
+    )
+    interactions = pd.DataFrame(
+        {"user_id": [7, 8], "recipe_id": [1, 2], "date": ["2024-01-02"] * 2, "rating": [4, 5]}
+    )
+    invalid = [
+        (recipes, DataType.RECIPES, RowQuery(contributor_id="abc")),
+        (recipes, DataType.RECIPES, RowQuery(date_from="abc")),
+        (interactions, DataType.INTERACTIONS, RowQuery(user_id="abc")),
+        (interactions, DataType.INTERACTIONS, RowQuery(recipe_id="abc")),
+        (interactions, DataType.INTERACTIONS, RowQuery(date_to="abc")),
+        (interactions, DataType.INTERACTIONS, RowQuery(min_rating="abc")),
+    ]
+    for df, data_type, query in invalid:
+        with pytest.raises(QueryError):
+            select_rows(df, data_type, query)
+
+    api_stub_analyzer.raw = (recipes, interactions)
+    url = f"/{SERVICE_PREFIX}/load-data"
+    for params in (
+        {"contributor_id": "abc"},
+        {"data_type": "interactions", "user_id": "abc"},
+        {"data_type": "interactions", "recipe_id": "abc"},
+    ):
+        response = api_client.get(url, params=params)
+        assert response.status_code == 400
+        assert "abc" in response.json()["detail"]
+
+
+def test_select_rows_paging_cursor_and_sample(sample_interactions: pd.DataFrame):
+    first = select_rows(sample_interactions, DataType.INTERACTIONS, RowQuery(limit=2))
+    assert len(first.frame) == 2 and first.total == 5 and first.next_cursor == 1
+
+    second = select_rows(
+        sample_interactions, DataType.INTERACTIONS, RowQuery(limit=2, cursor=first.next_cursor)
+    )
+    assert second.frame["user_id"].tolist() == ["u3", "u1"]
+
+    last = select_rows(sample_interactions, DataType.INTERACTIONS, RowQuery(limit=2, cursor=3))
+    assert len(last.frame) == 1 and last.next_cursor is None
+
+    sample = RowQuery(sample=3, seed=7)
+    drawn = select_rows(sample_interactions, DataType.INTERACTIONS, sample)
+    assert len(drawn.frame) == 3
+    again = select_rows(sample_interactions, DataType.INTERACTIONS, sample)
+    assert drawn.frame.equals(again.frame)
+
+
+def test_load_data_paging_and_filters(api_client: TestClient):
+    url = f"/{SERVICE_PREFIX}/load-data"
+
+    page = api_client.get(url, params={"limit": 1, "columns": "value"})
+    assert page.json() == [{"value": "recipes"}]
+    assert page.headers["x-total-count"] == "1"
+
+    filtered = api_client.get(url, params={"recipe_id": 1})
+    assert filtered.json() == [{"id": 1, "value": "recipes"}]
+    assert api_client.get(url, params={"recipe_id": 5}).json() == []
+
+    bad = api_client.get(url, params={"contributor_id": "x", "data_type": "interactions"})
+    assert bad.status_code == 400
+
+
 def test_load_data_invalid_branch(api_stub_analyzer):
     with pytest.raises(api_module.HTTPException):
-        api_module.get_data(data_type=cast(DataType, "invalid"), data_analyzer=api_stub_analyzer)
+        asyncio.run(
+            api_module.get_data(
+                request=cast(Request, None),
+                data_type=cast(DataType, "invalid"),
+                data_analyzer=api_stub_analyzer,
+            )
+        )
 
 
 @pytest.mark.parametrize(
@@ -556,14 +1627,431 @@ def test_analysis_endpoints(api_client: TestClient, endpoint: str):
     assert isinstance(response.json(), list)
 
 
-def test_clean_raw_data_endpoint(api_client: TestClient, monkeypatch):
-    monkeypatch.setattr(api_module, "clean_data", lambda adapter, data_type: [{"ok": True}])
+def test_analysis_endpoints_conditional_get(api_client: TestClient):
+    url = f"/{SERVICE_PREFIX}/rating-vs-recipes"
+    first = api_client.get(url)
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"test-')
+    assert "max-age" in first.headers["cache-control"]
+
+    revalidated = api_client.get(url, headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["etag"] == etag
+
+    other = api_client.get(f"/{SERVICE_PREFIX}/review-trend", headers={"If-None-Match": etag})
+    assert other.status_code == 200
+    assert other.headers["etag"] != etag
+
+
+def test_analysis_response_skips_compute_on_match(api_client: TestClient, api_stub_analyzer):
+    url = f"/{SERVICE_PREFIX}/user-segments"
+    etag = api_client.get(url).headers["etag"]
+
+    api_stub_analyzer.process_data = MagicMock(side_effect=AssertionError("recomputed"))
+    assert api_client.get(url, headers={"If-None-Match": f'"x", {etag}'}).status_code == 304
+    assert api_client.get(url, headers={"If-None-Match": "*"}).status_code == 304
+
+
+def test_analysis_response_served_from_byte_cache(
+    api_client: TestClient, api_stub_analyzer, stub_container
+):
+    url = f"/{SERVICE_PREFIX}/review-overview"
+    first = api_client.get(url)
+    assert first.json() == [{"analysis": "review_overview"}]
+
+    api_stub_analyzer.process_data = MagicMock(side_effect=AssertionError("recomputed"))
+    second = api_client.get(url)
+    assert second.json() == first.json()
+    assert stub_container.response_cache().stats()["hits"] == 1
+
+
+def test_batch_serves_analyses_in_one_response(
+    api_client: TestClient, api_stub_analyzer, stub_container
+):
+    url = f"/{SERVICE_PREFIX}/batch"
+    api_client.get(f"/{SERVICE_PREFIX}/review-trend")
+    process_data = MagicMock(wraps=api_stub_analyzer.process_data)
+    api_stub_analyzer.process_data = process_data
+
+    routes = ["top-tags-by-segment", "review-trend", "user-segments", "review-trend"]
+    response = api_client.post(url, json={"analyses": routes})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["version"] == "test"
+    assert list(body["results"]) == ["top-tags-by-segment", "review-trend", "user-segments"]
+    assert body["results"]["review-trend"] == [{"analysis": "review_temporal_trend"}]
+    # Top tags are derived from the segments computed in the same batch.
+    assert body["results"]["top-tags-by-segment"] == [
+        {"analysis": "top_tags_by_segment", "from": "user_segments"}
+    ]
+    assert [c.args[0] for c in process_data.call_args_list] == [AnalysisType.USER_SEGMENTS]
+
+    # The batch and its analyses are cached for the batch and the GET routes alike.
+    api_stub_analyzer.process_data = MagicMock(side_effect=AssertionError("recomputed"))
+    assert api_client.post(url, json={"analyses": routes}).json() == body
+    single = api_client.get(f"/{SERVICE_PREFIX}/top-tags-by-segment")
+    assert single.json() == body["results"]["top-tags-by-segment"]
+    other = api_client.post(url, json={"analyses": ["user-segments"]})
+    assert other.json()["results"] == {"user-segments": body["results"]["user-segments"]}
+
+    assert api_client.post(url, json={"analyses": ["nope", "review-trend"]}).status_code == 400
+    assert api_client.post(url, json={"analyses": []}).status_code == 422
+
+
+def test_batch_serves_precomputed_analyses_without_deriving(
+    api_client: TestClient, api_stub_analyzer
+):
+    precomputed = pd.DataFrame([{"analysis": "precomputed"}])
+    api_stub_analyzer.precomputed = lambda a: (
+        precomputed if a is AnalysisType.TOP_TAGS_BY_SEGMENT else None
+    )
+    api_stub_analyzer.process_data = lambda a: (
+        precomputed if a is AnalysisType.TOP_TAGS_BY_SEGMENT else pd.DataFrame([{"analysis": a}])
+    )
+    api_stub_analyzer.derive = MagicMock(side_effect=AssertionError("derived"))
+
+    response = api_client.post(
+        f"/{SERVICE_PREFIX}/batch", json={"analyses": ["top-tags-by-segment", "user-segments"]}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["results"]["top-tags-by-segment"] == [{"analysis": "precomputed"}]
+    api_stub_analyzer.derive.assert_not_called()
+
+
+def test_analyzer_derive_shares_the_single_flight(tmp_path: Path, rich_recipes, rich_interactions):
+    adapter = CSVAdapter(data_dir=tmp_path / "data")
+    adapter.save(rich_recipes, DataType.RECIPES)
+    adapter.save(rich_interactions, DataType.INTERACTIONS)
+    analyzer = DataAnylizer(adapter)
+    segments = analyzer.process_data(AnalysisType.USER_SEGMENTS)
+    analyzer.single_flight = MagicMock(wraps=analyzer.single_flight)
+
+    derived = analyzer.derive(AnalysisType.TOP_TAGS_BY_SEGMENT, segments)
+
+    pd.testing.assert_frame_equal(derived, analyzer.compute(AnalysisType.TOP_TAGS_BY_SEGMENT))
+    assert analyzer.single_flight.do.call_args.args[0] == (
+        AnalysisType.TOP_TAGS_BY_SEGMENT,
+        analyzer.version,
+    )
+
+
+def test_batch_answers_503_over_memory_budget(api_client: TestClient, stub_container):
+    stub_container.memory_governor.return_value = MemoryGovernor(budget_bytes=1, usage=lambda: 2)
+
+    response = api_client.post(
+        f"/{SERVICE_PREFIX}/batch", json={"analyses": ["user-segments", "review-trend"]}
+    )
+    assert response.status_code == 503
+    assert int(response.headers["retry-after"]) >= 1
+
+
+def test_encoded_response_negotiation():
+    body = json.dumps([{"value": i} for i in range(500)]).encode()
+    entry = EncodedResponse.build(body, "application/json")
+    assert {"identity", "gzip"} <= set(entry.bodies)
+    assert gzip.decompress(entry.bodies["gzip"]) == body
+
+    gzipped = entry.to_response("gzip, deflate", {"ETag": "x"})
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.headers["etag"] == "x"
+    assert "content-encoding" not in entry.to_response(None).headers
+    assert "content-encoding" not in entry.to_response("gzip;q=0").headers
+
+    assert negotiate_encoding("br;q=0.5, gzip", {"identity", "gzip", "br"}) == "gzip"
+    assert negotiate_encoding("*", {"identity", "gzip"}) == "gzip"
+    assert set(EncodedResponse.build(b"tiny", "application/json").bodies) == {"identity"}
+
+
+def test_response_cache_evicts_least_recently_used():
+    cache = ResponseCache(max_bytes=10)
+    cache.put("a", EncodedResponse("text/plain", {"identity": b"aaaa"}))
+    cache.put("b", EncodedResponse("text/plain", {"identity": b"bbbb"}))
+    assert cache.get("a") is not None
+    cache.put("c", EncodedResponse("text/plain", {"identity": b"cccc"}))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+    cache.put("huge", EncodedResponse("text/plain", {"identity": b"x" * 20}))
+    assert cache.get("huge") is None
+
+
+def test_load_data_etag_depends_on_params(api_client: TestClient):
+    url = f"/{SERVICE_PREFIX}/load-data"
+    full = api_client.get(url).headers["etag"]
+    page = api_client.get(url, params={"limit": 1}).headers["etag"]
+    assert full != page
+    assert api_client.get(url, headers={"If-None-Match": full}).status_code == 304
+
+
+def test_admission_prioritises_interactive_work():
+    admission = AdmissionController(max_concurrent=1)
+    order: list[str] = []
+
+    async def scenario():
+        await admission.acquire(CostClass.BULK)
+
+        async def queued(cost_class: CostClass):
+            async with admission.slot(cost_class):
+                order.append(cost_class.name)
+
+        bulk = asyncio.create_task(queued(CostClass.BULK))
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(queued(CostClass.INTERACTIVE))
+        await asyncio.sleep(0)
+        assert admission.stats()["bulk"]["queued"] == 1
+        admission.release(CostClass.BULK)
+        await asyncio.gather(bulk, interactive)
+
+    asyncio.run(scenario())
+    assert order == ["INTERACTIVE", "BULK"]
+    assert admission.stats()["interactive"]["running"] == 0
+
+
+def test_admission_rejects_over_budget():
+    budgets = {
+        CostClass.INTERACTIVE: ClassBudget(concurrency=1, max_queue=1, queue_timeout=0.05),
+        CostClass.BULK: ClassBudget(concurrency=1, max_queue=0, queue_timeout=1.0),
+    }
+    admission = AdmissionController(max_concurrent=1, budgets=budgets)
+
+    async def scenario():
+        await admission.acquire(CostClass.INTERACTIVE)
+        with pytest.raises(AdmissionRejected, match="queue full") as full:
+            await admission.acquire(CostClass.BULK)
+        assert full.value.retry_after >= 1
+        with pytest.raises(AdmissionRejected, match="queue timeout"):
+            await admission.acquire(CostClass.INTERACTIVE)
+
+    asyncio.run(scenario())
+    stats = admission.stats()
+    assert stats["bulk"]["rejected"] == 1
+    assert stats["interactive"]["rejected"] == 1
+    assert stats["interactive"]["queued"] == 0
+
+
+def test_streamed_response_frees_its_slot_without_iterating_the_body():
+    admission = AdmissionController()
+    started = []
+
+    def body():
+        started.append(True)
+        yield b"never sent"
+
+    async def failing_send(message):
+        raise OSError("client gone")
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def scenario():
+        await admission.acquire(CostClass.BULK)
+        response = AdmittedStreamingResponse(body(), admission=admission, cost_class=CostClass.BULK)
+        assert admission.stats()["bulk"]["running"] == 1
+        with pytest.raises(ClientDisconnect):
+            await response({"type": "http", "asgi": {"spec_version": "2.4"}}, receive, failing_send)
+
+    asyncio.run(scenario())
+    assert started == []
+    assert admission.stats()["bulk"]["running"] == 0
+
+
+def test_load_data_cost_classes():
+    assert api_module.load_cost_class(RowQuery(limit=100)) == CostClass.INTERACTIVE
+    assert api_module.load_cost_class(RowQuery(sample=10)) == CostClass.INTERACTIVE
+    assert api_module.load_cost_class(RowQuery()) == CostClass.BULK
+    assert api_module.load_cost_class(RowQuery(user_id="u1")) == CostClass.BULK
+
+
+def test_endpoints_answer_429_when_saturated(api_client: TestClient, stub_container):
+    closed = ClassBudget(concurrency=0, max_queue=0, queue_timeout=1.0)
+    stub_container.admission.return_value = AdmissionController(
+        budgets={cost_class: closed for cost_class in CostClass}
+    )
+
+    response = api_client.get(f"/{SERVICE_PREFIX}/user-segments")
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) >= 1
+    assert api_client.get(f"/{SERVICE_PREFIX}/load-data").status_code == 429
+    assert api_client.get(f"/{SERVICE_PREFIX}/debug/admission").json()["bulk"]["rejected"] == 1
+
+
+def test_memory_governor_records_peaks_evicts_by_priority_then_rejects():
+    usage = [500]
+    governor = MemoryGovernor(budget_bytes=1000, pressure_ratio=1.0, usage=lambda: usage[0])
+    evicted: list[str] = []
+
+    def cache(name: str, priority: int, held: list[int]) -> Evictable:
+        def evict(needed: int) -> int:
+            evicted.append(name)
+            freed, held[0] = held[0], 0
+            usage[0] -= freed
+            return freed
+
+        return Evictable(name, priority, lambda: held[0], evict)
+
+    governor.track(cache("results", 20, [100]))
+    governor.track(cache("responses", 0, [150]))
+
+    with governor.reserve(AnalysisType.USER_SEGMENTS):
+        usage[0] = 800
+    usage[0] = 500
+    assert governor.estimate(AnalysisType.USER_SEGMENTS) == 300
+    # Analyses never measured are expected to grow as much as the largest one seen.
+    assert governor.estimate(AnalysisType.REVIEW_OVERVIEW) == 300
+
+    usage[0] = 850
+    with governor.reserve(AnalysisType.USER_SEGMENTS):
+        assert evicted == ["responses"]
+    usage[0] = 950
+    with (
+        pytest.raises(MemoryBudgetExceeded) as rejected,
+        governor.reserve(AnalysisType.USER_SEGMENTS),
+    ):
+        pass
+    assert evicted == ["responses", "results"]
+    assert rejected.value.retry_after >= 1
+    stats = governor.stats()
+    assert stats["rejected"] == 1 and stats["reserved_bytes"] == 0
+    assert stats["evictions"] == {"responses": 1, "results": 1}
+    assert stats["analyses"]["user_segments"]["calls"] == 2
+
+
+def test_analyzer_reports_and_releases_held_memory(
+    rich_recipes: pd.DataFrame, rich_interactions: pd.DataFrame
+):
+    analyzer = DataAnylizer(StubAdapter(rich_recipes, rich_interactions))
+    analyzer.get_index(DataType.INTERACTIONS)
+    analyzer.precompute()
+
+    held = analyzer.memory_usage()
+    assert held["frames"] == sum(analyzer.frame_memory().values()) > 0
+    assert held["indexes"] > 0 and held["results"] > 0
+    assert analyzer.drop_indexes() == held["indexes"]
+    assert analyzer.drop_results() == held["results"]
+    assert analyzer.memory_usage() == {"frames": held["frames"], "indexes": 0, "results": 0}
+    # Dropped caches are rebuilt on demand.
+    assert analyzer.get_index(DataType.INTERACTIONS).nbytes > 0
+    assert not analyzer.process_data(AnalysisType.USER_SEGMENTS).empty
+
+
+def test_analyses_answer_503_over_memory_budget(api_client: TestClient, stub_container):
+    stub_container.memory_governor.return_value = MemoryGovernor(budget_bytes=1, usage=lambda: 2)
+
+    response = api_client.get(f"/{SERVICE_PREFIX}/user-segments")
+    assert response.status_code == 503
+    assert int(response.headers["retry-after"]) >= 1
+    governor = api_client.get(f"/{SERVICE_PREFIX}/debug/memory").json()["governor"]
+    assert governor["rejected"] == 1 and governor["budget_bytes"] == 1
+    assert "memory_rejected_total 1" in api_client.get(f"/{SERVICE_PREFIX}/metrics").text
+
+
+def test_load_data_releases_slot_after_streaming(api_client: TestClient, stub_container):
+    api_client.get(f"/{SERVICE_PREFIX}/load-data", params={"limit": 1})
+    api_client.get(f"/{SERVICE_PREFIX}/load-data", params={"user_id": "nobody"})
+    stats = stub_container.admission.return_value.stats()
+    assert stats["interactive"]["running"] == 0
+    assert stats["bulk"]["running"] == 0
+    assert stats["interactive"]["admitted"] == 1
+
+
+def test_dataset_endpoints(api_client: TestClient, stub_container, raw_adapter_factory):
+    stub_container.dataset_refresher.return_value = DatasetRefresher(raw_adapter_factory())
+    body = api_client.get(f"/{SERVICE_PREFIX}/dataset").json()
+    assert body["version"] == "test"
+    assert body["snapshots"]["recipes"]["available"] == []
+
+    refresher = MagicMock()
+    refresher.status.return_value = {"refreshing": True}
+    stub_container.dataset_refresher.return_value = refresher
+    response = api_client.post(f"/{SERVICE_PREFIX}/reload-data")
+    assert response.status_code == 202
+    refresher.request_refresh.assert_called_once()
+
+
+def test_clean_frame_reports_stage_progress(raw_adapter_factory):
+    reported: list[tuple[str, int]] = []
+    df = clean_frame(
+        raw_adapter_factory(), DataType.RECIPES, progress=lambda s, n: reported.append((s, n))
+    )
+
+    assert [stage for stage, _ in reported] == list(CLEANING_STAGES)
+    assert reported[0] == ("load", 1)
+    assert reported[-1] == ("save", len(df))
+
+
+def test_clean_raw_data_endpoint(api_client: TestClient, stub_container):
     response = api_client.post(
         f"/{SERVICE_PREFIX}/clean-raw-data",
         params={"data_type": DataType.RECIPES.value},
     )
-    assert response.status_code == 200
-    assert response.json()["status"] == "success"
+    assert response.status_code == 202
+    body = response.json()
+    assert body["status_url"] == f"/{SERVICE_PREFIX}/jobs/{body['job_id']}"
+
+    stub_container.job_manager.return_value.wait(timeout=30)
+    job = api_client.get(body["status_url"]).json()
+    assert job["status"] == "succeeded"
+    assert job["rows"] == 1
+    assert job["progress"] == 1.0
+    assert [s["stage"] for s in job["stages"]] == list(CLEANING_STAGES)
+    assert [j["id"] for j in api_client.get(f"/{SERVICE_PREFIX}/jobs").json()] == [job["id"]]
+    assert api_client.get(f"/{SERVICE_PREFIX}/jobs/unknown").status_code == 404
+
+
+def test_clean_jobs_cancel_and_queue_bounds(tmp_path: Path):
+    started = tmp_path / "started"
+
+    class SlowAdapter(IDataAdapter):
+        def load(self, data_type: DataType, raw: bool = False) -> pd.DataFrame:
+            started.touch()
+            time.sleep(30)
+            return pd.DataFrame()
+
+        def save(self, df: pd.DataFrame, data_type: DataType) -> None:
+            pass
+
+        def version(self, data_type: DataType) -> str:
+            return "raw"
+
+    manager = JobManager(adapter_factory=SlowAdapter, max_running=1, max_queued=1)
+    running = manager.submit(DataType.RECIPES)
+    queued = manager.submit(DataType.INTERACTIONS)
+    with pytest.raises(JobQueueFull):
+        manager.submit(DataType.RECIPES)
+
+    assert manager.cancel(queued.id).status == JobStatus.CANCELLED
+    deadline = time.monotonic() + 10
+    while not started.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert running.status == JobStatus.RUNNING
+    manager.cancel(running.id)
+    manager.wait(timeout=10)
+
+    assert running.status == JobStatus.CANCELLED
+    assert running.finished_at is not None
+    assert manager.cancel("unknown") is None
+
+
+def test_clean_job_reports_failures():
+    class BrokenAdapter(IDataAdapter):
+        def load(self, data_type: DataType, raw: bool = False) -> pd.DataFrame:
+            raise OSError("raw file missing")
+
+        def save(self, df: pd.DataFrame, data_type: DataType) -> None:
+            pass
+
+        def version(self, data_type: DataType) -> str:
+            return "raw"
+
+    manager = JobManager(adapter_factory=BrokenAdapter)
+    job = manager.submit(DataType.RECIPES)
+    manager.wait(timeout=10)
+
+    assert job.status == JobStatus.FAILED
+    assert job.error == "OSError: raw file missing"
 
 
 def test_get_data_analyzer_direct():
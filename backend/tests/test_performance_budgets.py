@@ -0,0 +1,37 @@
+"""Performance budgets of every pipeline stage, run with ``pytest -m perf``.
+
+Excluded from the default run; see ``benchmarks/budgets.py`` to record a new
+baseline after an intended change.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from benchmarks import budgets
+from benchmarks.run import ScaleResult
+
+pytestmark = pytest.mark.perf
+
+BASELINE = budgets.load_baseline()
+
+
+@pytest.fixture(scope="module")
+def measured(tmp_path_factory: pytest.TempPathFactory) -> ScaleResult:
+    return budgets.measure_budgeted_stages(Path(tmp_path_factory.mktemp("budgets")))
+
+
+@pytest.fixture(scope="module")
+def limits() -> dict[str, budgets.Budget]:
+    return budgets.budgets(BASELINE, budgets.calibrate())
+
+
+def test_baseline_covers_every_stage(measured: ScaleResult):
+    assert {stage.name for stage in measured.stages} == set(BASELINE["stages"])
+
+
+@pytest.mark.parametrize("stage", sorted(BASELINE["stages"]))
+def test_stage_within_budget(stage: str, measured: ScaleResult, limits: dict[str, budgets.Budget]):
+    result = next(s for s in measured.stages if s.name == stage)
+    problems = limits[stage].violations(result)
+    assert not problems, "\n".join(problems)
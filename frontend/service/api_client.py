@@ -0,0 +1,184 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional
+
+import requests
+from domain import (
+    API_POOL_SIZE,
+    API_TIMEOUT_SECONDS,
+    BASE_URL,
+    CACHE_REVALIDATE_SECONDS,
+)
+from logger import struct_logger
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+
+# Serves several analysis routes in one response (``{"version", "results"}``).
+BATCH_PATH = "/mange_ta_main/batch"
+# Reports the version of the dataset the backend serves.
+DATASET_PATH = "/mange_ta_main/dataset"
+
+
+@dataclass
+class CachedAnalysis:
+    data: Any
+    # Dataset version the analysis was computed on, ``None`` when not known.
+    version: Optional[str]
+
+
+class ApiClient:
+    """Shared client of the backend API.
+
+    A single ``requests.Session`` keeps its connections to the backend alive
+    across reruns and browser sessions and asks for the compressed encodings
+    urllib3 can decode. ``prefetch`` asks for every analysis a page shows in
+    one ``/batch`` request, sent in the background while the page starts
+    rendering; ``get_json`` then takes each analysis from the batch in the
+    same script thread instead of calling its route.
+
+    Analyses are kept in a cache shared by every session of the process and
+    keyed by the dataset version they were computed on, so reruns are
+    served locally. Once ``revalidate_seconds`` have passed, the next read
+    still answers from the cache but checks the backend's version in the
+    background (stale-while-revalidate); when it changed, the outdated
+    analyses are fetched again in one batch and replace the cached ones.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        pool_size: int,
+        timeout: float,
+        revalidate_seconds: float = CACHE_REVALIDATE_SECONDS,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.revalidate_seconds = revalidate_seconds
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="api")
+        # Each Streamlit script run has its own thread, hence its own prefetches.
+        self._local = threading.local()
+        self._cache: dict[str, CachedAnalysis] = {}
+        self._lock = threading.Lock()
+        self.version: Optional[str] = None
+        self._checked_at = time.monotonic()
+        self._revalidation: Optional[Future] = None
+
+    def _pending(self) -> dict[str, Future]:
+        if not hasattr(self._local, "pending"):
+            self._local.pending = {}
+        return self._local.pending
+
+    def get(
+        self, path: str, params: Optional[dict[str, Any]] = None, timeout: Optional[float] = None
+    ) -> requests.Response:
+        return self.session.get(
+            f"{self.base_url}{path}", params=params, timeout=timeout or self.timeout
+        )
+
+    def _store(self, results: dict[str, Any], version: Optional[str]) -> None:
+        with self._lock:
+            if version is not None:
+                self.version = version
+            for path, data in results.items():
+                self._cache[path] = CachedAnalysis(data, version)
+
+    def _fetch_batch(self, paths: list[str]) -> dict[str, Any]:
+        routes = [path.rsplit("/", 1)[-1] for path in paths]
+        response = self.session.post(
+            f"{self.base_url}{BATCH_PATH}", json={"analyses": routes}, timeout=self.timeout
+        )
+        response.raise_for_status()
+        body = response.json()
+        results = body["results"]
+        found = {path: results[route] for path, route in zip(paths, routes) if route in results}
+        self._store(found, body.get("version") or None)
+        return found
+
+    def prefetch(self, paths: Iterable[str]) -> None:
+        """Fetch the uncached analysis routes of ``paths`` in one background batch.
+
+        Prefetches of this thread not claimed yet are replaced.
+        """
+        with self._lock:
+            paths = [path for path in paths if path not in self._cache]
+        self._local.pending = {}
+        if not paths:
+            self._maybe_revalidate()
+            return
+        batch = self._executor.submit(self._fetch_batch, paths)
+        self._local.pending = dict.fromkeys(paths, batch)
+        struct_logger.info("Prefetching analyses", count=len(paths))
+
+    def get_json(self, path: str) -> Any:
+        """JSON of ``path``, from the shared cache, its prefetched batch or its route.
+
+        If the backend turned the batch down (e.g. busy) or left ``path`` out,
+        the route is called on its own; a connection error is raised as the
+        call would have.
+        """
+        batch = self._pending().pop(path, None)
+        if batch is not None:
+            try:
+                batch.result()
+            except requests.HTTPError as e:
+                struct_logger.warning("Batch prefetch failed", path=path, error=str(e))
+        with self._lock:
+            cached = self._cache.get(path)
+        if cached is not None:
+            self._maybe_revalidate()
+            return cached.data
+        response = self.get(path)
+        response.raise_for_status()
+        data = response.json()
+        self._store({path: data}, self.version)
+        return data
+
+    def dataset_version(self) -> str:
+        """Version of the dataset the backend serves, as last known; asked for when unknown."""
+        if self.version is None:
+            self._revalidate(raise_errors=True)
+        else:
+            self._maybe_revalidate()
+        return self.version
+
+    def _maybe_revalidate(self) -> None:
+        """Check the dataset version in the background when the last check is too old."""
+        with self._lock:
+            now = time.monotonic()
+            running = self._revalidation is not None and not self._revalidation.done()
+            if running or now - self._checked_at < self.revalidate_seconds:
+                return
+            self._checked_at = now
+            self._revalidation = self._executor.submit(self._revalidate)
+
+    def _revalidate(self, raise_errors: bool = False) -> None:
+        try:
+            response = self.get(DATASET_PATH)
+            response.raise_for_status()
+            version = response.json()["version"]
+            with self._lock:
+                self.version = version
+                stale = [path for path, cached in self._cache.items() if cached.version != version]
+            if not stale:
+                return
+            struct_logger.info("Refreshing cached analyses", version=version, count=len(stale))
+            refreshed = self._fetch_batch(stale)
+            with self._lock:
+                # Analyses the batch left out are fetched from their route on the next read.
+                for path in stale:
+                    if path not in refreshed:
+                        self._cache.pop(path, None)
+        except requests.RequestException as e:
+            struct_logger.warning("Cache revalidation failed", error=str(e))
+            if raise_errors:
+                raise
+
+
+client = ApiClient(BASE_URL, API_POOL_SIZE, API_TIMEOUT_SECONDS)
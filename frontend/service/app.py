@@ -1,4 +1,11 @@
 import streamlit as st
+from api_client import client
+from components import (
+    tab01_top_contributors,
+    tab02_duration_recipe,
+    tab03_reviews,
+    tab04_rating,
+)
 from components.sidebar import render_sidebar
 from components.tab01_top_contributors import render_top_contributors
 from components.tab02_duration_recipe import render_duration_recipe
@@ -11,6 +18,16 @@ from components.tab04_rating import render_user_rating
 
 st.set_page_config(page_title="Mangetamain Dashboard", layout="wide")
 
+# All the analyses of the page come in one batch request, sent while the header renders.
+client.prefetch(
+    [
+        *tab01_top_contributors.ENDPOINTS,
+        *tab02_duration_recipe.ENDPOINTS,
+        *tab03_reviews.ENDPOINTS,
+        *tab04_rating.ENDPOINTS,
+    ]
+)
+
 st.image("images/home_ban_big.png", width="stretch")
 
 st.markdown(
@@ -1,9 +1,14 @@
 import pandas as pd
 import requests
 import streamlit as st
-from domain import BASE_URL
+from api_client import client
 from logger import struct_logger
 
+MOST_RECIPES_CONTRIBUTORS_PATH = "/mange_ta_main/most-recipes-contributors"
+
+# Fetched in one batch by ``client.prefetch`` before the page renders.
+ENDPOINTS = (MOST_RECIPES_CONTRIBUTORS_PATH,)
+
 
 def render_top_contributors(
     show_title: bool = True,
@@ -16,9 +21,7 @@ def render_top_contributors(
     st.subheader("Contributeurs avec le plus de recettes")
 
     try:
-        response = requests.get(f"{BASE_URL}/mange_ta_main/most-recipes-contributors")
-        response.raise_for_status()
-        data = response.json()
+        data = client.get_json(MOST_RECIPES_CONTRIBUTORS_PATH)
         struct_logger.info("Most active contributors fetched", count=len(data))
 
         if data:
@@ -3,9 +3,15 @@ import numpy as np
 import pandas as pd
 import requests
 import streamlit as st
-from domain import BASE_URL
+from api_client import client
 from logger import struct_logger
 
+DURATION_DISTRIBUTION_PATH = "/mange_ta_main/duration-distribution"
+DURATION_VS_RECIPE_COUNT_PATH = "/mange_ta_main/duration-vs-recipe-count"
+
+# Fetched in one batch by ``client.prefetch`` before the page renders.
+ENDPOINTS = (DURATION_DISTRIBUTION_PATH, DURATION_VS_RECIPE_COUNT_PATH)
+
 
 def render_duration_recipe(
     logger=struct_logger,
@@ -18,9 +24,7 @@ def render_duration_recipe(
     view_mode = st.radio("Afficher :", ["Nombre de recettes", "Part (%)"], horizontal=True)
 
     try:
-        response = requests.get(f"{BASE_URL}/mange_ta_main/duration-distribution")
-        response.raise_for_status()
-        data = response.json()
+        data = client.get_json(DURATION_DISTRIBUTION_PATH)
         logger.info("Duration distribution fetched", count=len(data))
     except requests.RequestException as e:
         st.error(f"Erreur lors de la récupération des données : {e}")
@@ -117,9 +121,7 @@ def render_duration_recipe(
             )
 
     try:
-        corr_response = requests.get(f"{BASE_URL}/mange_ta_main/duration-vs-recipe-count")
-        corr_response.raise_for_status()
-        corr_data = corr_response.json()
+        corr_data = client.get_json(DURATION_VS_RECIPE_COUNT_PATH)
         logger.info("Duration vs recipe count fetched", count=len(corr_data))
     except requests.RequestException as e:
         st.error(f"Erreur lors de la récupération de la corrélation durée / volume : {e}")
@@ -5,9 +5,26 @@ import numpy as np
 import pandas as pd
 import requests
 import streamlit as st
-from domain import BASE_URL
+from api_client import client
 from logger import struct_logger
 
+REVIEW_OVERVIEW_PATH = "/mange_ta_main/review-overview"
+REVIEW_DISTRIBUTION_PATH = "/mange_ta_main/review-distribution"
+TOP_REVIEWERS_PATH = "/mange_ta_main/top-reviewers"
+REVIEWER_VS_RECIPES_PATH = "/mange_ta_main/reviewer-vs-recipes"
+REVIEW_TREND_PATH = "/mange_ta_main/review-trend"
+REVIEWS_VS_RATING_PATH = "/mange_ta_main/reviews-vs-rating"
+
+# Fetched in one batch by ``client.prefetch`` before the page renders.
+ENDPOINTS = (
+    REVIEW_OVERVIEW_PATH,
+    REVIEW_DISTRIBUTION_PATH,
+    TOP_REVIEWERS_PATH,
+    REVIEWER_VS_RECIPES_PATH,
+    REVIEW_TREND_PATH,
+    REVIEWS_VS_RATING_PATH,
+)
+
 
 def _format_metric(metric_id: str, value) -> str:
     """Formatte les métriques clés pour l'affichage."""
@@ -36,9 +53,7 @@ def render_reviews(logger=struct_logger) -> None:  # pragma: no cover - Streamli
     # 1. Indicateurs clés
     # =========================
     try:
-        overview_resp = requests.get(f"{BASE_URL}/mange_ta_main/review-overview")
-        overview_resp.raise_for_status()
-        overview_data = overview_resp.json()
+        overview_data = client.get_json(REVIEW_OVERVIEW_PATH)
         logger.info("Review overview fetched", count=len(overview_data))
     except requests.RequestException as exc:
         st.error(f"Impossible de récupérer les indicateurs d'avis : {exc}")
@@ -126,9 +141,7 @@ def render_reviews(logger=struct_logger) -> None:  # pragma: no cover - Streamli
     )
 
     try:
-        dist_resp = requests.get(f"{BASE_URL}/mange_ta_main/review-distribution")
-        dist_resp.raise_for_status()
-        dist_data = dist_resp.json()
+        dist_data = client.get_json(REVIEW_DISTRIBUTION_PATH)
         logger.info("Review distribution fetched", count=len(dist_data))
     except requests.RequestException as exc:
         st.error(f"Erreur lors de la récupération de la distribution d'avis : {exc}")
@@ -242,9 +255,7 @@ def render_reviews(logger=struct_logger) -> None:  # pragma: no cover - Streamli
     st.subheader("Reviewers les plus actifs")
 
     try:
-        reviewer_resp = requests.get(f"{BASE_URL}/mange_ta_main/top-reviewers")
-        reviewer_resp.raise_for_status()
-        reviewer_data = reviewer_resp.json()
+        reviewer_data = client.get_json(TOP_REVIEWERS_PATH)
         logger.info("Top reviewers fetched", count=len(reviewer_data))
     except requests.RequestException as exc:
         st.error(f"Erreur lors de la récupération des reviewers : {exc}")
@@ -333,9 +344,7 @@ def render_reviews(logger=struct_logger) -> None:  # pragma: no cover - Streamli
     st.subheader("Commentaires rédigés vs recettes publiées (par utilisateur)")
 
     try:
-        reviewer_vs_recipes_resp = requests.get(f"{BASE_URL}/mange_ta_main/reviewer-vs-recipes")
-        reviewer_vs_recipes_resp.raise_for_status()
-        reviewer_vs_recipes_data = reviewer_vs_recipes_resp.json()
+        reviewer_vs_recipes_data = client.get_json(REVIEWER_VS_RECIPES_PATH)
         logger.info("Reviewer vs recipes fetched", count=len(reviewer_vs_recipes_data))
     except requests.RequestException as exc:
         st.error(f"Erreur lors de la corrélation reviewers / recettes : {exc}")
@@ -470,9 +479,7 @@ def render_reviews(logger=struct_logger) -> None:  # pragma: no cover - Streamli
     st.subheader("Chronologie des avis publiés")
 
     try:
-        trend_resp = requests.get(f"{BASE_URL}/mange_ta_main/review-trend")
-        trend_resp.raise_for_status()
-        trend_data = trend_resp.json()
+        trend_data = client.get_json(REVIEW_TREND_PATH)
         logger.info("Review trend fetched", count=len(trend_data))
     except requests.RequestException as exc:
         st.error(f"Erreur lors de la récupération de la chronologie : {exc}")
@@ -555,9 +562,7 @@ def render_reviews(logger=struct_logger) -> None:  # pragma: no cover - Streamli
     st.subheader("Relation entre volume d'avis et note moyenne")
 
     try:
-        scatter_resp = requests.get(f"{BASE_URL}/mange_ta_main/reviews-vs-rating")
-        scatter_resp.raise_for_status()
-        scatter_data = scatter_resp.json()
+        scatter_data = client.get_json(REVIEWS_VS_RATING_PATH)
         logger.info("Reviews vs rating fetched", count=len(scatter_data))
     except requests.RequestException as exc:
         st.error(f"Erreur lors de la récupération des corrélations : {exc}")
@@ -3,9 +3,15 @@ import numpy as np
 import pandas as pd
 import requests
 import streamlit as st
-from domain import BASE_URL
+from api_client import client
 from logger import struct_logger
 
+RATING_DISTRIBUTION_PATH = "/mange_ta_main/rating-distribution"
+RATING_VS_RECIPES_PATH = "/mange_ta_main/rating-vs-recipes"
+
+# Fetched in one batch by ``client.prefetch`` before the page renders.
+ENDPOINTS = (RATING_DISTRIBUTION_PATH, RATING_VS_RECIPES_PATH)
+
 
 def render_user_rating(
     logger=struct_logger,
@@ -26,9 +32,7 @@ def render_user_rating(
 
     # Distribution des notes moyennes par contributeur
     try:
-        response = requests.get(f"{BASE_URL}/mange_ta_main/rating-distribution")
-        response.raise_for_status()
-        data = response.json()
+        data = client.get_json(RATING_DISTRIBUTION_PATH)
         logger.info("Rating distribution fetched", count=len(data))
     except requests.RequestException as e:
         st.error(f"Erreur lors de la récupération des données : {e}")
@@ -168,9 +172,7 @@ def render_user_rating(
 
     # Correlation: Note moyenne par contributeur et leur nombre de recettes
     try:
-        corr_response = requests.get(f"{BASE_URL}/mange_ta_main/rating-vs-recipes")
-        corr_response.raise_for_status()
-        corr_data = corr_response.json()
+        corr_data = client.get_json(RATING_VS_RECIPES_PATH)
         logger.info("Rating vs recipe count fetched", count=len(corr_data))
     except requests.RequestException as e:
         st.error(f"Erreur lors de la récupération de la corrélation note / volume : {e}")
@@ -2,17 +2,16 @@ import altair as alt
 import pandas as pd
 import requests
 import streamlit as st
-from domain import BASE_URL
+from api_client import client
 from logger import struct_logger
 
+TOP_10_PERCENT_CONTRIBUTORS_PATH = "/mange_ta_main/top-10-percent-contributors"
+
 
-@st.cache_data(ttl=3600)  # Cache for 1 hour
 def fetch_top10_data():
-    """Fetch top 10% contributor data with caching."""
+    """Fetch top 10% contributor data, cached by the API client until the dataset changes."""
     try:
-        response = requests.get(f"{BASE_URL}/mange_ta_main/top-10-percent-contributors")
-        response.raise_for_status()
-        data = response.json()
+        data = client.get_json(TOP_10_PERCENT_CONTRIBUTORS_PATH)
         struct_logger.info("Top 10% contributor metrics fetched", count=len(data))
         return data
     except requests.RequestException as e:
@@ -2,9 +2,11 @@ import altair as alt
 import pandas as pd
 import requests
 import streamlit as st
-from domain import BASE_URL
+from api_client import client
 from logger import struct_logger
 
+TOP_TAGS_BY_SEGMENT_PATH = "/mange_ta_main/top-tags-by-segment"
+
 SEGMENT_ORDER = [
     "Super Cookers",
     "Quick Cookers",
@@ -15,13 +17,10 @@ SEGMENT_ORDER = [
 ]
 
 
-@st.cache_data(ttl=3600)  # Cache for 1 hour
 def fetch_tags_by_segment_data():
-    """Fetch top tags by segment data with caching."""
+    """Fetch top tags by segment data, cached by the API client until the dataset changes."""
     try:
-        response = requests.get(f"{BASE_URL}/mange_ta_main/top-tags-by-segment")
-        response.raise_for_status()
-        data = response.json()
+        data = client.get_json(TOP_TAGS_BY_SEGMENT_PATH)
         struct_logger.info("Top tags by segment fetched", count=len(data))
         return data
     except requests.RequestException as e:
@@ -1,3 +1,14 @@
 import os
 
 BASE_URL = os.getenv("BASE_URL", "http://mange-ta-main-back:8000")
+# Backend address as seen from the browser, for links it downloads from directly. Unset,
+# links are relative to the page: the ingress routes them to the backend.
+PUBLIC_BASE_URL = os.getenv("PUBLIC_BASE_URL", "").rstrip("/")
+
+# Connections kept alive to the backend, also the threads sending prefetch batches.
+API_POOL_SIZE = int(os.getenv("API_POOL_SIZE", "16"))
+API_TIMEOUT_SECONDS = float(os.getenv("API_TIMEOUT_SECONDS", "30"))
+
+# Cached analyses are served while the backend's dataset version is checked in the
+# background, at most once per this delay.
+CACHE_REVALIDATE_SECONDS = float(os.getenv("CACHE_REVALIDATE_SECONDS", "30"))
@@ -9,11 +9,14 @@ Examples:
     chargées et affichées.
 """
 
+from urllib.parse import urlencode
+
 import pandas as pd
 import requests
 import streamlit as st
+from api_client import client
 from components.sidebar import render_sidebar
-from domain import BASE_URL
+from domain import PUBLIC_BASE_URL
 from logger import struct_logger
 
 render_sidebar()
@@ -32,19 +35,33 @@ st.markdown(
 
 data_type = st.selectbox("Choisir le dataset", ["recipes", "interactions"])
 
+PREVIEW_ROWS = 100
+LOAD_DATA_PATH = "/mange_ta_main/load-data"
+EXPORT_PATH = "/mange_ta_main/export"
+EXPORT_FORMATS = {"CSV": "csv", "CSV compressé (gzip)": "csv.gz", "Parquet": "parquet"}
+
+
 # Utiliser st.cache_data pour éviter de recharger à chaque interaction
 @st.cache_data(ttl=3600)
-def load_dataset(dataset_type: str) -> pd.DataFrame | None:
-    """Charge un dataset depuis le backend avec mise en cache.
+def load_dataset(
+    dataset_type: str, version: str | None = None, limit: int = PREVIEW_ROWS
+) -> pd.DataFrame | None:
+    """Charge un aperçu paginé d'un dataset depuis le backend avec mise en cache.
 
-    Cette fonction récupère les données depuis l'API backend et les met
-    en cache pendant 1 heure pour améliorer les performances.
+    Seules les ``limit`` premières lignes sont demandées au backend
+    (pagination côté serveur) : l'aperçu coûte quelques kilo-octets au lieu
+    du dataset complet.
 
     Args:
         dataset_type: Type de dataset à charger ("recipes" ou "interactions")
+        version: Version du dataset servie par le backend ; seulement clé du
+            cache, pour qu'un nouveau dataset invalide l'aperçu
+        limit: Nombre de lignes à récupérer pour l'aperçu
 
     Returns:
-        DataFrame pandas contenant les données, ou None si aucune donnée
+        DataFrame pandas contenant l'aperçu, ou None si aucune donnée. Le
+        nombre total de lignes du dataset (en-tête ``X-Total-Count``) est
+        disponible dans ``df.attrs["total_rows"]``.
 
     Raises:
         requests.exceptions.RequestException: Si la requête échoue
@@ -53,44 +70,61 @@ def load_dataset(dataset_type: str) -> pd.DataFrame | None:
     Examples:
         >>> df = load_dataset("recipes")
         >>> print(df.head())
-        >>> df = load_dataset("interactions")
-        >>> print(df.shape)
+        >>> df = load_dataset("interactions", limit=10)
+        >>> print(df.attrs["total_rows"])
 
     Note:
-        Les données sont mises en cache pendant 1 heure (ttl=3600).
-        Pour forcer un rechargement, utilisez st.cache_data.clear().
+        Les données sont mises en cache pendant 1 heure (ttl=3600), ou
+        jusqu'au changement de version du dataset. Pour forcer un
+        rechargement, utilisez st.cache_data.clear().
     """
-    url = f"{BASE_URL}/mange_ta_main/load-data?data_type={dataset_type}"
-    response = requests.get(url, timeout=60)
+    response = client.get(
+        LOAD_DATA_PATH, params={"data_type": dataset_type, "limit": limit}, timeout=60
+    )
     response.raise_for_status()
     data = response.json()
-    return pd.DataFrame(data) if data else None
+    if not data:
+        return None
+    df = pd.DataFrame(data)
+    df.attrs["total_rows"] = int(response.headers.get("X-Total-Count", len(df)))
+    return df
+
+
+def export_url(dataset_type: str, export_format: str) -> str:
+    """Lien de téléchargement du dataset complet, servi en streaming par le backend.
+
+    Le navigateur télécharge le fichier directement depuis le backend
+    (``PUBLIC_BASE_URL``, ou la route de l'ingress sur le même hôte quand elle
+    n'est pas définie) : l'export ne passe pas par la mémoire de Streamlit.
+    """
+    params = urlencode({"data_type": dataset_type, "format": export_format})
+    return f"{PUBLIC_BASE_URL}{EXPORT_PATH}?{params}"
+
 
 struct_logger.info("Starting data load", data_type=data_type)
 with st.spinner("Chargement du dataset..."):
     try:
         struct_logger.info("Calling load_dataset", data_type=data_type)
-        df = load_dataset(data_type)
+        version = client.dataset_version()
+        df = load_dataset(data_type, version)
         struct_logger.info("load_dataset returned", is_none=df is None, is_empty=df.empty if df is not None else None)
 
         if df is None or df.empty:
             st.warning("Aucune donnée reçue du backend.")
             struct_logger.warning("Empty data received", data_type=data_type)
         else:
-            struct_logger.info("Data loaded successfully", rows=len(df), columns=len(df.columns))
-            struct_logger.info("About to display success message and dataframe")
-            st.success(f"Dataset chargé : {len(df)} lignes, {len(df.columns)} colonnes")
-            struct_logger.info("Success message displayed, now showing dataframe")
-            st.dataframe(df.head(100))
+            total_rows = df.attrs.get("total_rows", len(df))
+            struct_logger.info("Data loaded successfully", rows=total_rows, columns=len(df.columns))
+            st.success(f"Dataset chargé : {total_rows} lignes, {len(df.columns)} colonnes")
+            st.caption(f"Aperçu des {len(df)} premières lignes")
+            st.dataframe(df)
             struct_logger.info("Dataframe displayed")
 
             # Bouton de téléchargement
-            csv = df.to_csv(index=False).encode('utf-8')
-            st.download_button(
-                label="📥 Télécharger le dataset complet (CSV)",
-                data=csv,
-                file_name=f"{data_type}_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                mime="text/csv"
+            export_format = st.selectbox("Format d'export", list(EXPORT_FORMATS))
+            st.link_button(
+                label="📥 Télécharger le dataset complet",
+                url=export_url(data_type, EXPORT_FORMATS[export_format]),
             )
             struct_logger.info("Download button displayed")
 
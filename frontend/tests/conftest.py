@@ -1,4 +1,4 @@
-from typing import Any, Callable, Iterable, List
+from typing import Any, Iterable, List
 from unittest.mock import Mock, patch
 
 import pytest
@@ -17,7 +17,22 @@ def mock_requests_for_streamlit() -> Iterable[None]:
     fake_response.json.return_value = []
     fake_response.raise_for_status.return_value = None
 
-    with patch("requests.get", return_value=fake_response):
+    empty_batch = Mock()
+    empty_batch.json.return_value = {"version": "", "results": {}}
+    empty_batch.raise_for_status.return_value = None
+
+    dataset = Mock()
+    dataset.json.return_value = {"version": ""}
+    dataset.raise_for_status.return_value = None
+
+    def session_get(url: str, *args: Any, **kwargs: Any) -> Mock:
+        return dataset if url.endswith("/mange_ta_main/dataset") else fake_response
+
+    with (
+        patch("requests.get", return_value=fake_response),
+        patch("requests.Session.get", side_effect=session_get),
+        patch("requests.Session.post", return_value=empty_batch),
+    ):
         yield
 
 
@@ -26,19 +41,6 @@ def mock_requests_for_streamlit() -> Iterable[None]:
 # ---------------------------------------------------------------------------
 
 
-@pytest.fixture
-def make_response() -> Callable[[Any], Mock]:
-    """Factory returning a Mock response with the provided payload."""
-
-    def _factory(payload: Any) -> Mock:
-        fake_response = Mock()
-        fake_response.json.return_value = payload
-        fake_response.raise_for_status.return_value = None
-        return fake_response
-
-    return _factory
-
-
 @pytest.fixture
 def top_contributors_payload() -> List[List[int]]:
     return [[i, 20 - i] for i in range(101, 111)]
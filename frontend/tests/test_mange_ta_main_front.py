@@ -1,10 +1,13 @@
+import threading
 from unittest.mock import MagicMock, Mock, patch
 
 import altair as alt
 import numpy as np
 import pandas as pd
+import pytest
 import requests
 
+from ..service.api_client import ApiClient
 from ..service.components.tab01_top_contributors import render_top_contributors
 from ..service.components.tab02_duration_recipe import render_duration_recipe
 from ..service.components.tab03_reviews import _format_metric
@@ -71,11 +74,10 @@ def test_format_metric_various_types():
     assert _format_metric("text", "Hello") == "Hello"
 
 
-def test_render_top_contributors_with_data(top_contributors_payload, make_response):
-    fake_response = make_response(top_contributors_payload)
+def test_render_top_contributors_with_data(top_contributors_payload):
     module_path = render_top_contributors.__module__
     with (
-        patch(f"{module_path}.requests.get", return_value=fake_response) as mock_get,
+        patch(f"{module_path}.client.get_json", return_value=top_contributors_payload) as mock_get,
         patch(f"{module_path}.st") as st_mock,
     ):
 
@@ -108,11 +110,10 @@ def test_render_top_contributors_with_data(top_contributors_payload, make_respon
         st_mock.error.assert_not_called()
 
 
-def test_render_top_contributors_no_data(make_response):
-    fake_response = make_response([])
+def test_render_top_contributors_no_data():
     module_path = render_top_contributors.__module__
     with (
-        patch(f"{module_path}.requests.get", return_value=fake_response),
+        patch(f"{module_path}.client.get_json", return_value=[]),
         patch(f"{module_path}.st") as st_mock,
     ):
         render_top_contributors(show_title=False)
@@ -121,15 +122,13 @@ def test_render_top_contributors_no_data(make_response):
 
 
 def test_render_duration_recipe_with_data(
-    duration_distribution_payload, duration_vs_recipe_payload, make_response
+    duration_distribution_payload, duration_vs_recipe_payload
 ):
-    fake_resp_dist = make_response(duration_distribution_payload)
-    fake_resp_corr = make_response(duration_vs_recipe_payload)
-
     module_path = render_duration_recipe.__module__
     with (
         patch(
-            f"{module_path}.requests.get", side_effect=[fake_resp_dist, fake_resp_corr]
+            f"{module_path}.client.get_json",
+            side_effect=[duration_distribution_payload, duration_vs_recipe_payload],
         ) as mock_get,
         patch(f"{module_path}.st") as st_mock,
     ):
@@ -163,16 +162,12 @@ def test_render_duration_recipe_with_data(
         st_mock.error.assert_not_called()
 
 
-def test_render_user_rating_with_data(
-    rating_distribution_payload, rating_vs_recipes_payload, make_response
-):
-    fake_resp_dist = make_response(rating_distribution_payload)
-    fake_resp_corr = make_response(rating_vs_recipes_payload)
-
+def test_render_user_rating_with_data(rating_distribution_payload, rating_vs_recipes_payload):
     module_path = render_user_rating.__module__
     with (
         patch(
-            f"{module_path}.requests.get", side_effect=[fake_resp_dist, fake_resp_corr]
+            f"{module_path}.client.get_json",
+            side_effect=[rating_distribution_payload, rating_vs_recipes_payload],
         ) as mock_get,
         patch(f"{module_path}.st") as st_mock,
     ):
@@ -198,11 +193,10 @@ def test_render_user_rating_with_data(
         st_mock.error.assert_not_called()
 
 
-def test_render_top10_vs_global_with_data(top10_vs_global_payload, make_response):
-    fake_resp = make_response(top10_vs_global_payload)
+def test_render_top10_vs_global_with_data(top10_vs_global_payload):
     module_path = render_top10_vs_global.__module__
     with (
-        patch(f"{module_path}.requests.get", return_value=fake_resp) as mock_get,
+        patch(f"{module_path}.client.get_json", return_value=top10_vs_global_payload) as mock_get,
         patch(f"{module_path}.st") as st_mock,
     ):
 
@@ -222,11 +216,10 @@ def test_render_top10_vs_global_with_data(top10_vs_global_payload, make_response
         st_mock.error.assert_not_called()
 
 
-def test_render_top_tags_by_segment_with_data(tags_by_segment_payload, make_response):
-    fake_resp = make_response(tags_by_segment_payload)
+def test_render_top_tags_by_segment_with_data(tags_by_segment_payload):
     module_path = render_top_tags_by_segment.__module__
     with (
-        patch(f"{module_path}.requests.get", return_value=fake_resp) as mock_get,
+        patch(f"{module_path}.client.get_json", return_value=tags_by_segment_payload) as mock_get,
         patch(f"{module_path}.st") as st_mock,
     ):
 
@@ -288,3 +281,122 @@ def test_pages_imports_smoke_without_network():
     # Basic sanity that modules loaded
     assert mod_app is not None and mod_data is not None
     assert mod_analyse is not None and mod_conclusions is not None
+
+
+def test_public_base_url_has_no_localhost_default(monkeypatch):
+    # Unset, export links are relative to the page and the ingress routes them.
+    import importlib as _importlib
+
+    from ..service import domain
+
+    monkeypatch.setenv("PUBLIC_BASE_URL", "http://mange-ta-main.duckdns.org/")
+    assert _importlib.reload(domain).PUBLIC_BASE_URL == "http://mange-ta-main.duckdns.org"
+    monkeypatch.delenv("PUBLIC_BASE_URL")
+    assert _importlib.reload(domain).PUBLIC_BASE_URL == ""
+
+
+def test_api_client_pools_connections_and_accepts_compression():
+    api = ApiClient("http://backend:8000/", pool_size=4, timeout=5)
+    adapter = api.session.get_adapter("http://backend:8000/mange_ta_main/review-trend")
+    assert adapter._pool_maxsize == 4
+    assert "gzip" in api.session.headers["Accept-Encoding"]
+    assert api.base_url == "http://backend:8000"
+
+
+def test_api_client_prefetches_a_page_in_one_batch():
+    api = ApiClient("http://backend:8000", pool_size=2, timeout=5)
+    paths = ["/mange_ta_main/review-trend", "/mange_ta_main/rating-distribution"]
+    batch = Mock()
+    batch.json.return_value = {
+        "version": "v1",
+        "results": {"review-trend": [{"n": 1}], "rating-distribution": [{"n": 2}]},
+    }
+    single = Mock()
+    single.json.return_value = [{"n": 3}]
+    with (
+        patch.object(api.session, "post", return_value=batch) as mock_post,
+        patch.object(api.session, "get", return_value=single) as mock_get,
+    ):
+        api.prefetch(paths)
+        assert api.get_json(paths[1]) == [{"n": 2}]
+        assert api.get_json(paths[0]) == [{"n": 1}]
+
+        mock_post.assert_called_once()
+        assert mock_post.call_args[0][0] == "http://backend:8000/mange_ta_main/batch"
+        assert mock_post.call_args[1]["json"] == {
+            "analyses": ["review-trend", "rating-distribution"]
+        }
+        mock_get.assert_not_called()
+
+        # Claimed analyses stay cached: a rerun neither prefetches nor calls them again.
+        api.prefetch(paths)
+        assert api.get_json(paths[0]) == [{"n": 1}]
+        mock_post.assert_called_once()
+        mock_get.assert_not_called()
+        assert api.version == "v1"
+
+
+def test_api_client_prefetches_are_per_thread_and_fall_back_to_routes():
+    api = ApiClient("http://backend:8000", pool_size=2, timeout=5)
+    busy = Mock()
+    busy.raise_for_status.side_effect = requests.HTTPError("429 busy")
+    single = Mock()
+    single.json.return_value = [{"n": 1}]
+    with (
+        patch.object(api.session, "post", return_value=busy),
+        patch.object(api.session, "get", return_value=single) as mock_get,
+    ):
+        api.prefetch(["/mange_ta_main/review-trend"])
+
+        # Another script thread does not see this thread's prefetches.
+        seen = []
+        other = threading.Thread(target=lambda: seen.append(api._pending()))
+        other.start()
+        other.join()
+        assert seen == [{}]
+
+        # A batch turned down by the backend falls back to the route itself.
+        assert api.get_json("/mange_ta_main/review-trend") == [{"n": 1}]
+        mock_get.assert_called_once()
+
+    error = requests.ConnectionError("backend down")
+    with patch.object(api.session, "post", side_effect=error):
+        api.prefetch(["/mange_ta_main/rating-distribution"])
+        with pytest.raises(requests.ConnectionError) as excinfo:
+            api.get_json("/mange_ta_main/rating-distribution")
+        assert excinfo.value is error
+
+
+def test_api_client_cache_is_shared_and_revalidated_by_dataset_version():
+    api = ApiClient("http://backend:8000", pool_size=2, timeout=5, revalidate_seconds=0)
+    path = "/mange_ta_main/review-trend"
+    first = Mock()
+    first.json.return_value = [{"n": 1}]
+    with patch.object(api.session, "get", return_value=first):
+        assert api.get_json(path) == [{"n": 1}]
+
+    # Another session reads the same cache while the backend version is checked.
+    dataset = Mock()
+    dataset.json.return_value = {"version": "v2"}
+    batch = Mock()
+    batch.json.return_value = {"version": "v2", "results": {"review-trend": [{"n": 2}]}}
+    with (
+        patch.object(api.session, "get", return_value=dataset) as mock_get,
+        patch.object(api.session, "post", return_value=batch) as mock_post,
+    ):
+        seen = []
+        other = threading.Thread(target=lambda: seen.append(api.get_json(path)))
+        other.start()
+        other.join()
+        assert seen == [[{"n": 1}]]
+        api._revalidation.result()
+
+        mock_get.assert_called_once()
+        assert mock_get.call_args[0][0] == "http://backend:8000/mange_ta_main/dataset"
+        assert mock_post.call_args[1]["json"] == {"analyses": ["review-trend"]}
+        assert api.get_json(path) == [{"n": 2}]
+
+        # An unchanged version keeps the cached analyses.
+        api._revalidation.result()
+        assert mock_get.call_count == 2
+        mock_post.assert_called_once()